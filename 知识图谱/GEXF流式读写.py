@@ -0,0 +1,541 @@
+# GEXF流式读写.py
+"""
+GEXF 流式读写与二进制附属文件
+
+- 读取：iterparse 逐个处理 node/edge 元素后立即释放，不构建整棵 XML 树，
+  节点列表和边端点下标数组直接生成，需要时再一次性批量转换为 networkx 图
+- 写入：逐行输出 XML，同一遍中统计 viz 颜色属性，写完即得到颜色校验结果，
+  不必重新解析输出文件
+- 附属文件：同一张图的 .graph.npz（边下标数组 + JSON 属性），记录源文件大小和修改时间，
+  源文件未变时直接加载，跳过 XML 解析
+与 nx.read_gexf / nx.write_gexf 的输出互相兼容（静态图）。
+"""
+import datetime
+import json
+import os
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+GEXF_NAMESPACE = 'http://www.gexf.net/1.2draft'
+VIZ_NAMESPACE = 'http://www.gexf.net/1.2draft/viz'
+SIDECAR_VERSION = 1
+
+# GEXF 属性类型 -> Python 类型
+_PYTHON_TYPES = {
+    'integer': int, 'long': int, 'int': int,
+    'float': float, 'double': float,
+    'string': str, 'liststring': str, 'anyURI': str,
+}
+_BOOLEANS = {'true': True, 'false': False, '1': True, '0': False}
+
+# 不作为 attvalue 写出的节点/边字段
+_NODE_RESERVED = {'label', 'viz'}
+_EDGE_RESERVED = {'id', 'label', 'weight'}
+
+
+class GraphArrays:
+    """数组形式的图：节点列表、(m, 2) 边端点下标与属性字典"""
+
+    def __init__(self, nodes, node_data, edges, edge_data, directed=False, graph_attrs=None, edge_keys=None):
+        self.nodes = nodes
+        self.node_data = node_data
+        self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self.edge_data = edge_data
+        self.directed = directed
+        self.graph_attrs = graph_attrs or {}
+        # 多重图的边键（nx.write_gexf 写出的 networkx_key 属性），没有时使用边ID
+        self.edge_keys = edge_keys
+
+    @property
+    def multigraph(self):
+        """是否存在重复边（无向图按无序节点对判断）"""
+        if not len(self.edges):
+            return False
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        if not self.directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+        return len(np.unique(u * len(self.nodes) + v)) < len(self.edges)
+
+    def adjacency(self):
+        """CSR 邻接矩阵（无向图对称），行列顺序与 nodes 一致"""
+        n = len(self.nodes)
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        if not self.directed:
+            u, v = np.concatenate([u, v]), np.concatenate([v, u])
+        A = sparse.csr_matrix((np.ones(len(u)), (u, v)), shape=(n, n))
+        A.data[:] = 1.0
+        return A
+
+    def to_networkx(self):
+        """批量构建 networkx 图（与 nx.read_gexf 的结果一致）"""
+        multigraph = self.multigraph
+        if self.directed:
+            G = nx.MultiDiGraph() if multigraph else nx.DiGraph()
+        else:
+            G = nx.MultiGraph() if multigraph else nx.Graph()
+        G.graph.update(self.graph_attrs)
+        G.add_nodes_from(zip(self.nodes, self.node_data))
+        nodes = self.nodes
+        if multigraph:
+            keys = self.edge_keys or [data.get('id') for data in self.edge_data]
+            G.add_edges_from((nodes[u], nodes[v], key, data)
+                             for (u, v), data, key in zip(self.edges.tolist(), self.edge_data, keys))
+        else:
+            G.add_edges_from((nodes[u], nodes[v], data)
+                             for (u, v), data in zip(self.edges.tolist(), self.edge_data))
+        return G
+
+
+# ---- 读取 ----
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _decode(value, attr_type):
+    if attr_type == 'boolean':
+        return _BOOLEANS[value]
+    return _PYTHON_TYPES.get(attr_type, str)(value)
+
+
+def _attvalues(element, ns, definitions):
+    data = {}
+    attvalues = element.find(f'{{{ns}}}attvalues')
+    if attvalues is not None:
+        for attvalue in attvalues.iter(f'{{{ns}}}attvalue'):
+            key = attvalue.get('for')
+            if key not in definitions:
+                raise nx.NetworkXError(f"No attribute defined for={key}.")
+            title, attr_type = definitions[key]
+            data[title] = _decode(attvalue.get('value'), attr_type)
+    return data
+
+
+def _viz(element, viz_ns, with_alpha):
+    viz = {}
+    color = element.find(f'{{{viz_ns}}}color')
+    if color is not None:
+        viz['color'] = {'r': int(color.get('r')), 'g': int(color.get('g')), 'b': int(color.get('b'))}
+        if with_alpha:
+            viz['color']['a'] = float(color.get('a', 1))
+    size = element.find(f'{{{viz_ns}}}size')
+    if size is not None:
+        viz['size'] = float(size.get('value'))
+    thickness = element.find(f'{{{viz_ns}}}thickness')
+    if thickness is not None:
+        viz['thickness'] = float(thickness.get('value'))
+    shape = element.find(f'{{{viz_ns}}}shape')
+    if shape is not None:
+        # nx.write_gexf 把形状写在 value 属性中
+        value = shape.get('shape', shape.get('value'))
+        viz['shape'] = shape.get('uri') if value == 'image' else value
+    position = element.find(f'{{{viz_ns}}}position')
+    if position is not None:
+        viz['position'] = {axis: float(position.get(axis, 0)) for axis in ('x', 'y', 'z')}
+    return viz
+
+
+def read_gexf_arrays(path):
+    """
+    iterparse 流式读取 GEXF（静态图）
+
+    Returns:
+        GraphArrays；节点ID为字符串，属性与 nx.read_gexf 一致
+    """
+    nodes, node_data, index = [], [], {}
+    sources, targets, edge_data, edge_keys = [], [], [], []
+    definitions = {'node': {}, 'edge': {}}
+    defaults = {'node': {}, 'edge': {}}
+    graph_attrs, directed = {}, False
+    ns = viz_ns = None
+    with_alpha = True
+    attribute_class = None
+    has_keys = False
+
+    def node_index(node_id):
+        if node_id not in index:
+            index[node_id] = len(nodes)
+            nodes.append(node_id)
+            node_data.append({})
+        return index[node_id]
+
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = _local(element.tag)
+        if event == 'start':
+            if tag == 'gexf':
+                ns = element.tag[1:].split('}')[0] if element.tag.startswith('{') else ''
+                viz_ns = ns + '/viz'
+                with_alpha = '1.1draft' not in ns
+            elif tag == 'graph':
+                directed = element.get('defaultedgetype') == 'directed'
+                if element.get('name'):
+                    graph_attrs['name'] = element.get('name')
+                graph_attrs['mode'] = 'dynamic' if element.get('mode') == 'dynamic' else 'static'
+            elif tag == 'attributes':
+                attribute_class = element.get('class')
+            continue
+
+        if tag == 'attribute':
+            attr_type = element.get('type')
+            definitions[attribute_class][element.get('id')] = (element.get('title'), attr_type)
+            default = element.find(f'{{{ns}}}default')
+            if default is not None:
+                defaults[attribute_class][element.get('title')] = _decode(default.text, attr_type)
+        elif tag == 'attributes':
+            graph_attrs[f'{attribute_class}_default'] = defaults[attribute_class]
+        elif tag == 'node':
+            i = node_index(element.get('id'))
+            data = _attvalues(element, ns, definitions['node'])
+            viz = _viz(element, viz_ns, with_alpha)
+            if viz:
+                data['viz'] = viz
+            data['label'] = element.get('label')
+            node_data[i].update(data)
+            element.clear()
+        elif tag == 'edge':
+            edge_type = element.get('type')
+            if directed and edge_type == 'undirected':
+                raise nx.NetworkXError("Undirected edge found in directed graph.")
+            if not directed and edge_type == 'directed':
+                raise nx.NetworkXError("Directed edge found in undirected graph.")
+            data = _attvalues(element, ns, definitions['edge'])
+            key = data.pop('networkx_key', None)
+            if element.get('id') is not None:
+                data['id'] = element.get('id')
+            edge_keys.append(data.get('id') if key is None else key)
+            has_keys = has_keys or key is not None
+            if element.get('weight') is not None:
+                data['weight'] = float(element.get('weight'))
+            if element.get('label') is not None:
+                data['label'] = element.get('label')
+            u, v = node_index(element.get('source')), node_index(element.get('target'))
+            sources.append(u)
+            targets.append(v)
+            edge_data.append(data)
+            if edge_type == 'mutual':
+                sources.append(v)
+                targets.append(u)
+                edge_data.append(dict(data))
+                edge_keys.append(edge_keys[-1])
+            element.clear()
+        elif tag in ('nodes', 'edges'):
+            element.clear()
+
+    graph_attrs.setdefault('edge_default', {})
+    edges = np.column_stack([np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)])
+    return GraphArrays(nodes, node_data, edges, edge_data, directed, graph_attrs,
+                       edge_keys if has_keys else None)
+
+
+def read_gexf(path):
+    """流式读取 GEXF 为 networkx 图（nx.read_gexf 的替代）"""
+    return read_gexf_arrays(path).to_networkx()
+
+
+def scan_viz_colors(path, samples=5):
+    """流式扫描 GEXF 文件中节点的 viz 颜色（用于校验已有文件）"""
+    report = _new_report(samples)
+    ns = viz_ns = None
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = _local(element.tag)
+        if event == 'start':
+            if tag == 'gexf':
+                ns = element.tag[1:].split('}')[0] if element.tag.startswith('{') else ''
+                viz_ns = ns + '/viz'
+            continue
+        if tag == 'node':
+            color = element.find(f'{{{viz_ns}}}color')
+            attvalues = element.find(f'{{{ns}}}attvalues')
+            values = [] if attvalues is None else [(a.get('for'), a.get('value')) for a in attvalues]
+            color_tuple = None if color is None else (color.get('r'), color.get('g'), color.get('b'))
+            _record(report, element.get('id'), color_tuple, values)
+            element.clear()
+        elif tag == 'edge':
+            report['edges'] += 1
+            element.clear()
+    return report
+
+
+# ---- 写入 ----
+
+def _new_report(samples):
+    return {'nodes': 0, 'edges': 0, 'nodes_with_color': 0, 'nodes_without_color': 0,
+            'color_samples': [], 'attribute_samples': [], 'samples': samples}
+
+
+def _record(report, node_id, color, attributes):
+    """颜色校验：统计有/无 viz 颜色的节点，保留前几个节点的颜色和属性样例"""
+    report['nodes'] += 1
+    report['nodes_with_color' if color is not None else 'nodes_without_color'] += 1
+    if len(report['color_samples']) < report['samples']:
+        report['color_samples'].append((node_id, color))
+    if len(report['attribute_samples']) < 3:
+        report['attribute_samples'].append((node_id, attributes))
+
+
+def _xml_type(values):
+    """一列属性值的 GEXF 类型（混合类型时按字符串写出）"""
+    if all(isinstance(v, (bool, np.bool_)) for v in values):
+        return 'boolean'
+    numeric = [isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in values]
+    if not all(numeric):
+        return 'string'
+    return 'long' if all(isinstance(v, (int, np.integer)) for v in values) else 'double'
+
+
+def _encode(value, attr_type):
+    if attr_type == 'boolean':
+        return 'true' if value else 'false'
+    if attr_type == 'double':
+        return repr(float(value))
+    if attr_type == 'long':
+        return str(int(value))
+    return str(value)
+
+
+def _attribute_definitions(records, reserved):
+    """收集属性列：标题 -> (ID, 类型)"""
+    columns = {}
+    for data in records:
+        for key, value in data.items():
+            if key not in reserved and value is not None:
+                columns.setdefault(key, []).append(value)
+    return {key: (str(i), _xml_type(values)) for i, (key, values) in enumerate(columns.items())}
+
+
+def _write_attributes(f, attr_class, definitions):
+    if not definitions:
+        return
+    f.write(f'    <attributes mode="static" class="{attr_class}">\n')
+    for title, (attr_id, attr_type) in definitions.items():
+        f.write(f'      <attribute id="{attr_id}" title={quoteattr(str(title))} type="{attr_type}" />\n')
+    f.write('    </attributes>\n')
+
+
+def _write_attvalues(f, data, definitions, indent):
+    """写出 attvalues，返回读回时的属性字典 {标题: 值} 与写出的 (ID, 字符串值) 列表"""
+    encoded = [(title, attr_id, attr_type, _encode(v, attr_type))
+               for title, (attr_id, attr_type) in definitions.items()
+               for v in (data.get(title),) if v is not None]
+    if not encoded:
+        return {}, []
+    f.write(f'{indent}<attvalues>\n')
+    for _, attr_id, _, value in encoded:
+        f.write(f'{indent}  <attvalue for="{attr_id}" value={quoteattr(value)} />\n')
+    f.write(f'{indent}</attvalues>\n')
+    return ({title: _decode(value, attr_type) for title, _, attr_type, value in encoded},
+            [(attr_id, value) for _, attr_id, _, value in encoded])
+
+
+def _normalize_viz(viz):
+    """viz 属性按写出的精度规整（即读回时得到的值）"""
+    normalized = {}
+    if viz.get('color') is not None:
+        color = viz['color']
+        normalized['color'] = {'r': int(color['r']), 'g': int(color['g']), 'b': int(color['b']),
+                               'a': float(color.get('a', 1.0))}
+    for key in ('size', 'thickness'):
+        if key in viz:
+            normalized[key] = float(viz[key])
+    if 'shape' in viz:
+        normalized['shape'] = str(viz['shape'])
+    if viz.get('position') is not None:
+        normalized['position'] = {axis: float(viz['position'].get(axis, 0)) for axis in ('x', 'y', 'z')}
+    return normalized
+
+
+def _viz_key(viz):
+    """viz 字典内容的可哈希键，内容相同的节点共用规整结果"""
+    color, position = viz.get('color'), viz.get('position')
+    return (None if color is None else tuple(sorted(color.items())),
+            viz.get('size'), viz.get('thickness'), viz.get('shape'),
+            None if position is None else tuple(sorted(position.items())))
+
+
+def _viz_xml(viz):
+    """规整后的 viz 属性对应的 XML 片段"""
+    lines = []
+    color = viz.get('color')
+    if color is not None:
+        lines.append(f'        <viz:color r="{color["r"]}" g="{color["g"]}" b="{color["b"]}" a="{color["a"]}" />\n')
+    if 'size' in viz:
+        lines.append(f'        <viz:size value="{viz["size"]}" />\n')
+    if 'thickness' in viz:
+        lines.append(f'        <viz:thickness value="{viz["thickness"]}" />\n')
+    if 'shape' in viz:
+        shape = viz['shape']
+        shape = f'value="image" uri={quoteattr(shape)}' if shape.startswith('http') else f'value={quoteattr(shape)}'
+        lines.append(f'        <viz:shape {shape} />\n')
+    position = viz.get('position')
+    if position is not None:
+        lines.append(f'        <viz:position x="{position["x"]}" y="{position["y"]}" z="{position["z"]}" />\n')
+    return ''.join(lines)
+
+
+def write_gexf(G, path, sidecar=True, samples=5):
+    """
+    流式写出 GEXF 1.2，同一遍中完成 viz 颜色校验
+
+    Args:
+        sidecar: 同时写出 .graph.npz 附属文件
+        samples: 颜色校验报告中保留的节点样例数
+
+    Returns:
+        颜色校验报告 {'nodes', 'edges', 'nodes_with_color', 'nodes_without_color',
+                      'color_samples', 'attribute_samples'}
+    """
+    node_definitions = _attribute_definitions((G.nodes[n] for n in G), _NODE_RESERVED)
+    edge_definitions = _attribute_definitions((data for _, _, data in G.edges(data=True)), _EDGE_RESERVED)
+    report = _new_report(samples)
+    edge_type = 'directed' if G.is_directed() else 'undirected'
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        f.write(f'<gexf xmlns="{GEXF_NAMESPACE}" xmlns:viz="{VIZ_NAMESPACE}" version="1.2">\n')
+        f.write(f'  <meta lastmodifieddate="{datetime.date.today().isoformat()}">\n'
+                f'    <creator>NetworkX {nx.__version__}</creator>\n  </meta>\n')
+        f.write(f'  <graph defaultedgetype="{edge_type}" mode="static" name={quoteattr(str(G.graph.get("name", "")))}>\n')
+        _write_attributes(f, 'node', node_definitions)
+        _write_attributes(f, 'edge', edge_definitions)
+
+        # 写出的同时记录读回时的节点/边数据，用于附属文件
+        nodes, node_data, edge_data = [], [], []
+        # viz 内容相同的节点（如按类型查表着色）只规整、格式化一次: 内容键 -> (规整结果, XML)
+        viz_cache = {}
+        f.write('    <nodes>\n')
+        for node in G:
+            data = G.nodes[node]
+            label = str(data.get('label', node))
+            f.write(f'      <node id={quoteattr(str(node))} label={quoteattr(label)}>\n')
+            read_back, attributes = _write_attvalues(f, data, node_definitions, '        ')
+            viz, viz_xml = {}, ''
+            if isinstance(data.get('viz'), dict):
+                key = _viz_key(data['viz'])
+                if key not in viz_cache:
+                    normalized = _normalize_viz(data['viz'])
+                    viz_cache[key] = (normalized, _viz_xml(normalized))
+                viz, viz_xml = viz_cache[key]
+            if viz:
+                f.write(viz_xml)
+                read_back['viz'] = viz
+            f.write('      </node>\n')
+            read_back['label'] = label
+            nodes.append(str(node))
+            node_data.append(read_back)
+            color = viz.get('color')
+            _record(report, str(node), None if color is None else tuple(str(color[c]) for c in 'rgb'), attributes)
+        f.write('    </nodes>\n')
+
+        f.write('    <edges>\n')
+        for i, (u, v, data) in enumerate(G.edges(data=True)):
+            edge_id = str(data.get('id', i))
+            extra = ''
+            if 'weight' in data:
+                extra += f' weight="{float(data["weight"])}"'
+            if 'label' in data:
+                extra += f' label={quoteattr(str(data["label"]))}'
+            f.write(f'      <edge source={quoteattr(str(u))} target={quoteattr(str(v))} '
+                    f'id={quoteattr(edge_id)}{extra}>\n')
+            read_back, _ = _write_attvalues(f, data, edge_definitions, '        ')
+            read_back['id'] = edge_id
+            if 'weight' in data:
+                read_back['weight'] = float(data['weight'])
+            if 'label' in data:
+                read_back['label'] = str(data['label'])
+            f.write('      </edge>\n')
+            edge_data.append(read_back)
+            report['edges'] += 1
+        f.write('    </edges>\n  </graph>\n</gexf>\n')
+    os.replace(tmp_path, path)
+
+    if sidecar:
+        index = {node: i for i, node in enumerate(G)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+        graph_attrs = {'mode': 'static', 'edge_default': {}}
+        if G.graph.get('name'):
+            graph_attrs['name'] = str(G.graph['name'])
+        if node_definitions:
+            graph_attrs['node_default'] = {}
+        save_sidecar(GraphArrays(nodes, node_data, edges, edge_data, G.is_directed(), graph_attrs), path)
+    return report
+
+
+def print_color_report(report):
+    """打印颜色校验结果（与原 verify_color_attributes 的输出格式一致）"""
+    print(f"检查前{report['samples']}个节点的颜色属性:")
+    print("-" * 60)
+    for node_id, color in report['color_samples']:
+        if color is not None:
+            print(f"节点 {node_id}: 颜色 (r={color[0]}, g={color[1]}, b={color[2]})")
+        else:
+            print(f"节点 {node_id}: 无viz颜色属性")
+    print(f"\n统计: {report['nodes_with_color']} 个节点有颜色, {report['nodes_without_color']} 个节点无颜色")
+    print("\n检查节点属性:")
+    for _, attributes in report['attribute_samples']:
+        for attr_id, value in attributes:
+            print(f"  属性: {attr_id} = {value}")
+
+
+# ---- 二进制附属文件 ----
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + '.graph.npz'
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def save_sidecar(arrays, source_path):
+    """写出 .graph.npz 附属文件，记录源文件的大小和修改时间"""
+    meta = {'version': SIDECAR_VERSION, 'directed': arrays.directed, 'graph': arrays.graph_attrs,
+            'source': _source_stamp(source_path)}
+    path = sidecar_path(source_path)
+    tmp_path = path + '.tmp.npz'
+    dumps = lambda obj: np.array(json.dumps(obj, ensure_ascii=False, default=_json_default))
+    np.savez(tmp_path, edges=arrays.edges, nodes=dumps(arrays.nodes), node_data=dumps(arrays.node_data),
+             edge_data=dumps(arrays.edge_data), edge_keys=dumps(arrays.edge_keys), meta=dumps(meta))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_sidecar(source_path):
+    """源文件未变时读取附属文件，否则返回 None"""
+    path = sidecar_path(source_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != SIDECAR_VERSION or meta.get('source') != _source_stamp(source_path):
+                return None
+            return GraphArrays(json.loads(str(data['nodes'])), json.loads(str(data['node_data'])),
+                               data['edges'], json.loads(str(data['edge_data'])),
+                               meta['directed'], meta['graph'], json.loads(str(data['edge_keys'])))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠ 附属文件读取失败，重新解析GEXF: {e}")
+        return None
+
+
+def load_graph_arrays(path):
+    """优先读取附属文件，失效时流式解析 GEXF 并重写附属文件"""
+    arrays = load_sidecar(path)
+    if arrays is None:
+        arrays = read_gexf_arrays(path)
+        try:
+            save_sidecar(arrays, path)
+        except OSError as e:
+            print(f"⚠ 无法写入附属文件: {e}")
+    return arrays
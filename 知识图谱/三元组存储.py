@@ -0,0 +1,180 @@
+# 三元组存储.py
+"""
+紧凑的三元组存储
+
+实体和关系字符串驻留(intern)为整数ID，三元组按列保存在三个 array('I') 中，
+插入时通过整数键的哈希索引完成O(1)去重。
+"""
+from array import array
+from collections import defaultdict
+
+
+class TripletStore:
+    """整数ID三元组存储，插入即去重"""
+
+    # 打包去重键时每个ID占用的位数（array('I') 为32位无符号整数）
+    _ID_BITS = 32
+
+    def __init__(self):
+        # 字符串驻留表：实体与关系共用一张表，ID即为在 strings 中的下标
+        self.strings = []
+        self._string_ids = {}
+
+        # 三列存储
+        self.subjects = array('I')
+        self.relations = array('I')
+        self.objects = array('I')
+
+        # 去重哈希索引：打包后的整数键
+        self._index = set()
+
+        # 按主语/宾语的行号索引，首次查询时构建
+        self._by_subject = None
+        self._by_object = None
+
+        # 插入监听器，每条新三元组写入后回调 (行号, 主语ID, 关系ID, 宾语ID)
+        self._listeners = []
+
+    def intern(self, value):
+        """返回字符串对应的整数ID，不存在时分配新ID"""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self._string_ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+    def lookup_id(self, value):
+        """查询字符串的ID，不存在时返回None"""
+        return self._string_ids.get(value)
+
+    def add(self, subject, relation, obj):
+        """
+        添加一个三元组
+
+        Returns:
+            True 表示新插入，False 表示重复被忽略
+        """
+        s = self.intern(subject)
+        r = self.intern(relation)
+        o = self.intern(obj)
+
+        key = (((s << self._ID_BITS) | r) << self._ID_BITS) | o
+        if key in self._index:
+            return False
+        self._index.add(key)
+
+        row = len(self.subjects)
+        self.subjects.append(s)
+        self.relations.append(r)
+        self.objects.append(o)
+
+        if self._by_subject is not None:
+            self._by_subject[s].append(row)
+            self._by_object[o].append(row)
+
+        for listener in self._listeners:
+            listener(row, s, r, o)
+        return True
+
+    def append(self, triplet):
+        """兼容 list.append 的写法: store.append((主语, 关系, 宾语))"""
+        return self.add(*triplet)
+
+    def extend(self, triplets):
+        """批量添加三元组，返回新插入的数量"""
+        return sum(1 for triplet in triplets if self.add(*triplet))
+
+    def subscribe(self, listener):
+        """注册新三元组插入时的回调"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """移除插入回调"""
+        self._listeners.remove(listener)
+
+    def row(self, index):
+        """返回第 index 行的字符串三元组"""
+        strings = self.strings
+        return (strings[self.subjects[index]],
+                strings[self.relations[index]],
+                strings[self.objects[index]])
+
+    def _build_entity_index(self):
+        """构建主语/宾语到行号的索引"""
+        self._by_subject = defaultdict(list)
+        self._by_object = defaultdict(list)
+        for row, (s, o) in enumerate(zip(self.subjects, self.objects)):
+            self._by_subject[s].append(row)
+            self._by_object[o].append(row)
+
+    def by_subject(self, subject):
+        """查询以 subject 为主语的全部三元组"""
+        if self._by_subject is None:
+            self._build_entity_index()
+        s = self._string_ids.get(subject)
+        if s is None:
+            return []
+        return [self.row(i) for i in self._by_subject.get(s, ())]
+
+    def by_object(self, obj):
+        """查询以 obj 为宾语的全部三元组"""
+        if self._by_object is None:
+            self._build_entity_index()
+        o = self._string_ids.get(obj)
+        if o is None:
+            return []
+        return [self.row(i) for i in self._by_object.get(o, ())]
+
+    def entity_ids(self):
+        """返回作为主语或宾语出现过的全部实体ID（按首次出现顺序）"""
+        seen = set()
+        ordered = []
+        for s, o in zip(self.subjects, self.objects):
+            for entity_id in (s, o):
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    ordered.append(entity_id)
+        return ordered
+
+    def relation_counts(self):
+        """按关系统计三元组数量"""
+        counts = defaultdict(int)
+        for r in self.relations:
+            counts[r] += 1
+        return {self.strings[r]: count for r, count in counts.items()}
+
+    def as_numpy(self):
+        """以NumPy数组的形式返回三列（零拷贝）"""
+        import numpy as np
+        return (np.frombuffer(self.subjects, dtype=np.uint32),
+                np.frombuffer(self.relations, dtype=np.uint32),
+                np.frombuffer(self.objects, dtype=np.uint32))
+
+    def clear(self):
+        """清空存储（保留已注册的回调）"""
+        listeners = self._listeners
+        self.__init__()
+        self._listeners = listeners
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __iter__(self):
+        strings = self.strings
+        for s, r, o in zip(self.subjects, self.relations, self.objects):
+            yield (strings[s], strings[r], strings[o])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.row(index)
+
+    def __contains__(self, triplet):
+        ids = [self._string_ids.get(value) for value in triplet]
+        if None in ids:
+            return False
+        s, r, o = ids
+        return ((((s << self._ID_BITS) | r) << self._ID_BITS) | o) in self._index
@@ -2,13 +2,13 @@
 import os
 import pandas as pd
 import networkx as nx
-import matplotlib.pyplot as plt
 import glob
-import json
-import ast
-from neo4j import GraphDatabase
 from typing import Dict, List, Optional, Any
-import xml.etree.ElementTree as ET
+
+from 快照注册表 import SnapshotRegistry
+import 图构建
+import GEXF流式读写
+from 网络指标服务 import NetworkMetrics
 
 
 class StardewValleyAnalyzer:
@@ -24,53 +24,34 @@ class StardewValleyAnalyzer:
     }
     
     # 节点ID字段优先级
-    ID_COLUMNS = ['id', 'entity_id', 'ID', 'Id']
-    NAME_COLUMNS = ['name', 'entity_name', 'Name', 'label']
-    TYPE_COLUMNS = ['type', 'Type', 'category', 'label']
+    ID_COLUMNS = 图构建.ID_COLUMNS
+    NAME_COLUMNS = 图构建.NAME_COLUMNS
+    TYPE_COLUMNS = 图构建.TYPE_COLUMNS
     
-    def __init__(self, export_dir: str = r"C:\Users\34167\exports"):
+    def __init__(self, export_dir: str = r"C:\Users\34167\exports", version: str = 'latest',
+                 compact_export: bool = False):
         self.export_dir = export_dir
+        self.version = version
+        self.compact_export = compact_export  # True 时GEXF只写viz颜色/大小，不写冗余的颜色属性
+        self.registry = SnapshotRegistry(export_dir)
+        self.snapshot: Optional[Dict[str, Any]] = None
         self.G = nx.Graph()
         self.name_to_id: Dict[str, str] = {}
         
     @staticmethod
     def parse_attribute_string(attr_str: str) -> Dict[str, Any]:
         """解析属性字符串为字典"""
-        if pd.isna(attr_str) or not isinstance(attr_str, str):
-            return {}
-        
-        try:
-            # 尝试JSON解析
-            try:
-                cleaned = attr_str.replace("'", '"').replace("nan", "null")
-                return json.loads(cleaned)
-            except json.JSONDecodeError:
-                # 尝试Python字典解析
-                try:
-                    return ast.literal_eval(attr_str)
-                except:
-                    # 手动解析
-                    result = {}
-                    content = attr_str.strip('{}')
-                    pairs = [pair.strip() for pair in content.split(',') if pair.strip()]
-                    
-                    for pair in pairs:
-                        if ':' in pair:
-                            key, val = pair.split(':', 1)
-                            key = key.strip().strip('"').strip("'")
-                            val = val.strip().strip('"').strip("'")
-                            if val.lower() != 'nan' and val != '':
-                                result[key] = val
-                    return result
-        except Exception as e:
-            print(f"属性解析警告: {e}")
+        if not isinstance(attr_str, str):
             return {}
+        return 图构建.parse_attribute_string(attr_str)
     
     def query_neo4j_relationships(self) -> List[Dict[str, Any]]:
         """直接从Neo4j数据库查询关系数据"""
         print("=== 直接从Neo4j查询关系数据 ===")
         
         try:
+            from neo4j import GraphDatabase  # 只有查询数据库时才需要 neo4j 驱动
+            
             driver = GraphDatabase.driver(
                 "bolt://localhost:7687", 
                 auth=("neo4j", "606588ZXzx@")
@@ -143,7 +124,15 @@ class StardewValleyAnalyzer:
         return df
     
     def find_latest_files(self) -> tuple[str, str]:
-        """查找最新的数据文件"""
+        """查找最新（或指定版本）的数据文件，优先使用快照清单"""
+        if self.registry.exists():
+            snapshot = self.registry.get(self.version)
+            if snapshot is None:
+                raise FileNotFoundError(f"快照清单中没有版本: {self.version}")
+            self.snapshot = snapshot
+            return self.registry.path(snapshot, 'nodes'), self.registry.path(snapshot, 'relations')
+        
+        # 兼容没有清单的旧导出目录
         node_files = glob.glob(os.path.join(self.export_dir, "stardew_valley_graph_*_nodes.csv"))
         
         if not node_files:
@@ -162,9 +151,13 @@ class StardewValleyAnalyzer:
             print(f"使用节点文件: {node_file}")
             print(f"使用关系文件: {relation_file}")
             
-            # 读取数据
-            nodes_df = pd.read_csv(node_file)
-            relations_df = pd.read_csv(relation_file)
+            # 读取数据（登记过的快照按内容哈希缓存，已解析过的不再重复读取CSV）
+            if self.snapshot is not None:
+                nodes_df = self.registry.load_table(self.snapshot, 'nodes')
+                relations_df = self.registry.load_table(self.snapshot, 'relations')
+            else:
+                nodes_df = pd.read_csv(node_file)
+                relations_df = pd.read_csv(relation_file)
             print(f"成功读取: {len(nodes_df)} 个节点, {len(relations_df)} 个关系")
             
             # 检查关系文件
@@ -216,177 +209,89 @@ class StardewValleyAnalyzer:
         return True
     
     def _add_nodes(self, nodes_df: pd.DataFrame) -> None:
-        """添加节点到网络"""
+        """添加节点到网络（整表解析ID/名称/类型，属性按唯一值批量解析）"""
         print("\n=== 添加节点 ===")
         
-        for index, row in nodes_df.iterrows():
-            attrs = self.parse_attribute_string(row.get('attributes', ''))
-            
-            # 确定节点ID
-            node_id = self._extract_value(row, attrs, self.ID_COLUMNS, f"node_{index}")
-            
-            # 获取节点信息
-            node_name = self._extract_value(row, attrs, self.NAME_COLUMNS, "")
-            node_type = self._extract_value(row, attrs, self.TYPE_COLUMNS, "Unknown")
-            
-            # 添加节点
-            self.G.add_node(node_id, name=node_name, type=node_type, attributes=attrs)
-            if node_name:
-                self.name_to_id[node_name] = node_id
-            
-            if index < 3:  # 显示前3个节点
-                print(f"  添加节点: ID={node_id}, 名称={node_name}, 类型={node_type}")
+        nodes, name_to_id = 图构建.add_nodes_from_table(self.G, nodes_df, self.ID_COLUMNS)
+        self.name_to_id.update(name_to_id)
+        
+        for node_id, node_name, node_type in nodes[['id', 'name', 'type']].head(3).itertuples(index=False):
+            print(f"  添加节点: ID={node_id}, 名称={node_name}, 类型={node_type}")
         
         print(f"成功添加 {self.G.number_of_nodes()} 个节点")
     
-    def _extract_value(self, row: pd.Series, attrs: Dict, columns: List[str], default: Any) -> Any:
-        """从行数据或属性中提取值"""
-        for col in columns:
-            if col in row and pd.notna(row[col]):
-                return str(row[col])
-            elif col in attrs and attrs[col]:
-                return str(attrs[col])
-        return default
-    
     def _add_edges(self, relations_df: pd.DataFrame) -> None:
-        """添加边到网络"""
+        """添加边到网络（整列解析端点，批量加入）"""
         print("\n=== 添加边关系 ===")
-        edges_added = 0
         
-        for index, row in relations_df.iterrows():
-            source_id = self._find_node_id(row, 'source')
-            target_id = self._find_node_id(row, 'target')
-            
-            if source_id and target_id and source_id in self.G and target_id in self.G:
-                relation_type = self._extract_relation_type(row)
-                
-                if not self.G.has_edge(source_id, target_id):
-                    self.G.add_edge(source_id, target_id, relation=relation_type)
-                    edges_added += 1
-                    
-                    if edges_added <= 3:  # 显示前3条边
-                        src_name = self.G.nodes[source_id].get('name', source_id)
-                        tgt_name = self.G.nodes[target_id].get('name', target_id)
-                        print(f"  添加边: {src_name} --[{relation_type}]--> {tgt_name}")
+        edges = 图构建.add_edges_from_table(self.G, relations_df, self.name_to_id)
         
-        print(f"成功添加 {edges_added} 条边")
-        print(f"最终网络: {self.G.number_of_nodes()} 节点, {self.G.number_of_edges()} 边")
-    
-    def _find_node_id(self, row: pd.Series, prefix: str) -> Optional[str]:
-        """查找节点ID"""
-        # 尝试多种列名组合
-        for col_suffix in ['', '_id', '_name']:
-            col_name = f"{prefix}{col_suffix}"
-            if col_name in row and pd.notna(row[col_name]):
-                value = str(row[col_name])
-                
-                # 直接匹配节点ID
-                if value in self.G:
-                    return value
-                
-                # 通过名称映射
-                if value in self.name_to_id:
-                    return self.name_to_id[value]
+        for source_id, target_id, relation_type in edges.head(3).itertuples(index=False):
+            src_name = self.G.nodes[source_id].get('name', source_id)
+            tgt_name = self.G.nodes[target_id].get('name', target_id)
+            print(f"  添加边: {src_name} --[{relation_type}]--> {tgt_name}")
         
-        return None
-    
-    def _extract_relation_type(self, row: pd.Series) -> str:
-        """提取关系类型"""
-        for col in ['relation', 'relation_type', 'type']:
-            if col in row and pd.notna(row[col]):
-                return str(row[col])
-        return "Unknown"
+        print(f"成功添加 {len(edges)} 条边")
+        print(f"最终网络: {self.G.number_of_nodes()} 节点, {self.G.number_of_edges()} 边")
     
-    def _add_color_attributes(self) -> None:
-        """为节点添加Gephi兼容的颜色属性 - 修复版"""
-        print("\n=== 添加颜色属性 ===")
-        
-        for node_id in self.G.nodes():
-            node_type = self.G.nodes[node_id].get('type', 'Unknown')
-            scheme = self.COLOR_SCHEME.get(node_type, self.COLOR_SCHEME['Unknown'])
-            
-            # 获取颜色值
+    @classmethod
+    def color_lookup(cls, compact: bool = False) -> Dict[str, Dict[str, Any]]:
+        """按类型预先计算的节点颜色属性表（每种类型只解析一次十六进制颜色）"""
+        lookup = {}
+        for node_type, scheme in cls.COLOR_SCHEME.items():
             color_hex = scheme['color']
+            r, g, b = (int(color_hex[i:i + 2], 16) for i in (1, 3, 5))
             
-            # 转换为RGB整数
-            r = int(color_hex[1:3], 16)  # 红色分量
-            g = int(color_hex[3:5], 16)  # 绿色分量
-            b = int(color_hex[5:7], 16)  # 蓝色分量
-            
-            # 方法1: 添加GEXF标准viz属性（Gephi首选）
-            self.G.nodes[node_id]['viz'] = {
-                'color': {
-                    'r': r,
-                    'g': g, 
-                    'b': b,
-                    'a': 1.0  # 透明度
-                },
-                'size': scheme['size']
-            }
+            # 方法1: GEXF标准viz属性（Gephi首选）
+            attributes = {'viz': {'color': {'r': r, 'g': g, 'b': b, 'a': 1.0}, 'size': scheme['size']}}
             
-            # 方法2: 添加单独的颜色属性（兼容性）
-            self.G.nodes[node_id]['color'] = color_hex
-            self.G.nodes[node_id]['r'] = r
-            self.G.nodes[node_id]['g'] = g
-            self.G.nodes[node_id]['b'] = b
-            self.G.nodes[node_id]['size'] = scheme['size']
-            self.G.nodes[node_id]['node_type'] = node_type  # 添加明确的类型属性
-            
-        print(f"已为 {self.G.number_of_nodes()} 个节点添加颜色属性")
+            # 方法2: 单独的颜色属性（兼容性，紧凑模式不写）
+            if not compact:
+                attributes.update({'color': color_hex, 'r': r, 'g': g, 'b': b,
+                                   'size': scheme['size'], 'node_type': node_type})
+            lookup[node_type] = attributes
+        return lookup
+    
+    def _add_color_attributes(self, compact: Optional[bool] = None) -> None:
+        """
+        为节点添加Gephi兼容的颜色属性 - 修复版
+        
+        颜色按类型查表后整组写入，每个节点持有独立的viz副本，可单独修改。
+        compact 为 True 时只写viz，None 时取 self.compact_export。
+        """
+        print("\n=== 添加颜色属性 ===")
+        
+        compact = self.compact_export if compact is None else compact
+        lookup = self.color_lookup(compact)
+        
+        nodes_by_type: Dict[str, List[str]] = {}
+        for node_id, node_type in self.G.nodes(data='type', default='Unknown'):
+            nodes_by_type.setdefault(node_type, []).append(node_id)
+        
+        for node_type, node_ids in nodes_by_type.items():
+            attributes = lookup.get(node_type, lookup['Unknown'])
+            if not compact:
+                attributes = dict(attributes, node_type=node_type)  # 添加明确的类型属性
+            viz = attributes['viz']
+            nx.set_node_attributes(self.G, {
+                node_id: dict(attributes, viz=dict(viz, color=dict(viz['color']))) for node_id in node_ids})
+            
+        print(f"已为 {self.G.number_of_nodes()} 个节点添加颜色属性" + ("（仅viz）" if compact else ""))
         
         # 显示颜色映射
         print("\n颜色映射:")
         for node_type, scheme in self.COLOR_SCHEME.items():
             print(f"  {node_type}: {scheme['color']} (大小: {scheme['size']})")
     
-    def verify_color_attributes(self, output_file: str) -> None:
-        """验证颜色属性是否正确设置"""
+    def verify_color_attributes(self, output_file: str, report: Optional[Dict[str, Any]] = None) -> None:
+        """验证颜色属性是否正确设置（report 为写出时得到的校验结果，没有时流式扫描文件）"""
         print(f"\n=== 验证GEXF颜色属性 ===")
         print(f"检查文件: {output_file}")
         
         try:
-            # 读取GEXF文件检查属性
-            tree = ET.parse(output_file)
-            root = tree.getroot()
-            
-            # 检查是否有viz属性
-            namespaces = {'viz': 'http://www.gexf.net/1.2draft/viz'}
-            nodes_with_color = 0
-            nodes_without_color = 0
-            
-            print("检查前5个节点的颜色属性:")
-            print("-" * 60)
-            
-            for i, node in enumerate(root.findall('.//node')):
-                if i >= 5:  # 只检查前5个
-                    break
-                    
-                node_id = node.get('id')
-                viz_color = node.find('viz:color', namespaces)
-                
-                if viz_color is not None:
-                    r = viz_color.get('r')
-                    g = viz_color.get('g')
-                    b = viz_color.get('b')
-                    print(f"节点 {node_id}: 颜色 (r={r}, g={g}, b={b})")
-                    nodes_with_color += 1
-                else:
-                    print(f"节点 {node_id}: 无viz颜色属性")
-                    nodes_without_color += 1
-            
-            print(f"\n统计: {nodes_with_color} 个节点有颜色, {nodes_without_color} 个节点无颜色")
-            
-            # 检查属性
-            print("\n检查节点属性:")
-            for i, node in enumerate(root.findall('.//node')):
-                if i >= 3:
-                    break
-                node_id = node.get('id')
-                attrs = node.find('attvalues')
-                if attrs is not None:
-                    for attr in attrs.findall('attvalue'):
-                        print(f"  属性: {attr.get('for')} = {attr.get('value')}")
-            
+            if report is None:
+                report = GEXF流式读写.scan_viz_colors(output_file)
+            GEXF流式读写.print_color_report(report)
         except Exception as e:
             print(f"验证颜色属性失败: {e}")
     
@@ -401,8 +306,9 @@ class StardewValleyAnalyzer:
         
         try:
             # 计算中心性指标
-            degree_centrality = nx.degree_centrality(self.G)
-            betweenness = nx.betweenness_centrality(self.G)
+            metrics = NetworkMetrics(self.G)
+            degree_centrality = metrics.degree_centrality()
+            betweenness = metrics.betweenness()
             print("中心性计算完成")
             
             # 获取重要节点排名
@@ -473,13 +379,13 @@ class StardewValleyAnalyzer:
             # 添加颜色属性
             self._add_color_attributes()
             
-            # 保存GEXF文件
+            # 流式保存GEXF文件，写出时同时完成颜色校验并生成 .graph.npz 附属文件
             output_file = "stardew_valley_network_colored.gexf"
-            nx.write_gexf(self.G, output_file)
+            report = GEXF流式读写.write_gexf(self.G, output_file)
             print(f"\n网络图已保存为: {output_file}")
             
             # 验证颜色属性
-            self.verify_color_attributes(output_file)
+            self.verify_color_attributes(output_file, report)
             
             # 生成Gephi使用说明
             self._generate_gephi_instructions(output_file)
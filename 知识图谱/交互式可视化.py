@@ -1,28 +1,19 @@
 # 创建交互式可视化.py
-import plotly.graph_objects as go
-import networkx as nx
-import pandas as pd
+import numpy as np
 
-# 读取GEXF文件
-G = nx.read_gexf("stardew_valley_network_complete.gexf")
+from 布局缓存 import layout_array
+from 网络指标服务 import load_graph
 
-print(f"网络图: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
+GEXF_FILE = "stardew_valley_network_complete.gexf"
 
 # 创建交互式可视化
 def create_interactive_network(G, output_file="stardew_valley_interactive.html"):
-    # 使用力导向布局
-    pos = nx.spring_layout(G, k=1, iterations=50)
+    import plotly.graph_objects as go
+    from 网络图轨迹 import network_traces, write_network_html
     
-    # 准备边数据
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
+    # 使用力导向布局（按图哈希缓存，与其他图形坐标一致）
+    nodes, positions = layout_array(G)
     
-    # 准备节点数据
-    node_x, node_y, node_text, node_colors, node_sizes = [], [], [], [], []
     color_map = {
         'NPC': '#FF6B6B',      # 红色
         'Quest': '#4ECDC4',    # 青色  
@@ -30,41 +21,13 @@ def create_interactive_network(G, output_file="stardew_valley_interactive.html")
         'Location': '#A5ABB6'  # 灰色
     }
     
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        
-        # 节点信息
-        node_data = G.nodes[node]
-        node_name = node_data.get('name', str(node))
-        node_type = node_data.get('type', 'Unknown')
-        degree = G.degree(node)
-        
-        node_text.append(f"<b>{node_name}</b><br>类型: {node_type}<br>连接数: {degree}")
-        node_colors.append(color_map.get(node_type, '#CCCCCC'))
-        node_sizes.append(max(10, min(30, degree * 2)))  # 根据连接数调整大小
+    # 根据连接数调整大小
+    degrees = np.array([G.degree(node) for node in nodes])
+    node_sizes = np.clip(degrees * 2, 10, 30)
     
-    # 创建边轨迹
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=0.5, color='#888'),
-        hoverinfo='none',
-        mode='lines'
-    )
-    
-    # 创建节点轨迹
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers',
-        hoverinfo='text',
-        text=node_text,
-        marker=dict(
-            color=node_colors,
-            size=node_sizes,
-            line=dict(width=2, color='darkgray')
-        )
-    )
+    # WebGL 边/节点轨迹，节点详细属性写入附属JSON按需加载
+    edge_trace, node_trace, nodes = network_traces(G, positions, nodes, color_map,
+                                                   default_color='#CCCCCC', sizes=node_sizes)
     
     # 创建图形
     fig = go.Figure(data=[edge_trace, node_trace],
@@ -85,9 +48,14 @@ def create_interactive_network(G, output_file="stardew_valley_interactive.html")
                    ))
     
     # 保存为HTML文件
-    fig.write_html(output_file)
-    print(f"交互式可视化已保存: {output_file}")
+    sidecar = write_network_html(fig, G, nodes, output_file)
+    print(f"交互式可视化已保存: {output_file}（节点属性: {sidecar}）")
     return output_file
 
-# 生成交互式可视化
-create_interactive_network(G)
+if __name__ == '__main__':
+    # 读取GEXF文件（流式解析，之后复用 .graph.npz 附属文件）
+    G = load_graph(GEXF_FILE)
+    print(f"网络图: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
+    
+    # 生成交互式可视化
+    create_interactive_network(G)
@@ -0,0 +1,419 @@
+# 力导向布局.py
+"""
+NumPy 向量化的 ForceAtlas2 布局（与 Gephi 中使用的算法一致）
+
+- 斥力：Barnes-Hut 式四叉树近似。四叉树按层展开为 2^l × 2^l 的均匀网格，
+  每层只计算"父格相邻、本格不相邻"的交互列表（质心 + 一阶展开），
+  展开逐层平移到子格，最细层的相邻格子之间精确计算
+- 引力：线性边引力 + 向心重力，速度按 ForceAtlas2 的 swing/traction 自适应
+- 多层粗化：随机匹配 + 未匹配节点并入邻居，逐层合并节点，先布局最粗的图，再逐层展开细化
+"""
+import math
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+# 节点数不超过该值时斥力直接两两精确计算
+EXACT_REPULSION_LIMIT = 500
+# 粗化到该节点数以下停止
+COARSEST_SIZE = 100
+# 本层节点数缩减比例不足时停止粗化
+MIN_COARSEN_RATIO = 0.85
+# 网格范围取 1%~99% 分位数并向外扩展一倍跨度，范围外的离群点（孤立节点、小分量）单独计算
+GRID_QUANTILE = 1.0
+# 离群点超过该比例时不再单独处理，网格覆盖全部节点
+MAX_OUTLIER_FRACTION = 0.05
+
+_NEAR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+# 近场只取一半邻格（加上本格内 i < j），每对节点只计算一次
+_HALF_NEAR_OFFSETS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+# 交互列表：父格相邻（含自身）的子格中与目标格不相邻的格子，按目标格坐标奇偶 (px, py) 分四种情况，各27个
+_FAR_OFFSETS = {
+    (px, py): [(dx, dy) for dx in range(-2 - px, 4 - px) for dy in range(-2 - py, 4 - py)
+               if max(abs(dx), abs(dy)) > 1]
+    for px in (0, 1) for py in (0, 1)
+}
+
+
+def _exact_repulsion(pos, mass):
+    """O(n²) 精确斥力 Σ m_i m_j r / |r|²"""
+    diff = pos[:, None, :] - pos[None, :, :]
+    d2 = np.einsum('ijk,ijk->ij', diff, diff)
+    np.fill_diagonal(d2, np.inf)
+    d2 = np.maximum(d2, 1e-9)
+    coef = mass[None, :] / d2
+    return mass[:, None] * np.einsum('ij,ijk->ik', coef, diff)
+
+
+def _near_pairs(flat, cx, cy, g):
+    """最细层中位于相邻（3×3）格子内的全部无序节点对 (i, j)，每对只出现一次"""
+    n = len(flat)
+    order = np.argsort(flat, kind='stable')
+    counts = np.bincount(flat, minlength=g * g)
+    starts = np.cumsum(counts) - counts
+
+    rows, cols = [], []
+    node_ids = np.arange(n)
+    for dx, dy in _HALF_NEAR_OFFSETS:
+        nx_, ny_ = cx + dx, cy + dy
+        inside = (nx_ >= 0) & (nx_ < g) & (ny_ >= 0) & (ny_ < g)
+        neighbor = nx_[inside] * g + ny_[inside]
+        cnt = counts[neighbor]
+        total = cnt.sum()
+        if total == 0:
+            continue
+        i = np.repeat(node_ids[inside], cnt)
+        within = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        j = order[np.repeat(starts[neighbor], cnt) + within]
+        keep = i < j if (dx, dy) == (0, 0) else slice(None)
+        rows.append(i[keep])
+        cols.append(j[keep])
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def _choose_levels(unit, max_levels=9):
+    """
+    选择最细层层数：在远场网格开销（约 27 × 格子数）与
+    近场节点对开销（Σ 每格节点数 × 3×3 邻域节点数）之间取最小
+    """
+    best_levels, best_cost = 2, math.inf
+    for levels in range(2, max_levels + 1):
+        g = 1 << levels
+        cell = np.minimum((unit * g).astype(np.int64), g - 1)
+        counts = np.bincount(cell[:, 0] * g + cell[:, 1], minlength=g * g).reshape(g, g).astype(np.float64)
+        padded = np.pad(counts, 1)
+        box = sum(padded[1 + dx:1 + dx + g, 1 + dy:1 + dy + g] for dx, dy in _NEAR_OFFSETS)
+        cost = 27 * g * g * 4 / 3 + 3 * float((counts * box).sum())
+        if cost < best_cost:
+            best_levels, best_cost = levels, cost
+        elif cost > 2 * best_cost:
+            break
+    return best_levels
+
+
+def _outlier_repulsion(pos, mass, core, outliers, lo, hi, cells=16):
+    """
+    离群点与主体之间的斥力
+
+    离群点距主体范围至少一个范围跨度，主体按 cells × cells 粗网格聚合为质心后与离群点精确交互；
+    离群点之间递归调用网格近似
+    """
+    force = np.zeros_like(pos)
+    span = np.maximum(hi - lo, 1e-9)
+    cell = np.clip(((pos[core] - lo) / span * cells).astype(np.int64), 0, cells - 1)
+    flat = cell[:, 0] * cells + cell[:, 1]
+    M = np.bincount(flat, mass[core], cells * cells)
+    occupied = M > 0
+    flat = np.searchsorted(np.flatnonzero(occupied), flat)
+    M = M[occupied]
+    com = np.column_stack([np.bincount(flat, mass[core] * pos[core, axis], len(M)) for axis in (0, 1)]) / M[:, None]
+
+    diff = pos[outliers, None, :] - com[None, :, :]
+    inv = 1 / np.maximum(np.einsum('ijk,ijk->ij', diff, diff), 1e-9)
+    force[outliers] = mass[outliers, None] * np.einsum('ij,ijk->ik', inv * M[None, :], diff)
+    # 反作用力：离群点在各粗网格质心处的场，乘以节点质量
+    field = -np.einsum('ij,ijk->jk', inv * mass[outliers, None], diff)
+    force[core] = mass[core, None] * field[flat]
+
+    sub_pos, sub_mass = pos[outliers], mass[outliers]
+    force[outliers] += (_exact_repulsion(sub_pos, sub_mass) if len(outliers) <= EXACT_REPULSION_LIMIT
+                        else _grid_repulsion(sub_pos, sub_mass))
+    return force
+
+
+def _grid_repulsion(pos, mass, levels=None):
+    """
+    分层网格（四叉树）近似斥力；levels 为 None 时按节点分布自动选择
+
+    少数远离主体的离群点会把包围盒撑大、使主体挤在少数格子里，
+    因此网格只覆盖分位数范围内的节点，离群点另行计算。
+    """
+    q_lo, q_hi = np.percentile(pos, [GRID_QUANTILE, 100 - GRID_QUANTILE], axis=0)
+    margin = q_hi - q_lo
+    outside = np.any((pos < q_lo - margin) | (pos > q_hi + margin), axis=1)
+    outliers = np.flatnonzero(outside)
+    if 0 < len(outliers) <= MAX_OUTLIER_FRACTION * len(pos):
+        core = np.flatnonzero(~outside)
+        force = _outlier_repulsion(pos, mass, core, outliers, q_lo - margin, q_hi + margin)
+        force[core] += _grid_repulsion_core(pos[core], mass[core], levels)
+        return force
+    return _grid_repulsion_core(pos, mass, levels)
+
+
+def _grid_repulsion_core(pos, mass, levels=None):
+    n = len(pos)
+    lo = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lo).max()), 1e-9) * (1 + 1e-9)
+    unit = (pos - lo) / span
+    if levels is None:
+        levels = _choose_levels(unit)
+
+    parent = None
+    for level in range(2, levels + 1):
+        g = 1 << level
+        cell = np.minimum((unit * g).astype(np.int64), g - 1)
+        cx, cy = cell[:, 0], cell[:, 1]
+        flat = cx * g + cy
+
+        M = np.bincount(flat, mass, g * g)
+        occupied = M > 0
+        safe_M = np.where(occupied, M, 1.0)
+        centers = (np.arange(g) + 0.5) / g * span
+        comx = np.where(occupied, np.bincount(flat, mass * pos[:, 0], g * g) / safe_M,
+                        np.repeat(centers + lo[0], g))
+        comy = np.where(occupied, np.bincount(flat, mass * pos[:, 1], g * g) / safe_M,
+                        np.tile(centers + lo[1], g))
+        M, comx, comy = M.reshape(g, g), comx.reshape(g, g), comy.reshape(g, g)
+
+        # 交互列表内源格对目标格质心处的场及其一阶导数（按目标格奇偶分组，步长2切片）
+        Fx, Fy = np.zeros((g, g)), np.zeros((g, g))
+        Jxx, Jxy, Jyy = np.zeros((g, g)), np.zeros((g, g)), np.zeros((g, g))
+        Mp, comxp, comyp = np.pad(M, 3), np.pad(comx, 3), np.pad(comy, 3)
+        half = g // 2
+        for (px, py), offsets in _FAR_OFFSETS.items():
+            tx, ty = comx[px::2, py::2], comy[px::2, py::2]
+            fx, fy = np.zeros((half, half)), np.zeros((half, half))
+            jxx, jxy, jyy = np.zeros((half, half)), np.zeros((half, half)), np.zeros((half, half))
+            for dx, dy in offsets:
+                window = (slice(3 + px + dx, 3 + px + dx + g, 2), slice(3 + py + dy, 3 + py + dy + g, 2))
+                rx = tx - comxp[window]
+                ry = ty - comyp[window]
+                d2 = rx * rx + ry * ry + 1e-12
+                inv = Mp[window] / d2
+                inv2 = 2 * inv / d2
+                fx += inv * rx
+                fy += inv * ry
+                jxx += inv - inv2 * rx * rx
+                jxy -= inv2 * rx * ry
+                jyy += inv - inv2 * ry * ry
+            Fx[px::2, py::2], Fy[px::2, py::2] = fx, fy
+            Jxx[px::2, py::2], Jxy[px::2, py::2], Jyy[px::2, py::2] = jxx, jxy, jyy
+
+        # 父格展开平移到子格质心
+        if parent is not None:
+            up = lambda a: np.repeat(np.repeat(a, 2, axis=0), 2, axis=1)
+            pFx, pFy, pJxx, pJxy, pJyy, pcomx, pcomy = (up(a) for a in parent)
+            ddx, ddy = comx - pcomx, comy - pcomy
+            Fx += pFx + pJxx * ddx + pJxy * ddy
+            Fy += pFy + pJxy * ddx + pJyy * ddy
+            Jxx += pJxx
+            Jxy += pJxy
+            Jyy += pJyy
+        parent = (Fx, Fy, Jxx, Jxy, Jyy, comx, comy)
+
+    # 远场：在最细层格子处按一阶展开求值
+    Fx, Fy, Jxx, Jxy, Jyy, comx, comy = (a.ravel()[flat] for a in parent)
+    ddx, ddy = pos[:, 0] - comx, pos[:, 1] - comy
+    force = np.empty_like(pos)
+    force[:, 0] = mass * (Fx + Jxx * ddx + Jxy * ddy)
+    force[:, 1] = mass * (Fy + Jxy * ddx + Jyy * ddy)
+
+    # 近场：相邻格子内精确计算，作用力与反作用力成对累加
+    i, j = _near_pairs(flat, cx, cy, 1 << levels)
+    if len(i):
+        diff = pos[i] - pos[j]
+        d2 = np.maximum(np.einsum('ij,ij->i', diff, diff), 1e-9)
+        coef = mass[i] * mass[j] / d2
+        for axis in (0, 1):
+            pair_force = coef * diff[:, axis]
+            force[:, axis] += np.bincount(i, pair_force, n) - np.bincount(j, pair_force, n)
+    return force
+
+
+def forceatlas2(pos, edges, weights, mass, iterations=100, scaling=2.0, gravity=1.0,
+                strong_gravity=False, tolerance=1.0):
+    """
+    ForceAtlas2 迭代
+
+    Args:
+        pos: (n, 2) 初始坐标，原地更新
+        edges: (m, 2) 无向边端点下标
+        weights: (m,) 边权
+        mass: (n,) 节点质量（度数 + 1）
+    """
+    n = len(pos)
+    if n <= 1:
+        return pos
+    u, v = edges[:, 0], edges[:, 1]
+    speed, speed_efficiency = 1.0, 1.0
+    old_force = np.zeros_like(pos)
+
+    for _ in range(iterations):
+        if n <= EXACT_REPULSION_LIMIT:
+            force = scaling * _exact_repulsion(pos, mass)
+        else:
+            force = scaling * _grid_repulsion(pos, mass)
+
+        # 重力
+        if strong_gravity:
+            force -= gravity * mass[:, None] * pos
+        else:
+            dist = np.maximum(np.linalg.norm(pos, axis=1), 1e-9)
+            force -= (gravity * mass / dist)[:, None] * pos
+
+        # 线性边引力
+        if len(u):
+            pull = (pos[u] - pos[v]) * weights[:, None]
+            for axis in (0, 1):
+                force[:, axis] -= np.bincount(u, pull[:, axis], n)
+                force[:, axis] += np.bincount(v, pull[:, axis], n)
+
+        # 自适应速度（swing / traction）
+        swinging = mass * np.linalg.norm(force - old_force, axis=1)
+        traction = mass * np.linalg.norm(force + old_force, axis=1) / 2
+        total_swinging, total_traction = swinging.sum(), traction.sum()
+
+        estimated_jitter = 0.05 * math.sqrt(n)
+        jitter = tolerance * max(math.sqrt(estimated_jitter),
+                                 min(10.0, estimated_jitter * total_traction / n ** 2))
+        if total_traction > 0 and total_swinging / total_traction > 2.0:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.5
+            jitter = max(jitter, tolerance)
+        target_speed = (jitter * speed_efficiency * total_traction / total_swinging
+                        if total_swinging > 0 else speed * 1.5)
+        if total_swinging > jitter * total_traction:
+            if speed_efficiency > 0.05:
+                speed_efficiency *= 0.7
+        elif speed < 1000:
+            speed_efficiency *= 1.3
+        speed += min(target_speed - speed, 0.5 * speed)
+
+        factor = speed / (1 + np.sqrt(speed * swinging))
+        pos += force * factor[:, None]
+        old_force = force
+    return pos
+
+
+def coarsen(n, edges, weights, mass, rng, rounds=3):
+    """
+    一层粗化：多轮随机相互匹配，未匹配节点并入已匹配的邻居
+
+    Returns:
+        (父节点下标数组, 粗图节点数, 粗图边, 粗图边权, 粗图质量)
+    """
+    group = np.full(n, -1, dtype=np.int64)
+    both = np.concatenate([edges, edges[:, ::-1]])
+    both_weights = np.concatenate([weights, weights])
+
+    for _ in range(rounds):
+        free = (group[both[:, 0]] < 0) & (group[both[:, 1]] < 0)
+        candidates = both[free]
+        if len(candidates) == 0:
+            break
+        # 每个未匹配节点随机选一个未匹配邻居（权重大的边优先）
+        keys = rng.random(len(candidates)) / both_weights[free]
+        order = np.lexsort((keys, candidates[:, 0]))
+        first = np.unique(candidates[order, 0], return_index=True)[1]
+        chosen = candidates[order[first]]
+        pick = np.full(n, -1, dtype=np.int64)
+        pick[chosen[:, 0]] = chosen[:, 1]
+        a = chosen[:, 0]
+        mutual = a[(pick[pick[a]] == a) & (a < pick[a])]
+        group[mutual] = mutual
+        group[pick[mutual]] = mutual
+
+    # 未匹配的节点随机并入一个已匹配邻居所在的组；只有未匹配邻居的叶子并入该邻居
+    unmatched = group < 0
+    absorb = both[unmatched[both[:, 0]] & ~unmatched[both[:, 1]]]
+    if len(absorb):
+        absorb = absorb[rng.permutation(len(absorb))]
+        first = np.unique(absorb[:, 0], return_index=True)[1]
+        group[absorb[first, 0]] = group[absorb[first, 1]]
+    degree = np.bincount(both[:, 0], minlength=n)
+    leaves = (group < 0) & (degree == 1)
+    if leaves.any():
+        leaf_edges = both[leaves[both[:, 0]]]
+        leaf_edges = leaf_edges[~leaves[leaf_edges[:, 1]]]
+        neighbor = leaf_edges[:, 1]
+        root = np.where(group[neighbor] >= 0, group[neighbor], neighbor)
+        group[leaf_edges[:, 0]] = root
+        new_roots = neighbor[group[neighbor] < 0]
+        group[new_roots] = new_roots
+    group = np.where(group < 0, np.arange(n), group)
+
+    _, parent = np.unique(group, return_inverse=True)
+    coarse_n = parent.max() + 1 if n else 0
+    cu, cv = parent[edges[:, 0]], parent[edges[:, 1]]
+    keep = cu != cv
+    lo, hi = np.minimum(cu[keep], cv[keep]), np.maximum(cu[keep], cv[keep])
+    merged = sparse.coo_matrix((weights[keep], (lo, hi)), shape=(coarse_n, coarse_n)).tocsr().tocoo()
+    coarse_edges = np.column_stack([merged.row, merged.col]).astype(np.int64)
+    coarse_mass = np.bincount(parent, mass, coarse_n)
+    return parent, coarse_n, coarse_edges, merged.data.astype(np.float64), coarse_mass
+
+
+def graph_arrays(G, nodes=None):
+    """节点列表、无向边下标数组与边权（多重边/双向边合并）"""
+    nodes = list(G) if nodes is None else nodes
+    U = G.to_undirected(as_view=True) if G.is_directed() else G
+    A = nx.to_scipy_sparse_array(U, nodelist=nodes, weight=None, format='coo')
+    upper = A.row < A.col
+    edges = np.column_stack([A.row[upper], A.col[upper]]).astype(np.int64)
+    weights = np.ones(len(edges), dtype=np.float64)
+    return nodes, edges, weights
+
+
+def multilevel_forceatlas2(n, edges, weights, iterations=100, seed=42, scaling=2.0, gravity=1.0,
+                           strong_gravity=False, multilevel=True):
+    """
+    多层 ForceAtlas2：逐层粗化到 COARSEST_SIZE 以下，从最粗层开始布局并逐层细化
+
+    最粗层迭代 3×iterations 次，之后每层以继承的坐标为初值只需 iterations/2 次
+
+    Returns:
+        (n, 2) 坐标数组
+    """
+    rng = np.random.default_rng(seed)
+    degree = np.bincount(edges.ravel(), minlength=n) if len(edges) else np.zeros(n)
+    mass = degree.astype(np.float64) + 1
+
+    hierarchy = [(n, edges, weights, mass)]
+    parents = []
+    while multilevel and hierarchy[-1][0] > COARSEST_SIZE:
+        level_n, level_edges, level_weights, level_mass = hierarchy[-1]
+        parent, coarse_n, coarse_edges, coarse_weights, coarse_mass = coarsen(
+            level_n, level_edges, level_weights, level_mass, rng)
+        if coarse_n > MIN_COARSEN_RATIO * level_n:
+            break
+        parents.append(parent)
+        hierarchy.append((coarse_n, coarse_edges, coarse_weights, coarse_mass))
+
+    coarse_n, coarse_edges, coarse_weights, coarse_mass = hierarchy[-1]
+    pos = rng.uniform(-1, 1, size=(coarse_n, 2)) * math.sqrt(max(coarse_n, 1)) * 10
+    forceatlas2(pos, coarse_edges, coarse_weights, coarse_mass, iterations * (3 if parents else 1),
+                scaling, gravity, strong_gravity)
+
+    for level in range(len(parents) - 1, -1, -1):
+        level_n, level_edges, level_weights, level_mass = hierarchy[level]
+        # 子节点继承父节点坐标，加上相对边长的小扰动
+        if len(coarse_edges):
+            spread = np.median(np.linalg.norm(pos[coarse_edges[:, 0]] - pos[coarse_edges[:, 1]], axis=1)) * 0.1
+        else:
+            spread = 1.0
+        pos = pos[parents[level]] + rng.normal(scale=max(spread, 1e-3), size=(level_n, 2))
+        forceatlas2(pos, level_edges, level_weights, level_mass, max(iterations // 2, 10),
+                    scaling, gravity, strong_gravity)
+        coarse_edges = level_edges
+    return pos
+
+
+def forceatlas2_layout(G, iterations=100, seed=42, scaling=2.0, gravity=1.0,
+                       strong_gravity=False, multilevel=True):
+    """
+    ForceAtlas2 布局，返回与 nx.spring_layout 相同形式的 {节点: 坐标}（缩放到 [-1, 1]）
+    """
+    # 节点按字符串排序，结果与节点插入顺序无关
+    nodes, edges, weights = graph_arrays(G, sorted(G.nodes(), key=str))
+    if not nodes:
+        return {}
+    pos = multilevel_forceatlas2(len(nodes), edges, weights, iterations, seed,
+                                 scaling, gravity, strong_gravity, multilevel)
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos = pos / extent
+    return dict(zip(nodes, pos))
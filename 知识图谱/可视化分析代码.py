@@ -1,29 +1,27 @@
 # 在可视化分析代码.py开头添加
 GEXF_FILE = r"C:\Users\34167\exports\stardew_valley_network_complete.gexf"
 # 游戏设计结构可视化分析.py
-import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
+# matplotlib / plotly 只在生成图形时导入，只做网络分析时不加载
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import seaborn as sns
-import community as community_louvain
 from collections import Counter
 import os
 
+from 网络指标服务 import NetworkMetrics
+
 class GameDesignVisualizer:
     """游戏设计结构可视化分析器"""
     
     def __init__(self, gexf_file="stardew_valley_network_complete.gexf"):
         self.gexf_file = gexf_file
         self.G = None
+        self.metrics = None
         self.analysis_results = {}
         
     def load_network(self):
         """加载网络数据"""
         try:
-            self.G = nx.read_gexf(self.gexf_file)
+            self.metrics = NetworkMetrics.from_gexf(self.gexf_file)
+            self.G = self.metrics.G
             print(f"✓ 成功加载网络: {self.G.number_of_nodes()}节点, {self.G.number_of_edges()}边")
             return True
         except Exception as e:
@@ -36,27 +34,22 @@ class GameDesignVisualizer:
             return False
             
         # 基础统计
-        self.analysis_results['basic_stats'] = {
-            'node_count': self.G.number_of_nodes(),
-            'edge_count': self.G.number_of_edges(),
-            'density': nx.density(self.G),
-            'is_connected': nx.is_connected(self.G)
-        }
+        if self.metrics is None:
+            self.metrics = NetworkMetrics(self.G)
+        metrics = self.metrics
+        self.analysis_results['basic_stats'] = metrics.basic_stats()
         
         # 中心性分析
-        self.analysis_results['degree_centrality'] = nx.degree_centrality(self.G)
-        self.analysis_results['betweenness'] = nx.betweenness_centrality(self.G)
-        self.analysis_results['closeness'] = nx.closeness_centrality(self.G)
+        self.analysis_results['degree_centrality'] = metrics.degree_centrality()
+        self.analysis_results['betweenness'] = metrics.betweenness()
+        self.analysis_results['closeness'] = metrics.closeness()
         
         # 社区检测
-        G_undirected = self.G.to_undirected()
-        partition = community_louvain.best_partition(G_undirected)
-        self.analysis_results['communities'] = partition
-        self.analysis_results['modularity'] = community_louvain.modularity(partition, G_undirected)
+        self.analysis_results['communities'] = metrics.communities()
+        self.analysis_results['modularity'] = metrics.modularity()
         
         # 节点类型分析
-        node_types = [self.G.nodes[node].get('type', 'Unknown') for node in self.G.nodes()]
-        self.analysis_results['type_distribution'] = Counter(node_types)
+        self.analysis_results['type_distribution'] = metrics.type_distribution()
         
         return True
     
@@ -64,6 +57,8 @@ class GameDesignVisualizer:
         """创建交互式仪表板"""
         if not self.analysis_results:
             return
+        from plotly.subplots import make_subplots
+        from 网络图轨迹 import write_network_html
         
         # 创建子图布局
         fig = make_subplots(
@@ -74,7 +69,7 @@ class GameDesignVisualizer:
         )
         
         # 1. 网络拓扑图
-        self._add_network_plot(fig, row=1, col=1)
+        network_nodes = self._add_network_plot(fig, row=1, col=1)
         
         # 2. 节点类型分布
         self._add_type_pie_chart(fig, row=1, col=2)
@@ -91,63 +86,39 @@ class GameDesignVisualizer:
             showlegend=False
         )
         
-        # 保存交互式HTML
-        fig.write_html("game_design_dashboard.html")
+        # 保存交互式HTML（节点属性写入附属JSON，点击节点时加载）
+        write_network_html(fig, self.G, network_nodes, "game_design_dashboard.html")
         print("✓ 交互式仪表板已保存: game_design_dashboard.html")
         
+    def _layout(self):
+        """所有图形共用同一份缓存布局"""
+        if self.metrics is None:
+            self.metrics = NetworkMetrics(self.G)
+        return self.metrics.layout()
+    
     def _add_network_plot(self, fig, row, col):
-        """添加网络拓扑图"""
-        # 使用力导向布局
-        pos = nx.spring_layout(self.G, k=1, iterations=50)
+        """添加网络拓扑图（WebGL 渲染），返回节点轨迹对应的节点列表"""
+        from 网络图轨迹 import network_traces
+        
+        # 使用力导向布局（缓存）
+        pos = self._layout()
         
-        # 准备节点数据
-        node_x, node_y, node_text, node_colors = [], [], [], []
         color_map = {
             'NPC': '#FF6B6B', 'Quest': '#4ECDC4', 
             'Item': '#FFD166', 'Location': '#A5ABB6', 'Unknown': '#95A5A6'
         }
+        edge_trace, node_trace, nodes = network_traces(self.G, pos, color_map=color_map,
+                                                       edge_width=1, marker_line_width=2)
         
-        for node in self.G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-            
-            node_data = self.G.nodes[node]
-            name = node_data.get('name', str(node))
-            node_type = node_data.get('type', 'Unknown')
-            degree = self.G.degree(node)
-            
-            node_text.append(f"{name}<br>类型: {node_type}<br>连接数: {degree}")
-            node_colors.append(color_map.get(node_type, '#95A5A6'))
-        
-        # 添加节点轨迹
-        fig.add_trace(go.Scatter(
-            x=node_x, y=node_y,
-            mode='markers',
-            marker=dict(size=10, color=node_colors, line=dict(width=2)),
-            text=node_text,
-            hoverinfo='text',
-            name='节点'
-        ), row=row, col=col)
-        
-        # 添加边
-        edge_x, edge_y = [], []
-        for edge in self.G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        
-        fig.add_trace(go.Scatter(
-            x=edge_x, y=edge_y,
-            mode='lines',
-            line=dict(width=1, color='#888'),
-            hoverinfo='none',
-            showlegend=False
-        ), row=row, col=col)
+        # 添加节点轨迹与边
+        fig.add_trace(node_trace, row=row, col=col)
+        fig.add_trace(edge_trace, row=row, col=col)
+        return nodes
     
     def _add_type_pie_chart(self, fig, row, col):
         """添加节点类型饼图"""
+        import plotly.graph_objects as go
+        
         type_dist = self.analysis_results['type_distribution']
         labels = list(type_dist.keys())
         values = list(type_dist.values())
@@ -164,6 +135,8 @@ class GameDesignVisualizer:
     
     def _add_centrality_histogram(self, fig, row, col):
         """添加中心性分布直方图"""
+        import plotly.graph_objects as go
+        
         degree_centrality = list(self.analysis_results['degree_centrality'].values())
         
         fig.add_trace(go.Histogram(
@@ -179,6 +152,8 @@ class GameDesignVisualizer:
     
     def _add_community_plot(self, fig, row, col):
         """添加社区结构图"""
+        import plotly.graph_objects as go
+        
         communities = self.analysis_results['communities']
         community_sizes = Counter(communities.values())
         
@@ -192,8 +167,10 @@ class GameDesignVisualizer:
         fig.update_xaxes(title_text="社区ID", row=row, col=col)
         fig.update_yaxes(title_text="节点数量", row=row, col=col)
     
-    def create_static_report(self):
+    def create_static_report(self, output_file='game_design_analysis_report.png', dpi=300):
         """生成静态分析报告"""
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle('星露谷物语知识图谱设计分析报告', fontsize=16, fontweight='bold')
         
@@ -216,33 +193,28 @@ class GameDesignVisualizer:
         self._plot_design_recommendations(axes[1, 2])
         
         plt.tight_layout()
-        plt.savefig('game_design_analysis_report.png', dpi=300, bbox_inches='tight')
-        plt.show()
-        print("✓ 静态分析报告已保存: game_design_analysis_report.png")
+        plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+        print(f"✓ 静态分析报告已保存: {output_file}")
     
     def _plot_network_topology(self, ax):
         """绘制网络拓扑图"""
-        pos = nx.spring_layout(self.G, k=1, iterations=50)
+        from matplotlib.patches import Patch
+        from 静态网络图 import draw_network
         
         # 按类型着色
-        node_colors = []
         color_map = {
             'NPC': '#FF6B6B', 'Quest': '#4ECDC4', 
             'Item': '#FFD166', 'Location': '#A5ABB6', 'Unknown': '#95A5A6'
         }
         
-        for node in self.G.nodes():
-            node_type = self.G.nodes[node].get('type', 'Unknown')
-            node_colors.append(color_map.get(node_type, '#95A5A6'))
-        
-        nx.draw(self.G, pos, ax=ax, node_color=node_colors, 
-                node_size=50, edge_color='gray', alpha=0.7, 
-                with_labels=False, linewidths=0.5)
+        draw_network(ax, self.G, self._layout(), color_map=color_map, node_size=50,
+                     node_alpha=0.7, edge_alpha=0.7, edge_width=1.0)
+        ax.axis('off')
         
         ax.set_title(f'网络拓扑图\n{self.G.number_of_nodes()}节点, {self.G.number_of_edges()}边')
         
         # 添加图例
-        from matplotlib.patches import Patch
         legend_elements = [Patch(color=color, label=label) 
                           for label, color in color_map.items()]
         ax.legend(handles=legend_elements, loc='upper right', fontsize=8)
@@ -305,7 +277,9 @@ class GameDesignVisualizer:
         ax.set_xlabel('社区')
         ax.set_ylabel('节点数量')
         ax.set_title(f'社区结构 (模块度: {self.analysis_results["modularity"]:.3f})')
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
     
     def _plot_design_recommendations(self, ax):
         """绘制设计建议"""
@@ -427,6 +401,15 @@ class GameDesignVisualizer:
         return True
 
 
+def render_static_report(metrics, output_file='game_design_analysis_report.png', dpi=300):
+    """由已加载的指标服务直接生成静态报告（供报告流水线调用，不重新读取GEXF）"""
+    visualizer = GameDesignVisualizer()
+    visualizer.metrics = metrics
+    visualizer.G = metrics.G
+    visualizer.analyze_network()
+    visualizer.create_static_report(output_file, dpi)
+
+
 def main():
     """主函数"""
     # 查找可用的GEXF文件
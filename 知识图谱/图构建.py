@@ -0,0 +1,253 @@
+# 图构建.py
+"""
+由节点/关系表批量构建网络图
+
+整表一次性解析 id/名称/类型 列，属性字符串按唯一值批量解析，
+再通过 add_nodes_from / add_edges_from 或稀疏邻接矩阵构建图，
+替代逐行 iterrows 的写法。
+"""
+import ast
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+# 节点字段优先级
+ID_COLUMNS = ['id', 'entity_id', 'ID', 'Id']
+NAME_COLUMNS = ['name', 'entity_name', 'Name', 'label']
+TYPE_COLUMNS = ['type', 'Type', 'category', 'label']
+
+# 关系字段优先级
+RELATION_COLUMNS = ['relation', 'relation_type', 'type']
+ENDPOINT_SUFFIXES = ['', '_id', '_name']
+
+
+def parse_attribute_string(attr_str: Any) -> Dict[str, Any]:
+    """解析单个属性字符串为字典（JSON → Python字面量 → 手动拆分）"""
+    if not isinstance(attr_str, str):
+        return dict(attr_str) if isinstance(attr_str, dict) else {}
+
+    try:
+        # 尝试JSON解析
+        try:
+            cleaned = attr_str.replace("'", '"').replace("nan", "null")
+            return json.loads(cleaned)
+        except json.JSONDecodeError:
+            # 尝试Python字典解析
+            try:
+                return ast.literal_eval(attr_str)
+            except Exception:
+                # 手动解析
+                result = {}
+                content = attr_str.strip('{}')
+                pairs = [pair.strip() for pair in content.split(',') if pair.strip()]
+
+                for pair in pairs:
+                    if ':' in pair:
+                        key, val = pair.split(':', 1)
+                        key = key.strip().strip('"').strip("'")
+                        val = val.strip().strip('"').strip("'")
+                        if val.lower() != 'nan' and val != '':
+                            result[key] = val
+                return result
+    except Exception as e:
+        print(f"属性解析警告: {e}")
+        return {}
+
+
+def parse_attribute_column(series: pd.Series) -> List[Dict[str, Any]]:
+    """
+    批量解析属性列
+
+    只解析唯一值；先尝试把全部唯一字符串拼成一个JSON数组一次解析，
+    失败时再逐个回退到 parse_attribute_string。
+    """
+    if series is None or len(series) == 0:
+        return [{} for _ in range(0 if series is None else len(series))]
+
+    is_str = series.map(lambda v: isinstance(v, str))
+    unique_strings = pd.unique(series[is_str])
+    parsed: Dict[str, Dict[str, Any]] = {}
+
+    if len(unique_strings):
+        cleaned = pd.Series(unique_strings).str.replace("'", '"', regex=False).str.replace("nan", "null", regex=False)
+        try:
+            values = json.loads('[' + ','.join(cleaned) + ']')
+            if len(values) == len(unique_strings) and all(isinstance(v, dict) for v in values):
+                parsed = dict(zip(unique_strings, values))
+        except json.JSONDecodeError:
+            pass
+        if not parsed:
+            parsed = {s: parse_attribute_string(s) for s in unique_strings}
+
+    result = []
+    for value, value_is_str in zip(series, is_str):
+        if value_is_str:
+            attrs = parsed.get(value)
+            result.append(dict(attrs) if isinstance(attrs, dict) else {})
+        else:
+            result.append(dict(value) if isinstance(value, dict) else {})
+    return result
+
+
+def _attribute_lookup(attrs: List[Dict[str, Any]], key: str, index: pd.Index) -> pd.Series:
+    """从属性字典列表中取出某个键（值为空时视为缺失）"""
+    values = [str(a[key]) if a.get(key) else None for a in attrs]
+    return pd.Series(values, index=index, dtype=object)
+
+
+def resolve_field(df: pd.DataFrame, attrs: Optional[List[Dict[str, Any]]],
+                  columns: List[str], default: Any = None) -> pd.Series:
+    """
+    按列优先级整列解析字段值：
+    对每个候选列，表中非空值优先，其次属性字典中的非空值；靠前的候选列优先
+    """
+    result = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for col in columns:
+        if col in df.columns:
+            candidate = df[col].where(df[col].notna()).map(lambda v: None if v is None or v != v else str(v))
+        else:
+            candidate = pd.Series([None] * len(df), index=df.index, dtype=object)
+        if attrs is not None:
+            candidate = candidate.fillna(_attribute_lookup(attrs, col, df.index))
+        result = result.fillna(candidate)
+    if default is not None:
+        result = result.fillna(default)
+    return result
+
+
+def _resolve_endpoints(relations_df: pd.DataFrame, prefix: str, node_ids: pd.Index,
+                       name_to_id: Dict[str, str]) -> pd.Series:
+    """整列解析关系端点：依次尝试 source / source_id / source_name，先匹配节点ID再匹配名称"""
+    result = pd.Series([None] * len(relations_df), index=relations_df.index, dtype=object)
+    for suffix in ENDPOINT_SUFFIXES:
+        col = f"{prefix}{suffix}"
+        if col not in relations_df.columns:
+            continue
+        values = relations_df[col].where(relations_df[col].notna())
+        values = values.map(lambda v: None if v is None or v != v else str(v))
+        by_id = values.where(values.isin(node_ids))
+        by_name = values.map(name_to_id)
+        result = result.fillna(by_id.fillna(by_name))
+    return result
+
+
+def prepare_nodes(nodes_df: pd.DataFrame, id_columns: List[str] = ID_COLUMNS,
+                  parse_attributes: bool = True) -> pd.DataFrame:
+    """解析节点表为 id / name / type / attributes 四列"""
+    attrs = parse_attribute_column(nodes_df['attributes']) \
+        if parse_attributes and 'attributes' in nodes_df.columns else None
+
+    default_ids = pd.Series([f"node_{i}" for i in nodes_df.index], index=nodes_df.index)
+    node_ids = resolve_field(nodes_df, attrs, id_columns).fillna(default_ids)
+    names = resolve_field(nodes_df, attrs, NAME_COLUMNS, "")
+    types = resolve_field(nodes_df, attrs, TYPE_COLUMNS, "Unknown")
+
+    return pd.DataFrame({
+        'id': node_ids,
+        'name': names,
+        'type': types,
+        'attributes': attrs if attrs is not None else [{} for _ in range(len(nodes_df))],
+    }, index=nodes_df.index)
+
+
+def prepare_edges(relations_df: pd.DataFrame, node_ids: pd.Index, name_to_id: Dict[str, str],
+                  directed: bool = False) -> pd.DataFrame:
+    """
+    解析关系表为 source / target / relation 三列
+    两端都能解析到已有节点的关系才保留；同一节点对只保留首次出现的关系
+    """
+    source = _resolve_endpoints(relations_df, 'source', node_ids, name_to_id)
+    target = _resolve_endpoints(relations_df, 'target', node_ids, name_to_id)
+    relation = resolve_field(relations_df, None, RELATION_COLUMNS, "Unknown")
+
+    edges = pd.DataFrame({'source': source, 'target': target, 'relation': relation})
+    edges = edges.dropna(subset=['source', 'target'])
+
+    if directed:
+        pairs = edges[['source', 'target']]
+    else:
+        swap = edges['source'] > edges['target']
+        pairs = pd.DataFrame({'u': edges['source'].where(~swap, edges['target']),
+                              'v': edges['target'].where(~swap, edges['source'])})
+    return edges[~pairs.duplicated()]
+
+
+def add_nodes_from_table(G: nx.Graph, nodes_df: pd.DataFrame, id_columns: List[str] = ID_COLUMNS,
+                         parse_attributes: bool = True) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    把节点表一次性加入图中
+
+    Returns:
+        (解析后的节点表, 名称 -> 节点ID 映射)
+    """
+    nodes = prepare_nodes(nodes_df, id_columns, parse_attributes)
+    if parse_attributes:
+        node_attrs = [{'name': n, 'type': t, 'attributes': a}
+                      for n, t, a in zip(nodes['name'], nodes['type'], nodes['attributes'])]
+    else:
+        node_attrs = [{'name': n, 'type': t} for n, t in zip(nodes['name'], nodes['type'])]
+    G.add_nodes_from(zip(nodes['id'], node_attrs))
+
+    named = nodes[nodes['name'] != ""]
+    return nodes, dict(zip(named['name'], named['id']))
+
+
+def add_edges_from_table(G: nx.Graph, relations_df: pd.DataFrame,
+                         name_to_id: Dict[str, str]) -> pd.DataFrame:
+    """
+    把关系表一次性加入图中，图中已有的边保持不变（首次出现的关系优先）
+
+    Returns:
+        实际新增的边 (source / target / relation)
+    """
+    edges = prepare_edges(relations_df, pd.Index(list(G.nodes())), name_to_id, directed=G.is_directed())
+    if G.number_of_edges():
+        edges = edges[[not G.has_edge(s, t) for s, t in zip(edges['source'], edges['target'])]]
+    G.add_edges_from((s, t, {'relation': r})
+                     for s, t, r in zip(edges['source'], edges['target'], edges['relation']))
+    return edges
+
+
+def build_graph(nodes_df: pd.DataFrame, relations_df: pd.DataFrame, graph: Optional[nx.Graph] = None,
+                id_columns: List[str] = ID_COLUMNS,
+                parse_attributes: bool = True) -> Tuple[nx.Graph, Dict[str, str]]:
+    """
+    由节点/关系表构建网络图
+
+    Returns:
+        (图, 名称 -> 节点ID 映射)
+    """
+    G = graph if graph is not None else nx.Graph()
+    _, name_to_id = add_nodes_from_table(G, nodes_df, id_columns, parse_attributes)
+    add_edges_from_table(G, relations_df, name_to_id)
+    return G, name_to_id
+
+
+def build_adjacency_matrix(nodes_df: pd.DataFrame, relations_df: pd.DataFrame,
+                           directed: bool = False, id_columns: List[str] = ID_COLUMNS):
+    """
+    由节点/关系表直接构建稀疏邻接矩阵（不经过networkx）
+
+    Returns:
+        (scipy.sparse.csr_matrix, 节点ID数组)
+    """
+    from scipy import sparse
+
+    nodes = prepare_nodes(nodes_df, id_columns, parse_attributes='attributes' in nodes_df.columns)
+    nodes = nodes.drop_duplicates('id', keep='last')
+    node_index = pd.Index(nodes['id'])
+    named = nodes[nodes['name'] != ""]
+    name_to_id = dict(zip(named['name'], named['id']))
+
+    edges = prepare_edges(relations_df, node_index, name_to_id, directed=directed)
+    rows = node_index.get_indexer(edges['source'])
+    cols = node_index.get_indexer(edges['target'])
+    n = len(node_index)
+    data = np.ones(len(rows), dtype=np.float64)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+    if not directed:
+        matrix = matrix.maximum(matrix.T).tocsr()
+    return matrix, node_index.to_numpy()
@@ -0,0 +1,87 @@
+# 图缓存.py
+"""
+网络图分析结果的磁盘缓存
+
+以图内容哈希（节点、边及其方向性）为键保存计算结果，
+同一快照重复运行时直接读取，不再重新计算。
+"""
+import hashlib
+import json
+import os
+import pickle
+
+DEFAULT_CACHE_DIR = '.graph_cache'
+
+# 缓存未命中标记（结果本身可能是None）
+_MISSING = object()
+
+
+def graph_hash(G):
+    """图结构的内容哈希：与节点/边的插入顺序无关"""
+    digest = hashlib.sha256()
+    digest.update(b'directed' if G.is_directed() else b'undirected')
+    for node in sorted(map(str, G.nodes())):
+        digest.update(node.encode('utf-8'))
+        digest.update(b'\n')
+    digest.update(b'--edges--')
+    if G.is_directed():
+        edges = sorted(f"{u}\t{v}" for u, v in G.edges())
+    else:
+        edges = sorted("\t".join(sorted((str(u), str(v)))) for u, v in G.edges())
+    for edge in edges:
+        digest.update(edge.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def params_key(params):
+    """参数字典的稳定短哈希"""
+    encoded = json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class ResultCache:
+    """按 (图哈希, 指标名, 参数) 保存的结果缓存，内存 + pickle 文件两级"""
+
+    # 进程内缓存: 缓存文件路径 -> 结果
+    _memory_cache = {}
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, graph_key, name, params):
+        return os.path.join(self.cache_dir, graph_key[:16], f"{name}_{params_key(params)}.pkl")
+
+    def get(self, graph_key, name, params=None, default=None):
+        """读取缓存结果，不存在时返回 default"""
+        path = self._path(graph_key, name, params)
+        if path in self._memory_cache:
+            return self._memory_cache[path]
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"⚠ 缓存文件损坏，将重新计算: {path} ({e})")
+            return default
+        self._memory_cache[path] = result
+        return result
+
+    def put(self, graph_key, name, params, result):
+        """写入缓存（先写临时文件再原子替换）"""
+        path = self._path(graph_key, name, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._memory_cache[path] = result
+        return result
+
+    def get_or_compute(self, graph_key, name, params, compute):
+        """命中缓存直接返回，否则调用 compute() 计算并保存"""
+        result = self.get(graph_key, name, params, _MISSING)
+        if result is _MISSING:
+            result = self.put(graph_key, name, params, compute())
+        return result
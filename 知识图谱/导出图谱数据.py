@@ -6,127 +6,490 @@
 import pandas as pd
 import json
 import argparse
-from neo4j import GraphDatabase
+import heapq
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from 快照注册表 import SnapshotRegistry
 from datetime import datetime
 import os
 
+
+class TableStats:
+    """分批累计表的统计信息，生成报告时无需保留全部数据"""
+    
+    def __init__(self, category_column, degree_column=None, top_n=10):
+        self.category_column = category_column
+        self.degree_column = degree_column
+        self.top_n = top_n
+        self.rows = 0
+        self.columns = set()
+        self.categories = Counter()
+        self.degree_sum = 0
+        self.degree_max = None
+        self.degree_min = None
+        self._top = []  # (degree, -序号, 记录) 小顶堆，同度数时保留先出现的记录
+        self._seq = 0
+    
+    def update(self, df):
+        """累计一个批次"""
+        self.rows += len(df)
+        self.columns.update(df.columns)
+        
+        if self.category_column in df.columns:
+            self.categories.update(df[self.category_column].dropna().tolist())
+        
+        if self.degree_column and self.degree_column in df.columns and len(df):
+            degrees = df[self.degree_column]
+            self.degree_sum += degrees.sum()
+            batch_max, batch_min = degrees.max(), degrees.min()
+            self.degree_max = batch_max if self.degree_max is None else max(self.degree_max, batch_max)
+            self.degree_min = batch_min if self.degree_min is None else min(self.degree_min, batch_min)
+            
+            top_columns = [c for c in ('name', 'type', self.degree_column) if c in df.columns]
+            for record in df.nlargest(self.top_n, self.degree_column)[top_columns].to_dict('records'):
+                self._seq += 1
+                item = (record[self.degree_column], -self._seq, record)
+                if len(self._top) < self.top_n:
+                    heapq.heappush(self._top, item)
+                else:
+                    heapq.heappushpop(self._top, item)
+    
+    def distribution(self):
+        """类别分布（按数量降序）"""
+        if self.category_column not in self.columns:
+            return {"Unknown": self.rows}
+        return dict(self.categories.most_common())
+    
+    def has_degree(self):
+        return self.degree_column in self.columns
+    
+    def degree_mean(self):
+        return self.degree_sum / self.rows if self.rows else 0
+    
+    def top_records(self):
+        """度数最高的记录（降序）"""
+        return [record for _, _, record in sorted(self._top, key=lambda x: (x[0], x[1]), reverse=True)]
+
+
+class _CsvSink:
+    """CSV输出：每个表一个文件，首批写表头"""
+    
+    def __init__(self, base_name):
+        self.base_name = base_name
+        self._files = {}
+    
+    def write(self, table, df):
+        header = table not in self._files
+        if header:
+            self._files[table] = open(f"{self.base_name}_{table}.csv", 'w', newline='', encoding='utf-8-sig')
+        df.to_csv(self._files[table], index=False, header=header)
+    
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+
+class _JsonSink:
+    """JSON输出：流式写出记录数组，优先使用 orjson 编码"""
+    
+    def __init__(self, base_name, json_indent=None):
+        self.base_name = base_name
+        self.json_indent = json_indent
+        self._files = {}
+        try:
+            import orjson
+            self._orjson = orjson
+        except ImportError:
+            self._orjson = None
+    
+    def _encode(self, df):
+        """编码一个批次为不含外层方括号的记录串"""
+        if self._orjson is not None:
+            option = self._orjson.OPT_SERIALIZE_NUMPY | self._orjson.OPT_NON_STR_KEYS
+            if self.json_indent:
+                option |= self._orjson.OPT_INDENT_2
+            encoded = self._orjson.dumps(df.to_dict('records'), option=option, default=str).decode('utf-8')
+        else:
+            encoded = df.to_json(orient='records', indent=self.json_indent, force_ascii=False, default_handler=str)
+        return encoded.strip()[1:-1].strip()
+    
+    def write(self, table, df):
+        if table not in self._files:
+            f = open(f"{self.base_name}_{table}.json", 'w', encoding='utf-8')
+            f.write('[')
+            self._files[table] = [f, False]
+        entry = self._files[table]
+        records = self._encode(df)
+        if records:
+            if entry[1]:
+                entry[0].write(',\n' if self.json_indent else ',')
+            entry[0].write(records)
+            entry[1] = True
+    
+    def close(self):
+        for f, _ in self._files.values():
+            f.write(']')
+            f.close()
+
+
+class _XlsxSink:
+    """Excel输出：openpyxl 只写模式，逐行流式写入工作表"""
+    
+    def __init__(self, base_name, sheet_names):
+        from openpyxl import Workbook
+        self.path = f"{base_name}_full_data.xlsx"
+        self.sheet_names = sheet_names
+        self._workbook = Workbook(write_only=True)
+        self._sheets = {}
+    
+    @staticmethod
+    def _excel_value(value):
+        """Excel单元格只接受标量，字典/列表等转为字符串"""
+        if isinstance(value, (dict, list, tuple, set)):
+            return str(value)
+        if isinstance(value, float) and value != value:
+            return None  # NaN 写为空单元格
+        return value
+    
+    def write(self, table, df):
+        if table not in self._sheets:
+            sheet = self._workbook.create_sheet(self.sheet_names.get(table, table))
+            sheet.append(list(df.columns))
+            self._sheets[table] = sheet
+        sheet = self._sheets[table]
+        excel_value = self._excel_value
+        for row in df.itertuples(index=False):
+            sheet.append([excel_value(value) for value in row])
+    
+    def close(self):
+        self._workbook.save(self.path)
+
+
+class _ParquetSink:
+    """Parquet输出：pyarrow 流式写入，字典/列表列编码为JSON字符串"""
+    
+    def __init__(self, base_name):
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.base_name = base_name
+        self._writers = {}
+        self._string_columns = {}  # 表名 -> 首批全为空、声明为字符串的列
+    
+    def _create_writer(self, table, df):
+        """按首批数据推断模式；全为空的列会被推断为 null 类型，后续批次有值时无法写入，统一声明为字符串"""
+        schema = self._pa.Table.from_pandas(df, preserve_index=False).schema
+        string_columns = []
+        for i, field in enumerate(schema):
+            if self._pa.types.is_null(field.type):
+                schema = schema.set(i, field.with_type(self._pa.string()))
+                string_columns.append(field.name)
+        self._string_columns[table] = string_columns
+        self._writers[table] = self._pq.ParquetWriter(f"{self.base_name}_{table}.parquet", schema)
+    
+    def write(self, table, df):
+        df = df.copy()
+        for column in df.columns:
+            if df[column].map(lambda v: isinstance(v, (dict, list))).any():
+                df[column] = df[column].map(
+                    lambda v: json.dumps(v, ensure_ascii=False, default=str) if isinstance(v, (dict, list)) else v)
+        
+        if table not in self._writers:
+            self._create_writer(table, df)
+        for column in self._string_columns[table]:
+            if column in df.columns:
+                df[column] = df[column].map(lambda v: None if v is None or v != v else str(v))
+        writer = self._writers[table]
+        arrow_table = self._pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+        writer.write_table(arrow_table)
+    
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+
+
+class BatchFileWriter:
+    """
+    单遍多格式写出器
+    每种格式由独立的工作线程串行消费批次，各格式并发序列化；
+    队列有界，内存占用只与批次大小有关
+    """
+    
+    SINKS = {'csv': _CsvSink, 'json': _JsonSink, 'xlsx': _XlsxSink, 'parquet': _ParquetSink}
+    DEFAULT_FORMATS = ('csv', 'json', 'xlsx', 'parquet')
+    
+    def __init__(self, base_name, sheet_names, formats=DEFAULT_FORMATS, json_indent=None, queue_size=4):
+        """
+        Args:
+            base_name: 输出文件前缀
+            sheet_names: 表名 -> Excel工作表名，例如 {'nodes': '节点数据'}
+            formats: 输出格式，可选 csv / json / xlsx / parquet
+            json_indent: JSON缩进，默认不缩进
+            queue_size: 每种格式最多排队的批次数
+        """
+        self.base_name = base_name
+        self.formats = []  # 成功创建输出的格式
+        self.errors = {}
+        self._queues = {}
+        self._threads = []
+        # 各格式只接收自己需要的参数
+        sink_options = {'json': {'json_indent': json_indent}, 'xlsx': {'sheet_names': sheet_names}}
+        
+        for fmt in formats:
+            if fmt not in self.SINKS:
+                raise ValueError(f"不支持的导出格式: {fmt}，可选: {', '.join(self.SINKS)}")
+            try:
+                sink = self.SINKS[fmt](base_name, **sink_options.get(fmt, {}))
+            except ImportError as e:
+                print(f"警告: 缺少 {fmt} 导出所需的依赖 ({e.name})，跳过该格式")
+                continue
+            q = queue.Queue(maxsize=queue_size)
+            thread = threading.Thread(target=self._consume, args=(fmt, sink, q), daemon=True,
+                                      name=f"export-{fmt}")
+            thread.start()
+            self._queues[fmt] = q
+            self._threads.append(thread)
+            self.formats.append(fmt)
+    
+    def _consume(self, fmt, sink, q):
+        """工作线程：依次写入批次，出错后丢弃该格式的后续批次"""
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            if fmt in self.errors:
+                continue
+            try:
+                sink.write(*item)
+            except Exception as e:
+                self.errors[fmt] = e
+                print(f"导出 {fmt} 文件时出错: {e}")
+        try:
+            sink.close()
+        except Exception as e:
+            self.errors.setdefault(fmt, e)
+            print(f"关闭 {fmt} 文件时出错: {e}")
+    
+    def write(self, table, df):
+        """把一个批次分发给所有格式的写出线程"""
+        for q in self._queues.values():
+            q.put((table, df))
+    
+    def close(self):
+        """
+        等待全部格式写完并关闭文件
+        
+        Returns:
+            写入和关闭均未出错的格式列表
+        """
+        for q in self._queues.values():
+            q.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._queues, self._threads = {}, []
+        return [fmt for fmt in self.formats if fmt not in self.errors]
+
+
 class StardewValleyExporter:
-    def __init__(self, uri, username, password):
+    # 基础数据查询：每个查询只执行一次，结果按 fetch_size 分批从服务端流式拉取，
+    # 不按页重复扫描、排序整个标签集合
+    NODES_QUERY = """
+        MATCH (n:Entity)
+        RETURN n.id as id, n.name as name, n.type as type,
+               COUNT{ (n)--() } as degree,
+               properties(n) as attributes
+    """
+    
+    RELATIONS_QUERY = """
+        MATCH (a:Entity)-[r:REL]->(b:Entity)
+        RETURN a.id as source, b.id as target, r.type as relation,
+               properties(r) as rel_attributes
+    """
+    
+    # 高级分析查询（LIMIT 由 _run_capped_query 按 ADVANCED_QUERY_LIMITS 与 row_cap 追加）
+    ADVANCED_QUERIES = {
+        'centrality': """
+            MATCH (n:Entity)
+            WITH n, COUNT{ (n)--() } as degree
+            RETURN n.id as node_id, n.name as node_name, degree
+            ORDER BY degree DESC
+        """,
+        'triangles': """
+            MATCH (a:Entity)-[:REL]->(b:Entity)-[:REL]->(c:Entity)-[:REL]->(a:Entity)
+            WHERE a <> b AND b <> c AND a <> c
+            RETURN a.name as a, b.name as b, c.name as c
+        """,
+        'long_chains': """
+            MATCH path = (start:Entity)-[:REL*3..5]->(end:Entity)
+            WHERE start.type = 'NPC' AND end.type = 'Item'
+            RETURN [n in nodes(path) | n.name] as chain,
+                   length(path) as chain_length
+            ORDER BY chain_length DESC
+        """,
+        'community_detection': """
+            MATCH (a:Entity)-[:REL]-(b:Entity)
+            WITH a, b, COUNT{ (a)-[:REL]-(b) } as weight
+            RETURN a.id as source_id, a.name as source_name, 
+                   b.id as target_id, b.name as target_name, weight
+        """
+    }
+    
+    # 各查询固定的结果上限，row_cap 只会进一步收紧；未列出的查询不限制
+    ADVANCED_QUERY_LIMITS = {'triangles': 500, 'long_chains': 200, 'community_detection': 1000}
+    
+    def __init__(self, uri, username, password, page_size=5000, formats=BatchFileWriter.DEFAULT_FORMATS):
+        # neo4j 驱动在连接时才导入，TableStats / BatchFileWriter 可单独使用
+        from neo4j import GraphDatabase
         self.driver = GraphDatabase.driver(uri, auth=(username, password))
         self.export_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.page_size = page_size
+        self.formats = formats
     
-    def export_complete_dataset(self, output_dir="."):
+    def export_complete_dataset(self, output_dir=".", query_timeout=600, row_cap=None, backend='neo4j'):
         """导出完整数据集"""
         print("开始导出星露谷物语知识图谱数据...")
         
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
-        # 基础数据导出
-        nodes_df, relations_df = self.export_basic_data()
-        
-        # 高级分析数据导出
-        advanced_data = self.export_advanced_data()
-        
         # 生成文件名
         base_name = f"{output_dir}/stardew_valley_graph_{self.export_time}"
         
-        # 导出各种格式
-        self.export_formats(nodes_df, relations_df, base_name)
-        self.export_advanced_formats(advanced_data, base_name)
+        # 基础数据分批流式导出，每批直接写入各格式文件
+        nodes_stats, relations_stats, written_formats = self.export_basic_data(base_name)
+        
+        # 高级分析数据导出（并发执行，每个查询完成即写出文件）
+        advanced_data = self.export_advanced_data(base_name, query_timeout=query_timeout, row_cap=row_cap,
+                                                  backend=backend)
         
         # 生成报告
-        report = self.generate_report(nodes_df, relations_df, advanced_data)
+        report = self.generate_report(nodes_stats, relations_stats, advanced_data)
+        
+        # 全部文件写完后登记快照，使用方通过清单读取最新版本；
+        # 只登记完整写出的格式，CSV 缺失时 Parquet 作为 nodes / relations 主文件
+        tabular_formats = [fmt for fmt in ('csv', 'parquet') if fmt in written_formats]
+        if tabular_formats:
+            files = {}
+            for i, fmt in enumerate(tabular_formats):
+                for table in ('nodes', 'relations'):
+                    files[table if i == 0 else f"{table}_{fmt}"] = f"{base_name}_{table}.{fmt}"
+            SnapshotRegistry(output_dir).register(
+                self.export_time, files,
+                row_counts={'nodes': nodes_stats.rows, 'relations': relations_stats.rows})
+        else:
+            print("⚠ 基础数据没有完整写出的 CSV/Parquet 文件，不登记快照")
         
         print(f"导出完成！文件保存在: {base_name}_*")
         return report
     
-    def export_basic_data(self):
-        """导出基础节点和关系数据"""
-        with self.driver.session() as session:
-            # 节点数据 - 修正后的查询（移除Cypher语句中的Python注释）
-            nodes_result = session.run("""
-                MATCH (n:Entity)
-                RETURN n.id as id, n.name as name, n.type as type,
-                       COUNT{ (n)--() } as degree,
-                       properties(n) as attributes
-            """)
-            nodes_data = [dict(record) for record in nodes_result]
-            nodes_df = pd.DataFrame(nodes_data)
-            
-            # 关系数据
-            relations_result = session.run("""
-                MATCH (a:Entity)-[r:REL]->(b:Entity)
-                RETURN a.id as source, b.id as target, r.type as relation,
-                       properties(r) as rel_attributes
-            """)
-            relations_data = [dict(record) for record in relations_result]
-            relations_df = pd.DataFrame(relations_data)
-            
-        return nodes_df, relations_df
-    
-    def export_advanced_data(self):
-        """导出高级分析数据"""
-        queries = {
-            'centrality': """
-                MATCH (n:Entity)
-                WITH n, COUNT{ (n)--() } as degree
-                RETURN n.id as node_id, n.name as node_name, degree
-                ORDER BY degree DESC
-            """,
-            'triangles': """
-                MATCH (a:Entity)-[:REL]->(b:Entity)-[:REL]->(c:Entity)-[:REL]->(a:Entity)
-                WHERE a <> b AND b <> c AND a <> c
-                RETURN a.name as a, b.name as b, c.name as c
-                LIMIT 500
-            """,
-            'long_chains': """
-                MATCH path = (start:Entity)-[:REL*3..5]->(end:Entity)
-                WHERE start.type = 'NPC' AND end.type = 'Item'
-                RETURN [n in nodes(path) | n.name] as chain,
-                       length(path) as chain_length
-                ORDER BY chain_length DESC
-                LIMIT 200
-            """,
-            'community_detection': """
-                MATCH (a:Entity)-[:REL]-(b:Entity)
-                WITH a, b, COUNT{ (a)-[:REL]-(b) } as weight
-                RETURN a.id as source_id, a.name as source_name, 
-                       b.id as target_id, b.name as target_name, weight
-                LIMIT 1000
-            """
-        }
+    def export_basic_data(self, base_name):
+        """
+        分批导出基础节点和关系数据
+        每批数据直接追加写入磁盘文件，内存占用与图规模无关
+        
+        Returns:
+            (节点统计, 关系统计, 完整写出的格式列表)；查询中途失败时格式列表为空
+        """
+        nodes_stats = TableStats('type', degree_column='degree')
+        relations_stats = TableStats('relation')
+        writer = BatchFileWriter(base_name, {'nodes': '节点数据', 'relations': '关系数据'}, self.formats)
         
+        failed = False
+        try:
+            with self.driver.session(fetch_size=self.page_size) as session:
+                for table, query, stats in (('nodes', self.NODES_QUERY, nodes_stats),
+                                            ('relations', self.RELATIONS_QUERY, relations_stats)):
+                    for batch_df in self._iter_batches(session, query):
+                        writer.write(table, batch_df)
+                        stats.update(batch_df)
+                    print(f"✓ 已导出{table}: {stats.rows} 行")
+        except Exception as e:
+            print(f"导出文件时出错: {e}")
+            failed = True
+        finally:
+            written_formats = writer.close()
+        
+        return nodes_stats, relations_stats, [] if failed else written_formats
+    
+    def _iter_batches(self, session, query):
+        """执行一次查询，每拉取 page_size 条记录返回一个DataFrame"""
+        result = session.run(query)
+        while True:
+            records = result.fetch(self.page_size)
+            if not records:
+                break
+            yield pd.DataFrame([record.data() for record in records])
+    
+    def export_advanced_data(self, base_name=None, query_timeout=600, row_cap=None, max_workers=None,
+                             backend='neo4j'):
+        """
+        导出高级分析数据
+        各查询在独立会话中并发执行（共享驱动的连接池），总耗时接近最慢的单个查询
+        
+        Args:
+            base_name: 若指定，每个查询完成后立即写出对应的CSV/JSON文件
+            query_timeout: 单个查询的超时时间（秒）
+            row_cap: 单个查询最多返回的记录数（作为 LIMIT 下推到服务端），None 表示不额外限制
+            max_workers: 并发线程数，默认每个查询一个线程
+            backend: 'local' 时由已导出的节点/关系文件（CSV 或 Parquet）在进程内计算
+                     centrality / triangles / long_chains，其余查询仍走Neo4j
+        """
         advanced_data = {}
-        with self.driver.session() as session:
-            for key, query in queries.items():
+        
+        if backend == 'local':
+            if not base_name:
+                raise ValueError("本地分析需要已导出的节点/关系文件 (base_name)")
+            from 本地图分析 import LocalGraphAnalytics
+            start = time.perf_counter()
+            analytics = LocalGraphAnalytics.from_export(base_name)
+            for key, data in analytics.run_all().items():
+                advanced_data[key] = data[:row_cap]
+                self.export_advanced_formats({key: advanced_data[key]}, base_name)
+            print(f"✓ 本地分析完成: {', '.join(advanced_data)}, 耗时 {time.perf_counter() - start:.1f}秒")
+        
+        queries = {key: query for key, query in self.ADVANCED_QUERIES.items() if key not in advanced_data}
+        if not queries:
+            return advanced_data
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as pool:
+            futures = {
+                pool.submit(self._run_capped_query, query, query_timeout, self._query_limit(key, row_cap)): key
+                for key, query in queries.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
                 try:
-                    result = session.run(query)
-                    advanced_data[key] = [dict(record) for record in result]
+                    advanced_data[key], elapsed = future.result()
+                    print(f"✓ 查询 {key} 完成: {len(advanced_data[key])} 条记录, 耗时 {elapsed:.1f}秒")
                 except Exception as e:
                     print(f"警告: 查询 {key} 执行失败: {e}")
                     advanced_data[key] = []
+                
+                if base_name:
+                    self.export_advanced_formats({key: advanced_data[key]}, base_name)
         
         return advanced_data
     
-    def export_formats(self, nodes_df, relations_df, base_name):
-        """导出为多种格式"""
-        try:
-            # CSV格式
-            nodes_df.to_csv(f"{base_name}_nodes.csv", index=False, encoding='utf-8-sig')
-            relations_df.to_csv(f"{base_name}_relations.csv", index=False, encoding='utf-8-sig')
-            
-            # JSON格式
-            nodes_df.to_json(f"{base_name}_nodes.json", orient='records', indent=2, force_ascii=False)
-            relations_df.to_json(f"{base_name}_relations.json", orient='records', indent=2, force_ascii=False)
-            
-            # Excel格式
-            with pd.ExcelWriter(f"{base_name}_full_data.xlsx", engine='openpyxl') as writer:
-                nodes_df.to_excel(writer, sheet_name='节点数据', index=False)
-                relations_df.to_excel(writer, sheet_name='关系数据', index=False)
-                
-        except Exception as e:
-            print(f"导出文件时出错: {e}")
+    def _query_limit(self, key, row_cap):
+        """查询的实际上限：固定上限与 row_cap 中较小者，都没有时为 None"""
+        limits = [limit for limit in (self.ADVANCED_QUERY_LIMITS.get(key), row_cap) if limit is not None]
+        return min(limits) if limits else None
+    
+    def _run_capped_query(self, query, timeout, limit=None):
+        """在独立会话中执行单个查询，超时由服务端终止；limit 以 LIMIT $limit 下推，服务端只计算所需的行"""
+        from neo4j import Query
+        if limit is not None:
+            query = f"{query.rstrip()}\n            LIMIT $limit"
+        start = time.perf_counter()
+        with self.driver.session() as session:
+            result = session.run(Query(query, timeout=timeout), limit=limit)
+            rows = [dict(record) for record in result]
+        return rows, time.perf_counter() - start
     
     def export_advanced_formats(self, advanced_data, base_name):
         """导出高级数据格式"""
@@ -139,30 +502,24 @@ class StardewValleyExporter:
             except Exception as e:
                 print(f"导出高级数据 {key} 时出错: {e}")
     
-    def generate_report(self, nodes_df, relations_df, advanced_data):
-        """生成导出报告"""
+    def generate_report(self, nodes_stats, relations_stats, advanced_data):
+        """生成导出报告（基于分批累计的统计信息）"""
         try:
             # 计算基本统计
-            total_nodes = len(nodes_df)
-            total_relationships = len(relations_df)
+            total_nodes = nodes_stats.rows
+            total_relationships = relations_stats.rows
             
             # 节点类型分布
-            if 'type' in nodes_df.columns:
-                node_types = nodes_df['type'].value_counts().to_dict()
-            else:
-                node_types = {"Unknown": total_nodes}
+            node_types = nodes_stats.distribution()
             
             # 关系类型分布
-            if 'relation' in relations_df.columns:
-                relationship_types = relations_df['relation'].value_counts().to_dict()
-            else:
-                relationship_types = {"Unknown": total_relationships}
+            relationship_types = relations_stats.distribution()
             
             # 计算节点连接数统计
-            if 'degree' in nodes_df.columns:
-                avg_degree = nodes_df['degree'].mean()
-                max_degree = nodes_df['degree'].max()
-                min_degree = nodes_df['degree'].min()
+            if nodes_stats.has_degree():
+                avg_degree = nodes_stats.degree_mean()
+                max_degree = nodes_stats.degree_max
+                min_degree = nodes_stats.degree_min
             else:
                 avg_degree = max_degree = min_degree = 0
             
@@ -179,7 +536,7 @@ class StardewValleyExporter:
                         'minimum': float(min_degree)
                     }
                 },
-                'top_connected_nodes': nodes_df.nlargest(10, 'degree')[['name', 'type', 'degree']].to_dict('records') if 'degree' in nodes_df.columns else [],
+                'top_connected_nodes': nodes_stats.top_records() if nodes_stats.has_degree() else [],
                 'most_common_relationships': list(relationship_types.items())[:10]
             }
             
@@ -205,14 +562,26 @@ def main():
     parser.add_argument('--username', default='neo4j', help='用户名')
     parser.add_argument('--password', required=True, help='密码')
     parser.add_argument('--output', default='./exports', help='输出目录')
+    parser.add_argument('--page-size', type=int, default=5000, help='流式导出时每批从服务端拉取的记录数')
+    parser.add_argument('--formats', default=','.join(BatchFileWriter.DEFAULT_FORMATS),
+                        help='节点/关系数据的导出格式，逗号分隔: csv,json,xlsx,parquet')
+    parser.add_argument('--query-timeout', type=float, default=600, help='高级分析查询的单个超时时间（秒）')
+    parser.add_argument('--row-cap', type=int, default=None, help='高级分析查询的单个最大记录数，默认不额外限制')
+    parser.add_argument('--analytics-backend', choices=['neo4j', 'local'], default='neo4j',
+                        help='三角形/长链等分析的执行位置: neo4j 或 本地进程内(local)')
     
     args = parser.parse_args()
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    if args.analytics_backend == 'local' and not {'csv', 'parquet'} & set(formats):
+        parser.error("--analytics-backend local 需要在 --formats 中包含 csv 或 parquet")
     
     exporter = None
     try:
         # 创建导出器并执行导出
-        exporter = StardewValleyExporter(args.uri, args.username, args.password)
-        report = exporter.export_complete_dataset(args.output)
+        exporter = StardewValleyExporter(args.uri, args.username, args.password, page_size=args.page_size,
+                                         formats=formats)
+        report = exporter.export_complete_dataset(args.output, query_timeout=args.query_timeout,
+                                                  row_cap=args.row_cap, backend=args.analytics_backend)
         
         print("\n" + "="*50)
         print("导出报告")
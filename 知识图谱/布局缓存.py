@@ -0,0 +1,97 @@
+# 布局缓存.py
+"""
+网络布局缓存
+
+布局按 (图哈希, 布局算法, 参数) 计算一次，坐标以 .npy 数组保存在
+.graph_cache/<图哈希>/ 下，各个绘图脚本读取同一份坐标，图形中的节点位置一致。
+数组行顺序为节点按字符串排序后的顺序（与图哈希的节点顺序一致）。
+
+layout='auto' 时小图用 spring_layout，大图用多层 ForceAtlas2（见 力导向布局.py）。
+"""
+import os
+
+import networkx as nx
+import numpy as np
+
+from 图缓存 import DEFAULT_CACHE_DIR, graph_hash, params_key
+
+# 默认布局参数（与原各脚本中的 spring_layout 参数一致，并固定随机种子）
+DEFAULT_LAYOUT = 'spring'
+DEFAULT_PARAMS = {'k': 1, 'iterations': 50, 'seed': 42}
+
+# 节点数超过该值时 'auto' 选择 ForceAtlas2（spring_layout 每次迭代 O(n²)）
+SPRING_NODE_LIMIT = 2000
+FORCEATLAS2_PARAMS = {'iterations': 100, 'seed': 42}
+
+
+def _forceatlas2(G, **params):
+    from 力导向布局 import forceatlas2_layout
+    return forceatlas2_layout(G, **params)
+
+
+# 布局算法: 名称 -> f(G, **params) 返回 {节点: 坐标}
+LAYOUT_ALGORITHMS = {
+    'spring': lambda G, **params: nx.spring_layout(G, **params),
+    'forceatlas2': _forceatlas2,
+}
+
+# 进程内缓存: .npy 路径 -> 坐标数组
+_memory_cache = {}
+
+
+def layout_nodes(G):
+    """坐标数组的行顺序"""
+    return sorted(G.nodes(), key=str)
+
+
+def resolve_layout(G, layout, params):
+    """解析 'auto' 并补全默认参数，返回 (布局算法, 参数)"""
+    if layout == 'auto':
+        layout = DEFAULT_LAYOUT if G.number_of_nodes() <= SPRING_NODE_LIMIT else 'forceatlas2'
+    if layout not in LAYOUT_ALGORITHMS:
+        raise ValueError(f"不支持的布局算法: {layout}，可选: {['auto', *LAYOUT_ALGORITHMS]}")
+    if layout == DEFAULT_LAYOUT:
+        params = {**DEFAULT_PARAMS, **params}
+    elif layout == 'forceatlas2':
+        params = {**FORCEATLAS2_PARAMS, **params}
+    return layout, params
+
+
+def layout_path(graph_key, layout=DEFAULT_LAYOUT, params=None, cache_dir=DEFAULT_CACHE_DIR):
+    params = dict(DEFAULT_PARAMS if params is None else params)
+    return os.path.join(cache_dir, graph_key[:16], f"layout_{layout}_{params_key(params)}.npy")
+
+
+def layout_array(G, layout='auto', graph_key=None, cache_dir=DEFAULT_CACHE_DIR, **params):
+    """
+    读取或计算布局坐标
+
+    Returns:
+        (节点列表, 形如 (n, 2) 的坐标数组)，两者行顺序一致
+    """
+    layout, params = resolve_layout(G, layout, params)
+    nodes = layout_nodes(G)
+    path = layout_path(graph_key or graph_hash(G), layout, params, cache_dir)
+
+    positions = _memory_cache.get(path)
+    if positions is None and os.path.exists(path):
+        positions = np.load(path)
+        if positions.shape != (len(nodes), 2):
+            print(f"⚠ 布局缓存与图不匹配，重新计算: {path}")
+            positions = None
+    if positions is None:
+        print(f"计算 {layout} 布局: {G.number_of_nodes()} 节点...")
+        pos = LAYOUT_ALGORITHMS[layout](G, **params)
+        positions = np.array([pos[n] for n in nodes], dtype=np.float64).reshape(len(nodes), 2)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp.npy'
+        np.save(tmp_path, positions)
+        os.replace(tmp_path, path)
+    _memory_cache[path] = positions
+    return nodes, positions
+
+
+def get_layout(G, layout='auto', graph_key=None, cache_dir=DEFAULT_CACHE_DIR, **params):
+    """读取或计算布局，返回与 nx.spring_layout 相同的 {节点: 坐标} 字典"""
+    nodes, positions = layout_array(G, layout, graph_key, cache_dir, **params)
+    return dict(zip(nodes, positions))
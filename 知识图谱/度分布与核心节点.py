@@ -1,16 +1,21 @@
 # 图2_度分布与核心节点.py
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
 
-def create_degree_analysis():
-    """创建度分布和核心节点分析"""
-    G = nx.read_gexf("stardew_valley_network_typed.gexf")
+from 网络指标服务 import NetworkMetrics
+
+GEXF_FILE = "stardew_valley_network_typed.gexf"
+
+def create_degree_analysis(metrics=None, output_file='图2_度分布与核心节点.png', dpi=300):
+    """创建度分布和核心节点分析（metrics 为 None 时从 GEXF_FILE 加载）"""
+    if metrics is None:
+        metrics = NetworkMetrics.from_gexf(GEXF_FILE)
+    G = metrics.G
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 10))
     
     # 左侧：度分布直方图
-    degrees = [d for _, d in G.degree()]
+    degrees = list(metrics.degrees().values())
     n, bins, patches = ax1.hist(degrees, bins=20, color='#4ECDC4', 
                                alpha=0.8, edgecolor='black', linewidth=1.2)
     avg_degree = np.mean(degrees)
@@ -36,7 +41,7 @@ def create_degree_analysis():
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
     # 右侧：核心节点排名
-    degree_centrality = nx.degree_centrality(G)
+    degree_centrality = metrics.degree_centrality()
     top_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
     
     node_names = []
@@ -68,8 +73,9 @@ def create_degree_analysis():
     
     plt.suptitle('图2: 网络连接分析与核心节点', fontsize=18, fontweight='bold', y=0.98)
     plt.tight_layout()
-    plt.savefig('图2_度分布与核心节点.png', dpi=300, bbox_inches='tight')
-    plt.show()
-    print("✅ 图2已保存: 图2_度分布与核心节点.png")
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ 图2已保存: {output_file}")
 
-create_degree_analysis()
+if __name__ == '__main__':
+    create_degree_analysis()
@@ -0,0 +1,137 @@
+# 快照注册表.py
+"""
+导出快照注册表
+
+每次导出完成后在导出目录的清单文件中登记一条快照记录（时间戳、行数、
+文件路径与内容哈希）。使用方直接按版本号或"latest"取文件，
+不再扫描目录，也不会读到尚未写完的文件。
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SnapshotRegistry:
+    """基于JSON清单文件的快照目录"""
+
+    MANIFEST_NAME = 'stardew_valley_snapshots.json'
+    CACHE_DIR_NAME = '.snapshot_cache'
+
+    # 进程内缓存: 内容哈希 -> DataFrame
+    _memory_cache = {}
+
+    def __init__(self, export_dir):
+        self.export_dir = export_dir
+        self.manifest_path = os.path.join(export_dir, self.MANIFEST_NAME)
+        self.cache_dir = os.path.join(export_dir, self.CACHE_DIR_NAME)
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def _read_manifest(self):
+        if not self.exists():
+            return {'latest': None, 'snapshots': {}}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        """先写临时文件再原子替换，读者不会看到写了一半的清单"""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def register(self, version, files, row_counts=None):
+        """
+        登记一个已写完的快照
+
+        Args:
+            version: 版本号（导出时间戳，如 20251215_103000）
+            files: 表名 -> 文件路径，例如 {'nodes': ..., 'relations': ...}
+            row_counts: 表名 -> 行数
+
+        Returns:
+            快照记录
+        """
+        entry = {
+            'version': version,
+            'registered_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'row_counts': row_counts or {},
+            'files': {},
+        }
+        for table, path in files.items():
+            if not os.path.exists(path):
+                continue
+            entry['files'][table] = {
+                'path': os.path.relpath(path, self.export_dir),
+                'sha256': file_sha256(path),
+                'size': os.path.getsize(path),
+            }
+
+        manifest = self._read_manifest()
+        manifest['snapshots'][version] = entry
+        if manifest['latest'] is None or version >= manifest['latest']:
+            manifest['latest'] = version
+        self._write_manifest(manifest)
+        print(f"✓ 快照已登记: {version} -> {self.manifest_path}")
+        return entry
+
+    def get(self, version='latest'):
+        """按版本号取快照记录，'latest' 表示最新快照；不存在时返回None"""
+        manifest = self._read_manifest()
+        if version == 'latest':
+            version = manifest['latest']
+        return manifest['snapshots'].get(version) if version else None
+
+    def latest(self):
+        return self.get('latest')
+
+    def versions(self):
+        return sorted(self._read_manifest()['snapshots'])
+
+    def path(self, entry, table):
+        """快照中某个表的绝对路径"""
+        return os.path.join(self.export_dir, entry['files'][table]['path'])
+
+    @staticmethod
+    def content_hash(entry, tables=None):
+        """快照（或其中部分表）的组合内容哈希"""
+        digest = hashlib.sha256()
+        for table in sorted(tables or entry['files']):
+            digest.update(entry['files'][table]['sha256'].encode('ascii'))
+        return digest.hexdigest()
+
+    def load_table(self, entry, table):
+        """
+        读取快照中的表，按内容哈希缓存
+
+        同一内容在进程内只解析一次，在磁盘上以pickle缓存，下次直接加载
+        """
+        file_info = entry['files'][table]
+        sha = file_info['sha256']
+        if sha in self._memory_cache:
+            return self._memory_cache[sha]
+
+        cache_path = os.path.join(self.cache_dir, f"{sha}.pkl")
+        if os.path.exists(cache_path):
+            df = pd.read_pickle(cache_path)
+        else:
+            source = self.path(entry, table)
+            df = pd.read_parquet(source) if source.endswith('.parquet') else pd.read_csv(source)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_pickle(cache_path)
+
+        self._memory_cache[sha] = df
+        return df
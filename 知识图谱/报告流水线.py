@@ -0,0 +1,206 @@
+# 报告流水线.py
+"""
+无界面的静态报告流水线
+
+图1~图4 与设计分析报告原本各自运行，各自读取GEXF、各自计算布局和指标。
+流水线只加载一次图，在主进程中预先算好全部指标和布局（写入 .graph_cache/），
+再用进程池并行渲染每张图（Agg 后端，不弹出窗口），工作进程只读取缓存。
+
+每张图的输入键 = 图结构哈希 + 节点类型/名称哈希 + 绘图脚本与共享绘图/指标模块的源码哈希
++ 渲染参数 + REPORT_VERSION，与输出文件的内容哈希一起记录在输出目录的清单中；
+键未变且输出文件未被改动时跳过渲染。
+"""
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from 图缓存 import DEFAULT_CACHE_DIR, ResultCache
+from 网络指标服务 import NetworkMetrics, load_graph
+
+MANIFEST_FILE = '.report_manifest.json'
+
+# 渲染约定（配色、字体等不在源码哈希范围内的变化）改变时递增，使全部图形失效
+REPORT_VERSION = 1
+
+# 各图共用的绘图/指标模块，源码变化同样使图形失效
+SHARED_MODULES = ('静态网络图', '网络图轨迹', '布局缓存', '网络指标服务', '中心性引擎', '社区检测',
+                  '路径统计', '图缓存', 'GEXF流式读写')
+
+# 图形读取的节点属性（图哈希只覆盖节点id与边）
+FIGURE_NODE_ATTRIBUTES = ('type', 'name')
+
+# 图名 -> (模块, 函数, 输出文件)；函数签名 f(metrics, output_file=..., dpi=...)
+REPORT_FIGURES = {
+    'topology': ('网络拓扑图', 'create_network_topology', '图1_网络拓扑与类型分布.png'),
+    'degree': ('度分布与核心节点', 'create_degree_analysis', '图2_度分布与核心节点.png'),
+    'statistics': ('详细网络统计信息', 'create_network_statistics', '图3_详细网络统计信息.png'),
+    'recommendations': ('设计优化建议', 'create_design_recommendations', '图4_设计优化建议.png'),
+    'design_report': ('可视化分析代码', 'render_static_report', 'game_design_analysis_report.png'),
+}
+
+# 工作进程内的指标服务（进程初始化时创建一次）
+_worker_metrics = None
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _module_digest(module):
+    return _file_digest(importlib.util.find_spec(module).origin)
+
+
+def node_attributes_key(G):
+    """图形读取的节点属性（类型、名称）的哈希，与节点顺序无关"""
+    digest = hashlib.sha256()
+    rows = sorted([str(n)] + [str(G.nodes[n].get(attr, '')) for attr in FIGURE_NODE_ATTRIBUTES] for n in G)
+    for row in rows:
+        digest.update(json.dumps(row, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def figure_key(graph_key, attributes_key, name, dpi):
+    """图形的输入键：图结构、节点类型/名称、绘图脚本及共享模块源码、渲染参数或版本任一变化都会改变"""
+    sources = [_module_digest(module) for module in (REPORT_FIGURES[name][0],) + SHARED_MODULES]
+    encoded = json.dumps([REPORT_VERSION, graph_key, attributes_key, name, sources, dpi]).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ 报告清单损坏，将全部重新渲染: {path} ({e})")
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _is_current(entry, key, output_file):
+    return (entry is not None and entry.get('key') == key and os.path.exists(output_file)
+            and _file_digest(output_file) == entry.get('sha256'))
+
+
+def _init_worker(gexf_file, cache_dir, graph_key):
+    """工作进程初始化：无界面后端，从 .graph.npz 附属文件加载图（指标全部命中缓存）"""
+    global _worker_metrics
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_metrics = NetworkMetrics(load_graph(gexf_file), ResultCache(cache_dir), graph_key)
+
+
+def _render(name, output_file, dpi):
+    module, function, _ = REPORT_FIGURES[name]
+    start = time.perf_counter()
+    getattr(importlib.import_module(module), function)(_worker_metrics, output_file=output_file, dpi=dpi)
+    return time.perf_counter() - start
+
+
+def run_report(gexf_file, output_dir='.', figures=None, workers=None, dpi=300,
+               cache_dir=DEFAULT_CACHE_DIR, force=False):
+    """
+    渲染报告图形
+
+    Args:
+        gexf_file: 网络图GEXF文件
+        output_dir: 图片与清单的输出目录
+        figures: 要渲染的图名列表（REPORT_FIGURES 的键），None 表示全部
+        workers: 进程数，None 时取 CPU 核数
+        force: 忽略清单，全部重新渲染
+
+    Returns:
+        {图名: 'rendered' | 'cached' | 'failed'}
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    figures = list(REPORT_FIGURES) if figures is None else list(figures)
+    unknown = [name for name in figures if name not in REPORT_FIGURES]
+    if unknown:
+        raise ValueError(f"未知的报告图形: {unknown}，可选: {list(REPORT_FIGURES)}")
+
+    metrics = NetworkMetrics.from_gexf(gexf_file, ResultCache(cache_dir))
+    graph_key = metrics.graph_key
+    attributes_key = node_attributes_key(metrics.G)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    status = {}
+    pending = {}
+    for name in figures:
+        output_file = os.path.join(output_dir, REPORT_FIGURES[name][2])
+        key = figure_key(graph_key, attributes_key, name, dpi)
+        if not force and _is_current(manifest.get(name), key, output_file):
+            print(f"✓ {name} 未变化，跳过: {output_file}")
+            status[name] = 'cached'
+        else:
+            pending[name] = (output_file, key)
+    if not pending:
+        return status
+
+    # 指标与布局只在主进程计算一次
+    start = time.perf_counter()
+    metrics.compute_all()
+    metrics.layout()
+    print(f"✓ 指标与布局已就绪 ({time.perf_counter() - start:.1f}s)")
+
+    max_workers = min(workers or os.cpu_count() or 1, len(pending))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(gexf_file, cache_dir, graph_key)) as executor:
+        futures = {executor.submit(_render, name, output_file, dpi): name
+                   for name, (output_file, _) in pending.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            output_file, key = pending[name]
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                print(f"⚠ {name} 渲染失败: {e}")
+                status[name] = 'failed'
+                continue
+            manifest[name] = {'key': key, 'output': REPORT_FIGURES[name][2], 'sha256': _file_digest(output_file)}
+            status[name] = 'rendered'
+            print(f"✓ {name} 渲染完成 ({elapsed:.1f}s)")
+    _save_manifest(output_dir, manifest)
+    return status
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='并行渲染知识图谱静态报告（无界面，未变化的图形跳过）')
+    parser.add_argument('gexf_file', nargs='?', default='stardew_valley_network_typed.gexf', help='网络图GEXF文件')
+    parser.add_argument('--output-dir', default='.', help='输出目录')
+    parser.add_argument('--figures', nargs='+', choices=list(REPORT_FIGURES), help='只渲染指定图形')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认CPU核数')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--force', action='store_true', help='忽略清单，全部重新渲染')
+    args = parser.parse_args()
+
+    status = run_report(args.gexf_file, args.output_dir, args.figures, args.workers, args.dpi, force=args.force)
+    counts = {s: sum(1 for v in status.values() if v == s) for s in ('rendered', 'cached', 'failed')}
+    print(f"报告完成: 渲染 {counts['rendered']}，跳过 {counts['cached']}，失败 {counts['failed']}")
+
+
+if __name__ == "__main__":
+    main()
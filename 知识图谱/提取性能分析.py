@@ -0,0 +1,155 @@
+# 提取性能分析.py
+"""
+知识图谱提取流程的分阶段性能记录
+
+记录每个阶段的墙钟时间、CPU时间、峰值内存、输入记录数与输出三元组数，
+可选地为每个阶段保存 cProfile / pyinstrument 剖析结果。
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def peak_rss_mb():
+    """返回当前进程的峰值常驻内存(MB)，无法获取时返回None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以KB为单位，macOS 以字节为单位
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+class StageRecord:
+    """单个阶段的计量结果"""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss_mb = None
+        self.records_in = None
+        self.triplets_out = None
+        self.profile_file = None
+
+    def to_dict(self):
+        return {
+            'stage': self.name,
+            'wall_time_s': round(self.wall_time, 6),
+            'cpu_time_s': round(self.cpu_time, 6),
+            'peak_rss_mb': round(self.peak_rss_mb, 2) if self.peak_rss_mb is not None else None,
+            'records_in': self.records_in,
+            'triplets_out': self.triplets_out,
+            'profile_file': self.profile_file,
+        }
+
+
+class StageProfiler:
+    """分阶段计时器"""
+
+    PROFILERS = (None, 'cprofile', 'pyinstrument')
+
+    def __init__(self, triplet_count=None, profile=None, profile_dir='.'):
+        """
+        Args:
+            triplet_count: 返回当前三元组总数的函数，用于计算每阶段输出的三元组数
+            profile: None / 'cprofile' / 'pyinstrument'，为每个阶段保存剖析结果
+            profile_dir: 剖析结果的保存目录
+        """
+        if profile not in self.PROFILERS:
+            raise ValueError(f"不支持的剖析器: {profile}，可选: {self.PROFILERS[1:]}")
+        self.triplet_count = triplet_count
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, records_in=None):
+        """
+        计量一个阶段，可在 with 块内设置 record.records_in / record.triplets_out
+
+        用法:
+            with profiler.stage('parse_quest_data', records_in=len(quests)) as record:
+                ...
+        """
+        record = StageRecord(name)
+        record.records_in = records_in
+        triplets_before = self.triplet_count() if self.triplet_count else None
+
+        profiler = self._start_profiler()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - wall_start
+            record.cpu_time = time.process_time() - cpu_start
+            record.profile_file = self._stop_profiler(profiler, name)
+            record.peak_rss_mb = peak_rss_mb()
+            if record.triplets_out is None and triplets_before is not None:
+                record.triplets_out = self.triplet_count() - triplets_before
+            self.stages.append(record)
+
+    def _start_profiler(self):
+        """按配置启动剖析器"""
+        if self.profile == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profiler(self, profiler, name):
+        """停止剖析器并保存结果，返回文件路径"""
+        if profiler is None:
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if self.profile == 'cprofile':
+            profiler.disable()
+            path = os.path.join(self.profile_dir, f"profile_{name}.prof")
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            path = os.path.join(self.profile_dir, f"profile_{name}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return path
+
+    def to_dict(self):
+        return {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'total_wall_time_s': round(sum(s.wall_time for s in self.stages), 6),
+            'total_cpu_time_s': round(sum(s.cpu_time for s in self.stages), 6),
+            'stages': [s.to_dict() for s in self.stages],
+        }
+
+    def write_report(self, output_file='extraction_timing.json'):
+        """写出机器可读的计时报告"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        print(f"阶段计时报告已导出到: {output_file}")
+
+    def print_summary(self):
+        """打印各阶段耗时"""
+        print("\n阶段耗时统计:")
+        print(f"  {'阶段':<34}{'墙钟(s)':>10}{'CPU(s)':>10}{'峰值内存(MB)':>14}{'输入':>8}{'输出':>8}")
+        for s in self.stages:
+            rss = f"{s.peak_rss_mb:.1f}" if s.peak_rss_mb is not None else '-'
+            records_in = s.records_in if s.records_in is not None else '-'
+            triplets_out = s.triplets_out if s.triplets_out is not None else '-'
+            print(f"  {s.name:<34}{s.wall_time:>10.3f}{s.cpu_time:>10.3f}{rss:>14}{records_in:>8}{triplets_out:>8}")
@@ -0,0 +1,194 @@
+# 本地图分析.py
+"""
+进程内图分析引擎
+
+将导出的节点/关系表加载为CSR邻接结构，离线计算有向三角形和有长度上限的
+NPC→Item 关系链，输出与 StardewValleyExporter 高级查询相同的列。
+
+度数按关系条数统计（保留多重边与自环），与 Cypher 的 COUNT{(n)--()} 一致；
+三角形与关系链在去重、去自环后的邻接结构上搜索，语义见各方法说明。
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class LocalGraphAnalytics:
+    """基于CSR稀疏矩阵的本地图分析"""
+
+    def __init__(self, nodes_df, relations_df):
+        """
+        Args:
+            nodes_df: 节点表，需包含 id / name / type 列
+            relations_df: 关系表，需包含 source / target 列（节点id）
+        """
+        nodes_df = nodes_df.dropna(subset=['id']).drop_duplicates('id')
+        self.node_ids = nodes_df['id'].astype(str).to_numpy()
+        self.names = nodes_df['name'].fillna('').astype(str).to_numpy() if 'name' in nodes_df else self.node_ids
+        self.types = nodes_df['type'].fillna('Unknown').astype(str).to_numpy() if 'type' in nodes_df else \
+            np.full(len(self.node_ids), 'Unknown', dtype=object)
+
+        # 节点id -> 行号，一次性向量化映射全部边
+        index = pd.Index(self.node_ids)
+        src = index.get_indexer(relations_df['source'].astype(str))
+        dst = index.get_indexer(relations_df['target'].astype(str))
+        valid = (src >= 0) & (dst >= 0)
+        src, dst = src[valid], dst[valid]
+
+        n = len(self.node_ids)
+        # 每条关系各计一次（自环计一次，与 Cypher 无向模式匹配自环的次数相同）
+        loops = np.bincount(src[src == dst], minlength=n)
+        self.degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n) - loops
+
+        simple = src != dst
+        adjacency = sparse.csr_matrix(
+            (np.ones(simple.sum(), dtype=np.int32), (src[simple], dst[simple])), shape=(n, n))
+        adjacency.data[:] = 1  # 多重边合并为一条
+        self.A = adjacency
+        self.A_T = adjacency.T.tocsr()
+
+    @classmethod
+    def from_csv(cls, nodes_file, relations_file):
+        """从导出的CSV文件加载"""
+        return cls(pd.read_csv(nodes_file), pd.read_csv(relations_file))
+
+    @classmethod
+    def from_export(cls, base_name):
+        """从导出器写出的 {base_name}_nodes / _relations 文件加载，CSV 优先，其次 Parquet"""
+        for ext, reader in (('csv', pd.read_csv), ('parquet', pd.read_parquet)):
+            nodes_file, relations_file = f"{base_name}_nodes.{ext}", f"{base_name}_relations.{ext}"
+            if os.path.exists(nodes_file) and os.path.exists(relations_file):
+                return cls(reader(nodes_file), reader(relations_file))
+        raise FileNotFoundError(f"未找到 {base_name}_nodes / _relations 的 CSV 或 Parquet 文件，"
+                                f"本地分析需要导出其中一种格式")
+
+    @property
+    def node_count(self):
+        return self.A.shape[0]
+
+    def _successors(self, v):
+        A = self.A
+        return A.indices[A.indptr[v]:A.indptr[v + 1]]
+
+    def _predecessors(self, v):
+        A_T = self.A_T
+        return A_T.indices[A_T.indptr[v]:A_T.indptr[v + 1]]
+
+    def centrality(self):
+        """度数排名（关联的关系条数），与 centrality 查询的列和计数一致"""
+        degree = self.degree
+        order = np.argsort(-degree, kind='stable')
+        return [{'node_id': self.node_ids[i], 'node_name': self.names[i], 'degree': int(degree[i])}
+                for i in order]
+
+    def triangles(self, limit=500):
+        """
+        有向三角形 a->b->c->a
+
+        先用稀疏矩阵乘积 (A·A)ᵀ ∘ A 找出位于三角形上的边 a->b，
+        再对这些边求 succ(b) ∩ pred(a) 枚举第三个节点。
+        """
+        closing = self.A.multiply((self.A @ self.A).T).tocoo()
+        rows = []
+        for a, b in zip(closing.row, closing.col):
+            for c in np.intersect1d(self._successors(b), self._predecessors(a), assume_unique=True):
+                if c == a or c == b:
+                    continue
+                rows.append({'a': self.names[a], 'b': self.names[b], 'c': self.names[c]})
+                if len(rows) >= limit:
+                    return rows
+        return rows
+
+    def _distance_to_targets(self, target_mask, max_depth):
+        """反向多源BFS：每个节点到最近目标节点的跳数（超过 max_depth 记为 max_depth+1）"""
+        distance = np.full(self.node_count, max_depth + 1, dtype=np.int32)
+        frontier = np.flatnonzero(target_mask)
+        distance[frontier] = 0
+        for depth in range(1, max_depth + 1):
+            if len(frontier) == 0:
+                break
+            # 前驱节点：边界节点在 Aᵀ 中各行的并集
+            preds = np.unique(self.A_T[frontier].indices)
+            preds = preds[distance[preds] > depth]
+            distance[preds] = depth
+            frontier = preds
+        return distance
+
+    def long_chains(self, min_length=3, max_length=5, limit=200,
+                    start_type='NPC', end_type='Item'):
+        """
+        NPC→Item 的长关系链（简单路径，长度 min_length..max_length），按长度降序
+
+        与 Cypher 的 [:REL*3..5] 不完全相同：Cypher 只要求关系不重复，路径可以经过
+        同一节点，平行关系也算作不同路径；这里只枚举不重复节点的路径，多重边合并，
+        因此结果是 Cypher 结果中简单路径部分（按节点序列去重）的子集。
+
+        有界DFS：按目标长度从长到短搜索，节点到最近Item的距离超过剩余步数时剪枝。
+        """
+        start_nodes = np.flatnonzero(self.types == start_type)
+        end_mask = self.types == end_type
+        distance = self._distance_to_targets(end_mask, max_length)
+
+        chains = []
+        for length in range(max_length, min_length - 1, -1):
+            for start in start_nodes:
+                if distance[start] > length:
+                    continue
+                self._collect_paths([start], length, end_mask, distance, chains, limit)
+                if len(chains) >= limit:
+                    return chains
+        return chains
+
+    def _collect_paths(self, path, length, end_mask, distance, chains, limit):
+        """从 path 末端继续深度优先扩展，收集恰好 length 步且终点为目标类型的路径"""
+        remaining = length - (len(path) - 1)
+        if remaining == 0:
+            if end_mask[path[-1]]:
+                chains.append({'chain': [self.names[v] for v in path], 'chain_length': length})
+            return
+        on_path = set(path)
+        for nxt in self._successors(path[-1]):
+            if nxt in on_path or distance[nxt] > remaining - 1:
+                continue
+            path.append(nxt)
+            self._collect_paths(path, length, end_mask, distance, chains, limit)
+            path.pop()
+            if len(chains) >= limit:
+                return
+
+    def run_all(self, triangle_limit=500, chain_limit=200):
+        """计算全部本地可得的高级分析结果"""
+        return {
+            'centrality': self.centrality(),
+            'triangles': self.triangles(triangle_limit),
+            'long_chains': self.long_chains(limit=chain_limit),
+        }
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='离线计算知识图谱的三角形与长关系链')
+    parser.add_argument('nodes_file', help='导出的节点CSV文件')
+    parser.add_argument('relations_file', help='导出的关系CSV文件')
+    parser.add_argument('--output', default='stardew_valley_graph_local', help='输出文件前缀')
+    args = parser.parse_args()
+
+    analytics = LocalGraphAnalytics.from_csv(args.nodes_file, args.relations_file)
+    print(f"已加载: {analytics.node_count} 个节点, {analytics.A.nnz} 条边")
+
+    for key, data in analytics.run_all().items():
+        if not data:
+            continue
+        df = pd.DataFrame(data)
+        df.to_csv(f"{args.output}_{key}.csv", index=False, encoding='utf-8-sig')
+        with open(f"{args.output}_{key}.json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"✓ {key}: {len(data)} 条记录")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,106 @@
 # 构建游戏设计网络图.py
+# 导入时不读取数据、不加载 matplotlib / plotly，脚本运行时才执行
 import os
 import pandas as pd
 import networkx as nx
-import matplotlib.pyplot as plt
 import glob
 import json
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun']
-plt.rcParams['axes.unicode_minus'] = False
+from 快照注册表 import SnapshotRegistry
+from 图构建 import build_graph
+from 布局缓存 import get_layout, layout_array
+from GEXF流式读写 import write_gexf
 
-# 1. 找到最新的导出文件
-export_dir = r"C:\Users\34167\exports"
+EXPORT_DIR = r"C:\Users\34167\exports"
 
-# 查找最新的节点文件
-node_files = glob.glob(os.path.join(export_dir, "stardew_valley_graph_*_nodes.csv"))
-if not node_files:
-    print(f"错误：在 {export_dir} 目录中找不到节点CSV文件")
-    exit(1)
-
-# 获取最新的文件
-latest_node_file = sorted(node_files)[-1]
-latest_relation_file = latest_node_file.replace("_nodes.csv", "_relations.csv")
-
-print(f"使用节点文件: {latest_node_file}")
-print(f"使用关系文件: {latest_relation_file}")
-
-# 2. 读取数据
-try:
-    nodes_df = pd.read_csv(latest_node_file)
-    relations_df = pd.read_csv(latest_relation_file)
-    print(f"成功读取: {len(nodes_df)} 个节点, {len(relations_df)} 个关系")
-except FileNotFoundError as e:
-    print(f"读取文件失败: {e}")
-    exit(1)
-
-# 3. 构建网络图
-G = nx.Graph()
-
-# 添加节点
-for _, row in nodes_df.iterrows():
-    G.add_node(row.get('id', row.get('name')), 
-               name=row.get('name', ''),
-               type=row.get('type', 'Unknown'))
-
-# 添加边
-for _, row in relations_df.iterrows():
-    G.add_edge(row['source'], row['target'], 
-               relation=row.get('relation', 'Unknown'))
-
-print(f"网络构建完成: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
+def load_latest_graph(export_dir=EXPORT_DIR):
+    """
+    读取最新的导出文件并构建网络图
+    
+    Returns:
+        (G, 节点文件路径)；找不到或读取失败时返回 (None, None)
+    """
+    # 1. 找到最新的导出文件
+    registry = SnapshotRegistry(export_dir)
+    snapshot = registry.latest() if registry.exists() else None
+    
+    if snapshot is not None:
+        # 从快照清单直接取最新版本
+        latest_node_file = registry.path(snapshot, 'nodes')
+        latest_relation_file = registry.path(snapshot, 'relations')
+    else:
+        # 兼容没有清单的旧导出目录
+        node_files = glob.glob(os.path.join(export_dir, "stardew_valley_graph_*_nodes.csv"))
+        if not node_files:
+            print(f"错误：在 {export_dir} 目录中找不到节点CSV文件")
+            return None, None
+        
+        # 获取最新的文件
+        latest_node_file = sorted(node_files)[-1]
+        latest_relation_file = latest_node_file.replace("_nodes.csv", "_relations.csv")
+    
+    print(f"使用节点文件: {latest_node_file}")
+    print(f"使用关系文件: {latest_relation_file}")
+    
+    # 2. 读取数据
+    try:
+        if snapshot is not None:
+            nodes_df = registry.load_table(snapshot, 'nodes')
+            relations_df = registry.load_table(snapshot, 'relations')
+        else:
+            nodes_df = pd.read_csv(latest_node_file)
+            relations_df = pd.read_csv(latest_relation_file)
+        print(f"成功读取: {len(nodes_df)} 个节点, {len(relations_df)} 个关系")
+    except FileNotFoundError as e:
+        print(f"读取文件失败: {e}")
+        return None, None
+    
+    # 3. 构建网络图（整表批量添加节点和边）
+    G, _ = build_graph(nodes_df, relations_df, id_columns=['id', 'name'], parse_attributes=False)
+    
+    print(f"网络构建完成: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
+    return G, latest_node_file
 
 # 4. 导出函数定义
-def export_static_visualization(G, filename):
-    """导出静态网络图"""
-    plt.figure(figsize=(20, 15))
-    pos = nx.spring_layout(G, k=1, iterations=50)
+def export_static_visualization(G, filename, label_top=30):
+    """导出静态网络图（只标注连接数最多的 label_top 个节点）"""
+    import matplotlib.pyplot as plt
+    from 静态网络图 import draw_network
+    
+    # 设置中文字体
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun']
+    plt.rcParams['axes.unicode_minus'] = False
     
-    # 绘制网络
-    nx.draw(G, pos, with_labels=True, node_size=200, 
-            font_size=6, alpha=0.8, edge_color='gray')
+    fig, ax = plt.subplots(figsize=(20, 15))
     
-    plt.title("星露谷物语知识图谱网络", size=16)
-    plt.axis('off')
-    plt.savefig(f"{filename}.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    # 边一次性绘制，边数很多时改为密度图
+    draw_network(ax, G, get_layout(G), node_size=200, edge_alpha=0.8, edge_width=1.0,
+                 label_top=label_top, font_size=6)
+    
+    ax.set_title("星露谷物语知识图谱网络", size=16)
+    ax.axis('off')
+    fig.savefig(f"{filename}.png", dpi=300, bbox_inches='tight')
+    plt.close(fig)
     
     print(f"静态网络图已导出: {filename}.png")
 
-def export_interactive_visualization(G, filename):
-    """导出交互式HTML网络图"""
+def export_interactive_visualization(G, filename, sample_method='forest_fire', sample_size=200):
+    """导出交互式HTML网络图（节点过多时按 sample_method 采样，见 图采样.py）"""
     try:
         import plotly.graph_objects as go
+        from 网络图轨迹 import network_traces, write_network_html
         
-        # 如果节点太多，可以采样显示
+        # 如果节点太多，采样显示（默认森林火灾采样，保留局部结构且无需计算中心性）
         if G.number_of_nodes() > 500:
-            print("节点过多，将采样显示前200个节点")
-            nodes = list(G.nodes())[:200]
-            H = G.subgraph(nodes)
+            from 图采样 import sample_graph
+            print(f"节点过多，按 {sample_method} 采样显示 {sample_size} 个节点")
+            H = sample_graph(G, sample_size, method=sample_method)
         else:
             H = G
         
-        pos = nx.spring_layout(H, k=1, iterations=50)
-        
-        # 准备边数据
-        edge_x, edge_y = [], []
-        for edge in H.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        
-        # 准备节点数据
-        node_x, node_y, node_text = [], [], []
-        for node in H.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-            node_info = H.nodes[node]
-            node_text.append(f"名称: {node_info.get('name', node)}<br>类型: {node_info.get('type', 'Unknown')}")
-        
-        # 创建图形
-        edge_trace = go.Scatter(x=edge_x, y=edge_y,
-                              line=dict(width=0.5, color='#888'),
-                              hoverinfo='none', mode='lines')
-        
-        node_trace = go.Scatter(x=node_x, y=node_y,
-                              mode='markers',
-                              hoverinfo='text',
-                              text=node_text,
-                              marker=dict(size=10, line=dict(width=2)))
+        # 使用全图的缓存布局，采样子图与静态图坐标一致；WebGL 渲染
+        nodes, positions = layout_array(G)
+        edge_trace, node_trace, nodes = network_traces(H, positions, nodes)
         
         fig = go.Figure(data=[edge_trace, node_trace],
                        layout=go.Layout(title='星露谷物语知识图谱',
@@ -117,7 +108,7 @@ def export_interactive_visualization(G, filename):
                                       hovermode='closest',
                                       margin=dict(b=20,l=5,r=5,t=40)))
         
-        fig.write_html(f"{filename}.html")
+        write_network_html(fig, H, nodes, f"{filename}.html")
         print(f"交互式网络图已导出: {filename}.html")
         
     except ImportError:
@@ -129,8 +120,8 @@ def export_interactive_visualization(G, filename):
 def export_network_data(G, base_name):
     """导出网络数据文件"""
     try:
-        # GEXF格式 (Gephi可读)
-        nx.write_gexf(G, f"{base_name}.gexf")
+        # GEXF格式 (Gephi可读)，流式写出并生成 .graph.npz 附属文件
+        write_gexf(G, f"{base_name}.gexf")
         
         # GraphML格式
         nx.write_graphml(G, f"{base_name}.graphml")
@@ -182,6 +173,10 @@ def export_network_visualizations(G, base_name="stardew_valley"):
 
 # 5. 调用导出函数
 if __name__ == "__main__":
+    G, latest_node_file = load_latest_graph()
+    if G is None:
+        exit(1)
+    
     # 从文件名提取时间戳
     import re
     match = re.search(r'stardew_valley_graph_(\d+_\d+)', latest_node_file)
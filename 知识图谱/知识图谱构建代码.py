@@ -2,64 +2,152 @@ import json
 import os
 import glob
 import csv
-from collections import defaultdict
+from collections import namedtuple
 import re
 
+from 三元组存储 import TripletStore
+from Neo4j批量导入 import Neo4jBulkImportWriter
+from 提取性能分析 import StageProfiler
+
+# 物品记录: 由 ObjectInformation 条目一次性解析出的类型化字段
+ObjectRecord = namedtuple('ObjectRecord', ['item_id', 'name', 'price', 'type', 'category', 'display_name'])
+
+# 日程片段格式: "时间 地点 X Y 朝向 ..."，例如 "900 SeedShop 39 5 2"
+SCHEDULE_ENTRY_PATTERN = re.compile(r'^a?(\d{3,4})\s+(\w+)\s+-?\d+\s+-?\d+')
+
 class StardewValleyKnowledgeGraph:
-    def __init__(self, content_path):
+    # 数据文件路径，均在首次使用时才加载
+    DATA_FILES = {
+        'quests': 'Data/Quests.json',
+        'objects': 'Data/ObjectInformation.json',  # 物品信息
+        'npcs': 'Data/NPCDispositions.json',      # NPC信息
+        'locations': 'Data/Locations.json',        # 地点信息
+        'monsters': 'Data/Monsters.json',          # 怪物信息（如果存在）
+        'crafting': 'Data/CraftingRecipes.json',   # 合成配方
+        'gift_tastes': 'Data/NPCGiftTastes.json',  # NPC礼物喜好
+    }
+    
+    # NPCGiftTastes 中各字段的下标与对应关系: 最爱/喜欢 -> 喜欢, 不喜欢/讨厌 -> 讨厌
+    GIFT_TASTE_FIELDS = [(1, '喜欢'), (3, '喜欢'), (5, '讨厌'), (7, '讨厌')]
+    
+    # 礼物喜好中负数ID表示物品类别
+    ITEM_CATEGORY_NAMES = {
+        '-2': '宝石', '-4': '鱼类', '-5': '蛋类', '-6': '奶类', '-7': '烹饪',
+        '-8': '制作品', '-12': '矿物', '-15': '金属资源', '-16': '建筑材料',
+        '-26': '工匠物品', '-27': '糖浆', '-28': '怪物战利品', '-74': '种子',
+        '-75': '蔬菜', '-79': '水果', '-80': '花卉', '-81': '采集品',
+    }
+    
+    def __init__(self, content_path, profile=None, profile_dir='.'):
         """
         初始化星露谷物语知识图谱提取器
         
         Args:
             content_path: C:\Program Files (x86)\Steam\steamapps\common\Stardew Valley\Content (unpacked)
+            profile: 可选 'cprofile' / 'pyinstrument'，为每个提取阶段保存剖析结果
+            profile_dir: 剖析结果保存目录
         """
         self.content_path = content_path
-        self.triplets = []  # 存储(主语, 关系, 宾语)三元组
+        self.triplets = TripletStore()  # 存储(主语, 关系, 宾语)三元组，插入时去重
         self.entity_cache = {}  # 实体缓存，避免重复解析
-        self.data = {}  # 存储加载的游戏数据
+        self.data = {}  # 存储已加载的游戏数据（按需加载）
+        self.object_index = {}  # 物品ID -> ObjectRecord，加载数据时一次性构建
+        self._entity_types = None  # 实体名称 -> 节点类型，导出节点时推断
+        self.profiler = StageProfiler(lambda: len(self.triplets), profile, profile_dir)
         
     def load_game_data(self):
         """
-        加载游戏的核心数据文件
+        加载游戏数据
         基于星露谷物语实际的数据文件结构[1,2](@ref)
+        物品索引在此一次性构建，其余数据文件由各解析步骤在首次使用时加载
         """
         print("开始加载游戏数据文件...")
-        
-        # 定义关键数据文件路径
-        data_files = {
-            'quests': 'Data/Quests.json',
-            'objects': 'Data/ObjectInformation.json',  # 物品信息
-            'npcs': 'Data/NPCDispositions.json',      # NPC信息
-            'locations': 'Data/Locations.json',        # 地点信息
-            'monsters': 'Data/Monsters.json',          # 怪物信息（如果存在）
-            'crafting': 'Data/CraftingRecipes.json',   # 合成配方
-        }
-        
-        for data_type, file_path in data_files.items():
-            full_path = os.path.join(self.content_path, file_path)
-            if os.path.exists(full_path):
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        self.data[data_type] = json.load(f)
-                    print(f"✓ 已加载: {file_path}")
-                except Exception as e:
-                    print(f"✗ 加载失败 {file_path}: {str(e)}")
-                    self.data[data_type] = {}
-            else:
-                print(f"⚠ 文件不存在: {file_path}")
-                self.data[data_type] = {}
+        self._build_object_index()
+    
+    def _get_data(self, data_type):
+        """
+        获取数据文件内容，首次访问时才从磁盘加载
+        """
+        if data_type not in self.data:
+            self.data[data_type] = self._load_json_file(self.DATA_FILES[data_type])
+        return self.data[data_type]
+    
+    def _load_json_file(self, file_path):
+        """
+        加载内容目录下的JSON文件，失败时返回空字典
+        """
+        full_path = os.path.join(self.content_path, file_path)
+        if not os.path.exists(full_path):
+            print(f"⚠ 文件不存在: {file_path}")
+            return {}
+        try:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            print(f"✓ 已加载: {file_path}")
+            return data
+        except Exception as e:
+            print(f"✗ 加载失败 {file_path}: {str(e)}")
+            return {}
+    
+    def _build_object_index(self):
+        """
+        预先解析全部物品条目，构建 物品ID -> ObjectRecord 索引
+        配方、任务与礼物喜好解析共用此索引，避免重复 split('/')；物品名称同时写入实体缓存
+        """
+        self.object_index = {}
+        for item_id, item_data in self._get_data('objects').items():
+            record = self._parse_object_record(item_id, item_data)
+            if record:
+                self.object_index[item_id] = record
+                self.entity_cache[f"item_{item_id}"] = record.name
+        print(f"✓ 已索引物品: {len(self.object_index)} 个")
+    
+    @staticmethod
+    def _parse_object_record(item_id, item_data):
+        """
+        解析单个物品条目
+        兼容旧版字符串格式 "名称/价格/可食用度/类型 类别/显示名/描述..." 与1.6版字典格式
+        """
+        if isinstance(item_data, dict):
+            name = item_data.get('Name') or f"物品_{item_id}"
+            price = item_data.get('Price', 0)
+            item_type = item_data.get('Type', '')
+            category = item_data.get('Category', 0)
+            display_name = item_data.get('DisplayName') or name
+        elif isinstance(item_data, str):
+            parts = item_data.split('/')
+            name = parts[0] or f"物品_{item_id}"
+            price = parts[1] if len(parts) > 1 else 0
+            type_parts = parts[3].split() if len(parts) > 3 else []
+            item_type = type_parts[0] if type_parts else ''
+            category = type_parts[1] if len(type_parts) > 1 else 0
+            display_name = parts[4] if len(parts) > 4 and parts[4] else name
+        else:
+            return None
+        
+        try:
+            price = int(price)
+        except (TypeError, ValueError):
+            price = 0
+        try:
+            category = int(category)
+        except (TypeError, ValueError):
+            category = 0
+        
+        return ObjectRecord(str(item_id), name, price, item_type, category, display_name)
     
     def parse_quest_data(self):
         """
         解析任务数据，提取核心关系
         基于星露谷物语任务数据的实际格式[2](@ref)
         """
-        if 'quests' not in self.data:
+        quests = self._get_data('quests')
+        if not quests:
             return
             
         print("开始解析任务数据...")
         
-        for quest_id, quest_str in self.data['quests'].items():
+        for quest_id, quest_str in quests.items():
             try:
                 # 解析任务字符串格式: "类型/名称/描述/目标/地点/..."
                 parts = quest_str.split('/')
@@ -79,7 +167,11 @@ class StardewValleyKnowledgeGraph:
                 self._extract_quest_objectives(quest_id, quest_name, objective, quest_str)
                 
                 # 提取任务奖励关系 (任务 -> 物品)
-                self._extract_quest_rewards(quest_id, quest_name, quest_str)
+                self._extract_quest_rewards(quest_id, quest_name, parts)
+                
+                # 送货任务的交付物品 (任务 -> 物品)，格式: "NPC名 物品ID"
+                if quest_type == 'ItemDelivery':
+                    self._extract_quest_delivery(quest_name, location)
                 
                 # 提取任务地点关系 (任务 -> 地点)
                 if location and location != 'null' and location != '-1':
@@ -154,23 +246,25 @@ class StardewValleyKnowledgeGraph:
                 if location_name and len(location_name) < 100:
                     self.triplets.append((quest_name, relation, location_name.strip()))
     
-    def _extract_quest_rewards(self, quest_id, quest_name, quest_str):
+    def _extract_quest_delivery(self, quest_name, requirement):
+        """
+        提取送货任务要求交付的物品，物品ID通过索引解析
+        """
+        parts = requirement.split()
+        if len(parts) >= 2 and parts[1] in self.object_index:
+            self.triplets.append((quest_name, "需要交付", self._get_item_name(parts[1])))
+    
+    def _extract_quest_rewards(self, quest_id, quest_name, parts):
         """
         提取任务奖励关系
-        基于任务数据中的奖励信息[2](@ref)
+        基于任务数据中的奖励信息[2](@ref)，parts 为已拆分的任务字段；奖励物品ID通过索引解析
         """
-        # 从任务字符串中解析奖励信息
-        parts = quest_str.split('/')
-        if len(parts) > 7:
-            try:
-                # 假设奖励金钱在特定位置
-                money_reward = parts[7] if len(parts) > 7 else None
-                if money_reward and money_reward != '-1' and money_reward.isdigit():
-                    reward_amount = int(money_reward)
-                    if reward_amount > 0:
-                        self.triplets.append((quest_name, "奖励金币", f"{reward_amount}金"))
-            except:
-                pass
+        # 假设奖励在特定位置: 限定物品ID（如 "(O)109"）为奖励物品，纯数字为金币
+        reward = parts[7].strip() if len(parts) > 7 else ''
+        if reward.startswith('(O)') and reward[3:] in self.object_index:
+            self.triplets.append((quest_name, "奖励", self._get_item_name(reward)))
+        elif reward.isdigit() and int(reward) > 0:
+            self.triplets.append((quest_name, "奖励金币", f"{int(reward)}金"))
         
         # 常见任务奖励映射
         reward_mapping = {
@@ -185,13 +279,14 @@ class StardewValleyKnowledgeGraph:
         """
         解析物品之间的关系（合成、掉落等）
         """
-        if 'crafting' not in self.data:
+        crafting = self._get_data('crafting')
+        if not crafting:
             return
             
         print("解析合成关系...")
         
         # 解析合成配方
-        for recipe_id, recipe_str in self.data['crafting'].items():
+        for recipe_id, recipe_str in crafting.items():
             try:
                 # 配方格式: "结果物品ID 数量/材料1ID 数量 材料2ID 数量/..."
                 parts = recipe_str.split('/')
@@ -217,25 +312,22 @@ class StardewValleyKnowledgeGraph:
     
     def _get_item_name(self, item_id):
         """
-        根据物品ID获取物品名称
+        根据物品ID获取物品名称（查预先构建的索引）
         """
-        if 'objects' in self.data and item_id in self.data['objects']:
-            item_str = self.data['objects'][item_id]
-            # 物品格式: "名称/价格/...""[2](@ref)
-            parts = item_str.split('/')
-            return parts[0] if parts else f"物品_{item_id}"
-        return f"物品_{item_id}"
+        if item_id.startswith('(O)'):
+            item_id = item_id[3:]  # 1.6版限定ID，如 "(O)109"
+        record = self.object_index.get(item_id)
+        return record.name if record is not None else f"物品_{item_id}"
     
     def parse_npc_relationships(self):
         """
         解析NPC相关关系（喜好、日程等）
         """
-        if 'npcs' not in self.data:
-            return
-            
-        print("解析NPC关系...")
+        npcs = self._get_data('npcs')
+        if npcs:
+            print("解析NPC关系...")
         
-        for npc_id, npc_str in self.data['npcs'].items():
+        for npc_id, npc_str in npcs.items():
             try:
                 # NPC数据格式较为复杂，包含多种信息
                 parts = npc_str.split('/')
@@ -243,17 +335,91 @@ class StardewValleyKnowledgeGraph:
                     npc_name = parts[0]
                     self.entity_cache[f"npc_{npc_id}"] = npc_name
                     
-                    # 这里可以扩展解析NPC的喜好、厌恶等关系
-                    # 例如：解析礼物偏好数据
-                    
             except Exception as e:
                 print(f"解析NPC {npc_id} 时出错: {str(e)}")
+        
+        self.parse_gift_tastes()
+        self.parse_schedules()
+    
+    def parse_gift_tastes(self):
+        """
+        解析NPC礼物喜好 (NPC -喜欢/讨厌-> 物品)
+        格式: "最爱台词/ID列表/喜欢台词/ID列表/不喜欢台词/ID列表/讨厌台词/ID列表/一般台词/ID列表"
+        """
+        gift_tastes = self._get_data('gift_tastes')
+        if not gift_tastes:
+            return
+        
+        print("解析礼物喜好...")
+        add = self.triplets.add
+        
+        for npc_name, taste_str in gift_tastes.items():
+            # Universal_* 为全体村民通用喜好，不对应具体NPC
+            if npc_name.startswith('Universal_'):
+                continue
+            
+            parts = taste_str.split('/')
+            for field_index, relation in self.GIFT_TASTE_FIELDS:
+                if field_index >= len(parts):
+                    break
+                for item_id in parts[field_index].split():
+                    item_name = self._resolve_gift_item(item_id)
+                    if item_name:
+                        add(npc_name, relation, item_name)
+    
+    def _resolve_gift_item(self, item_id):
+        """
+        将礼物喜好中的ID解析为物品或类别名称，无法识别时返回None
+        """
+        if item_id.startswith('-'):
+            return self.ITEM_CATEGORY_NAMES.get(item_id)
+        if item_id.startswith('(O)'):
+            item_id = item_id[3:]
+        if item_id in self.object_index:
+            return self._get_item_name(item_id)
+        return None
+    
+    def parse_schedules(self):
+        """
+        解析NPC日程 (NPC -出现于-> 地点)
+        日程文件位于 Characters/schedules/<NPC>.json，逐个按需加载
+        """
+        schedule_path = os.path.join(self.content_path, 'Characters', 'schedules')
+        if not os.path.isdir(schedule_path):
+            return
+        
+        print("解析NPC日程...")
+        add = self.triplets.add
+        match_entry = SCHEDULE_ENTRY_PATTERN.match
+        
+        # 按文件名顺序遍历，三元组插入顺序（及其内部编号）每次运行都相同
+        for entry in sorted(os.scandir(schedule_path), key=lambda e: e.name):
+            if not entry.name.endswith('.json'):
+                continue
+            npc_name = os.path.splitext(entry.name)[0]
+            schedule = self._load_json_file(os.path.join('Characters', 'schedules', entry.name))
+            
+            locations = {}  # 按首次出现顺序去重
+            for schedule_str in schedule.values():
+                if not isinstance(schedule_str, str):
+                    continue
+                for segment in schedule_str.split('/'):
+                    match = match_entry(segment)
+                    if match:
+                        locations.setdefault(match.group(2))
+            
+            for location in locations:
+                add(npc_name, "出现于", location)
     
     def extract_from_dialogue_files(self):
         """
         从对话文件中提取额外关系
+        
+        Returns:
+            成功解析的对话文件数
         """
         print("扫描对话文件...")
+        parsed_files = 0
         
         # 扫描Characters目录下的对话文件
         dialogue_path = os.path.join(self.content_path, 'Characters', 'Dialogue')
@@ -267,8 +433,11 @@ class StardewValleyKnowledgeGraph:
                         with open(file_path, 'r', encoding='utf-8') as f:
                             dialogue_data = json.load(f)
                             self._parse_dialogue_for_relationships(npc_name, dialogue_data)
+                            parsed_files += 1
                     except:
                         pass  # 忽略无法解析的文件
+        
+        return parsed_files
     
     def _parse_dialogue_for_relationships(self, npc_name, dialogue_data):
         """
@@ -276,6 +445,12 @@ class StardewValleyKnowledgeGraph:
         """
         if isinstance(dialogue_data, dict):
             for key, dialogue_text in dialogue_data.items():
+                # 收到特定礼物的专属台词: "AcceptGift_(O)物品ID"
+                if key.startswith('AcceptGift_(O)'):
+                    item_name = self._resolve_gift_item(key[len('AcceptGift_(O)'):])
+                    if item_name:
+                        self.triplets.add(npc_name, "喜欢", item_name)
+                
                 if isinstance(dialogue_text, str):
                     text_lower = dialogue_text.lower()
                     
@@ -340,17 +515,8 @@ class StardewValleyKnowledgeGraph:
         """
         去除重复的三元组
         """
+        # TripletStore 在插入时已按整数ID哈希去重，这里只需报告结果
         print("去除重复关系...")
-        unique_triplets = []
-        seen = set()
-        
-        for triplet in self.triplets:
-            triplet_str = f"{triplet[0]}|{triplet[1]}|{triplet[2]}"
-            if triplet_str not in seen:
-                seen.add(triplet_str)
-                unique_triplets.append(triplet)
-        
-        self.triplets = unique_triplets
         print(f"去重后剩余 {len(self.triplets)} 个三元组")
     
     def export_triplets(self, output_file="stardew_knowledge_graph.csv"):
@@ -382,6 +548,48 @@ class StardewValleyKnowledgeGraph:
                 writer.writerow([entity_id, entity_name])
         
         print(f"实体映射已导出到: {entity_file}")
+        
+        # 导出物品索引中全部物品的类型化属性
+        item_file = "stardew_item_attributes.csv"
+        with open(item_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['entity_id', 'item_id', 'name', 'price', 'type', 'category', 'display_name'])
+            for item_id, record in self.object_index.items():
+                writer.writerow([f"item_{item_id}", *record])
+        
+        print(f"物品属性已导出到: {item_file}")
+    
+    # 由关系推断实体类型: 关系 -> (主语类型, 宾语类型)
+    RELATION_ENTITY_TYPES = {
+        '发布': ('NPC', 'Quest'),
+        '发生于': ('Quest', 'Location'),
+        '要求到达': ('Quest', 'Location'),
+        '需要交付': ('Quest', 'Item'),
+        '合成需要': ('Item', None),
+        '喜欢': ('NPC', None),
+        '讨厌': ('NPC', None),
+        '出现于': ('NPC', 'Location'),
+        '提到': ('NPC', None),
+    }
+    
+    def entity_type(self, name):
+        """
+        推断实体的节点类型 (NPC/Quest/Item/Location/Unknown)
+        """
+        if self._entity_types is None:
+            self._entity_types = {}
+            for entity_id, entity_name in self.entity_cache.items():
+                prefix = entity_id.split('_', 1)[0]
+                entity_type = {'quest': 'Quest', 'npc': 'NPC', 'item': 'Item'}.get(prefix)
+                if entity_type:
+                    self._entity_types.setdefault(entity_name, entity_type)
+            for subj, rel, obj in self.triplets:
+                subj_type, obj_type = self.RELATION_ENTITY_TYPES.get(rel, (None, None))
+                if subj_type:
+                    self._entity_types.setdefault(subj, subj_type)
+                if obj_type:
+                    self._entity_types.setdefault(obj, obj_type)
+        return self._entity_types.get(name, 'Unknown')
     
     def print_statistics(self):
         """
@@ -391,9 +599,7 @@ class StardewValleyKnowledgeGraph:
             print("没有可统计的三元组数据")
             return
         
-        relation_stats = defaultdict(int)
-        for triplet in self.triplets:
-            relation_stats[triplet[1]] += 1
+        relation_stats = self.triplets.relation_counts()
         
         print("\n" + "="*50)
         print("知识图谱提取统计")
@@ -408,36 +614,74 @@ class StardewValleyKnowledgeGraph:
         for i, triplet in enumerate(self.triplets[:10]):
             print(f"  {i+1}. ({triplet[0]}) -[{triplet[1]}]-> ({triplet[2]})")
     
-    def run_extraction(self):
+    def run_extraction(self, bulk_import_dir=None):
         """
         运行完整的提取流程
+        
+        Args:
+            bulk_import_dir: 若指定，提取过程中将三元组流式写入该目录下
+                             neo4j-admin import 格式的 nodes.csv / relationships.csv
         """
         print("开始提取星露谷物语知识图谱...")
         print("="*60)
         
-        # 1. 加载游戏数据
-        self.load_game_data()
+        bulk_writer = None
+        if bulk_import_dir:
+            bulk_writer = Neo4jBulkImportWriter(bulk_import_dir, self.triplets, self.entity_type).open()
         
-        # 2. 解析各种关系
-        self.parse_quest_data()
-        self.parse_item_relationships()
-        self.parse_npc_relationships()
+        try:
+            self._run_stages()
+        finally:
+            # 任一阶段出错也要关闭关系文件并写出已提取部分的节点文件
+            if bulk_writer:
+                bulk_writer.close()
+        
+        if bulk_writer:
+            print("离线导入新数据库 (需先停止Neo4j):")
+            print(f"  {bulk_writer.import_command()}")
+        
+        print("\n提取完成！")
+        return self.triplets
+    
+    def _run_stages(self):
+        """按顺序执行各提取阶段（每个阶段单独计时）"""
+        stage = self.profiler.stage
+        
+        # 1. 加载游戏数据
+        with stage('load_game_data') as record:
+            self.load_game_data()
+            record.records_in = len(self.object_index)
+        
+        # 2. 解析各种关系（数据文件在各阶段内按需加载）
+        with stage('parse_quest_data') as record:
+            self.parse_quest_data()
+            record.records_in = len(self.data.get('quests', {}))
+        with stage('parse_item_relationships') as record:
+            self.parse_item_relationships()
+            record.records_in = len(self.data.get('crafting', {}))
+        with stage('parse_npc_relationships') as record:
+            self.parse_npc_relationships()
+            record.records_in = len(self.data.get('npcs', {})) + len(self.data.get('gift_tastes', {}))
         
         # 3. 从对话文件补充关系
-        self.extract_from_dialogue_files()
+        with stage('extract_from_dialogue_files') as record:
+            record.records_in = self.extract_from_dialogue_files()
         
         # 4. 添加游戏常识
-        self.enhance_with_hardcoded_knowledge()
+        with stage('enhance_with_hardcoded_knowledge'):
+            self.enhance_with_hardcoded_knowledge()
         
         # 5. 清理数据
-        self.remove_duplicates()
+        with stage('remove_duplicates', records_in=len(self.triplets)):
+            self.remove_duplicates()
         
         # 6. 输出结果
         self.print_statistics()
-        self.export_triplets()
+        with stage('export_triplets', records_in=len(self.triplets)) as record:
+            self.export_triplets()
+            record.triplets_out = len(self.triplets)
         
-        print("\n提取完成！")
-        return self.triplets
+        self.profiler.print_summary()
 
 # 使用示例
 if __name__ == "__main__":
@@ -461,5 +705,8 @@ if __name__ == "__main__":
         f.write("前50个三元组:\n")
         for i, triplet in enumerate(knowledge_triplets[:50]):
             f.write(f"{i+1:3d}. ({triplet[0]}) -[{triplet[1]}]-> ({triplet[2]})\n")
+    
+    # 保存分阶段计时报告（与日志同目录）
+    extractor.profiler.write_report('extraction_timing.json')
     import os
     print("当前工作目录是:", os.getcwd())
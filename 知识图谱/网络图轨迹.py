@@ -0,0 +1,173 @@
+# 网络图轨迹.py
+"""
+WebGL 交互式网络图
+
+节点、边坐标由缓存布局数组直接向量化生成，使用 Scattergl（WebGL）渲染，
+数千条边以上的图也能流畅缩放。HTML 中只保留坐标、颜色、大小和悬停信息（名称、类型、连接数），
+其余长尾属性写入同名的 JSON 附属文件，点击节点时页面才加载（本地 file:// 页面无法加载时悬停信息不受影响）。
+"""
+import json
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from 布局缓存 import layout_array
+
+DEFAULT_COLOR = '#95A5A6'
+
+# 直接写入悬停信息的节点属性，不再放入附属文件
+HOVER_FIELDS = ('type', 'degree')
+
+# 点击节点时按需加载附属文件并显示属性（{plot_id} 由 plotly 替换为图形div的id）
+_SIDECAR_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var sidecar = %(sidecar)s;
+var nodeAttributes = null;
+var panel = document.createElement('pre');
+panel.style.cssText = 'position:fixed;right:10px;top:10px;max-width:320px;max-height:60vh;overflow:auto;' +
+    'margin:0;padding:8px;background:rgba(255,255,255,0.95);border:1px solid #ccc;font-size:12px;display:none;';
+document.body.appendChild(panel);
+gd.on('plotly_click', function (event) {
+    var point = event.points[0];
+    if (!point || point.data.meta !== 'nodes') return;
+    var load = nodeAttributes ? Promise.resolve(nodeAttributes) :
+        fetch(sidecar).then(function (r) { return r.json(); }).then(function (d) { nodeAttributes = d; return d; });
+    load.then(function (d) {
+        var lines = [];
+        Object.keys(d).forEach(function (field) { lines.push(field + ': ' + d[field][point.customdata]); });
+        panel.textContent = lines.join('\\n');
+        panel.style.display = 'block';
+    }).catch(function () {
+        panel.textContent = '无法加载节点属性: ' + sidecar + '（本地文件请通过 http 服务打开）';
+        panel.style.display = 'block';
+    });
+});
+"""
+
+
+def edge_coordinates(G, nodes, positions):
+    """
+    边的折线坐标数组：每条边两个端点后接一个 NaN 断开（与 Plotly 中的 None 等价）
+
+    Returns:
+        (edge_x, edge_y) 两个一维数组
+    """
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.fromiter((index[n] for u, v in G.edges() for n in (u, v)),
+                        dtype=np.int64, count=2 * G.number_of_edges()).reshape(-1, 2)
+    coords = np.full((len(edges), 3, 2), np.nan)
+    coords[:, 0] = positions[edges[:, 0]]
+    coords[:, 1] = positions[edges[:, 1]]
+    return coords[:, :, 0].ravel(), coords[:, :, 1].ravel()
+
+
+def node_colors(G, nodes, color_map, default=DEFAULT_COLOR):
+    """按节点类型查表得到颜色数组（每种类型只查一次）"""
+    types = np.array([str(G.nodes[n].get('type', 'Unknown')) for n in nodes])
+    if not len(types):
+        return types
+    unique_types, inverse = np.unique(types, return_inverse=True)
+    return np.array([color_map.get(t, default) for t in unique_types])[inverse]
+
+
+def node_attribute_table(G, nodes):
+    """节点的长尾属性按列组织 {字段: [值...]}，行顺序与 nodes 一致（类型、连接数已在悬停信息中）"""
+    fields = ['id', 'name']
+    for n in nodes:
+        for key in G.nodes[n]:
+            if key not in fields and key not in HOVER_FIELDS and key != 'viz':
+                fields.append(key)
+    table = {field: [] for field in fields}
+    for n in nodes:
+        data = G.nodes[n]
+        for field in fields:
+            if field == 'id':
+                value = n
+            elif field == 'name':
+                value = data.get('name', n)
+            else:
+                value = data.get(field)
+            table[field].append(value)
+    return table
+
+
+def node_hover_text(G, nodes):
+    """悬停信息：名称、类型、连接数"""
+    degrees = dict(G.degree(nodes))
+    return [f"<b>{G.nodes[n].get('name', n)}</b><br>类型: {G.nodes[n].get('type', 'Unknown')}<br>连接数: {degrees[n]}"
+            for n in nodes]
+
+
+def sidecar_path(output_file):
+    return os.path.splitext(output_file)[0] + '_nodes.json'
+
+
+def write_node_sidecar(G, nodes, output_file):
+    """节点属性写入 HTML 旁的 JSON 附属文件，返回其路径"""
+    path = sidecar_path(output_file)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(node_attribute_table(G, nodes), f, ensure_ascii=False, separators=(',', ':'), default=str)
+    return path
+
+
+def network_traces(G, positions=None, nodes=None, color_map=None, default_color=DEFAULT_COLOR,
+                   sizes=10, edge_width=0.5, marker_line_width=2):
+    """
+    构建边轨迹和节点轨迹（Scattergl）
+
+    Args:
+        G: networkx 图（可以是子图，坐标取自 positions）
+        positions: {节点: 坐标} 或与 nodes 对应的 (n, 2) 数组；None 时读取缓存布局
+        nodes: positions 为数组时的行顺序
+        color_map: 节点类型 -> 颜色，未列出的类型使用 default_color；None 时使用 plotly 默认颜色
+        sizes: 标记大小（标量，或与 positions 的行一一对应的数组，随坐标一同按子图过滤）
+
+    Returns:
+        (边轨迹, 节点轨迹, 节点列表)，节点轨迹的 customdata 是节点在列表中的下标
+    """
+    if positions is None:
+        nodes, positions = layout_array(G)
+    elif isinstance(positions, dict):
+        nodes = list(G.nodes()) if nodes is None else nodes
+        positions = np.array([positions[n] for n in nodes], dtype=np.float64).reshape(len(nodes), 2)
+    if len(nodes) != G.number_of_nodes():
+        # 坐标来自全图时只保留子图中的节点
+        keep = np.array([G.has_node(n) for n in nodes], dtype=bool)
+        nodes = [n for n, k in zip(nodes, keep) if k]
+        positions = positions[keep]
+        if not np.isscalar(sizes):
+            sizes = np.asarray(sizes)[keep]
+
+    edge_x, edge_y = edge_coordinates(G, nodes, positions)
+    edge_trace = go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode='lines',
+        line=dict(width=edge_width, color='#888'),
+        hoverinfo='none',
+        showlegend=False
+    )
+
+    node_trace = go.Scattergl(
+        x=positions[:, 0], y=positions[:, 1],
+        mode='markers',
+        marker=dict(size=sizes, color=None if color_map is None else node_colors(G, nodes, color_map, default_color),
+                    line=dict(width=marker_line_width, color='darkgray')),
+        text=node_hover_text(G, nodes),
+        customdata=np.arange(len(nodes)),
+        hovertemplate='%{text}<extra></extra>',
+        meta='nodes',
+        name='节点',
+        showlegend=False
+    )
+    return edge_trace, node_trace, nodes
+
+
+def write_network_html(fig, G, nodes, output_file):
+    """保存 HTML 及节点属性附属文件，点击节点时按需加载属性"""
+    sidecar = write_node_sidecar(G, nodes, output_file)
+    # JSON 字符串字面量，并转义 </ 以免文件名提前结束 <script>
+    literal = json.dumps(os.path.basename(sidecar), ensure_ascii=False).replace('</', '<\\/')
+    script = _SIDECAR_SCRIPT % {'sidecar': literal}
+    fig.write_html(output_file, post_script=script)
+    return sidecar
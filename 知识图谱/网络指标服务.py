@@ -0,0 +1,148 @@
+# 网络指标服务.py
+"""
+统一的网络指标服务
+
+各分析脚本不再各自读取GEXF、各自计算中心性/聚类/直径/社区划分，
+而是通过 NetworkMetrics 取指标：每个指标对同一图快照只计算一次，
+结果按 (图哈希, 指标名, 参数) 持久化到 .graph_cache/，其他脚本直接复用。
+"""
+import os
+from collections import Counter
+
+import networkx as nx
+import numpy as np
+
+from 中心性引擎 import CentralityEngine
+from 布局缓存 import get_layout
+from 社区检测 import CommunityDetector
+from 路径统计 import path_statistics
+from 图缓存 import ResultCache, graph_hash
+from GEXF流式读写 import load_graph_arrays
+
+# 进程内已加载的图: (文件路径, 大小, 修改时间) -> 图
+_loaded_graphs = {}
+
+
+def load_graph(gexf_file):
+    """
+    读取GEXF文件
+
+    同一文件在进程内只解析一次；GEXF 流式解析后写出 .graph.npz 附属文件，
+    文件未变时其他脚本直接加载附属文件，跳过 XML 解析。
+    """
+    stat = os.stat(gexf_file)
+    file_key = (os.path.abspath(gexf_file), stat.st_size, stat.st_mtime_ns)
+    if file_key not in _loaded_graphs:
+        _loaded_graphs[file_key] = load_graph_arrays(gexf_file).to_networkx()
+    return _loaded_graphs[file_key]
+
+
+class NetworkMetrics:
+    """按图快照缓存的网络指标"""
+
+    def __init__(self, G, cache=None, graph_key=None):
+        """
+        Args:
+            G: networkx 图
+            cache: ResultCache 实例，None 时使用默认缓存目录
+            graph_key: 图的内容哈希，默认由 graph_hash(G) 计算
+        """
+        self.G = G
+        self.cache = cache if cache is not None else ResultCache()
+        self._graph_key = graph_key
+
+    @classmethod
+    def from_gexf(cls, gexf_file, cache=None):
+        """从GEXF文件加载图并创建指标服务"""
+        return cls(load_graph(gexf_file), cache)
+
+    @property
+    def graph_key(self):
+        if self._graph_key is None:
+            self._graph_key = graph_hash(self.G)
+        return self._graph_key
+
+    def _metric(self, name, compute, **params):
+        return self.cache.get_or_compute(self.graph_key, name, params, compute)
+
+    # ---- 基础统计 ----
+
+    def degrees(self):
+        """节点 -> 度数"""
+        return self._metric('degrees', lambda: dict(self.G.degree()))
+
+    def type_distribution(self):
+        """节点类型计数（依赖节点属性而图哈希只覆盖结构，每次直接统计，O(n)）"""
+        return Counter(self.G.nodes[n].get('type', 'Unknown') for n in self.G.nodes())
+
+    def is_connected(self):
+        return self._metric('is_connected', lambda: nx.is_connected(self.G))
+
+    def basic_stats(self):
+        return {
+            'node_count': self.G.number_of_nodes(),
+            'edge_count': self.G.number_of_edges(),
+            'density': nx.density(self.G),
+            'is_connected': self.is_connected(),
+        }
+
+    # ---- 中心性 ----
+
+    def degree_centrality(self):
+        return self._metric('degree_centrality', lambda: nx.degree_centrality(self.G))
+
+    def betweenness(self, **kwargs):
+        """介数中心性，参数同 CentralityEngine.betweenness（引擎自行缓存）"""
+        return CentralityEngine(self.G, self.cache, self.graph_key).betweenness(**kwargs)
+
+    def closeness(self):
+        return self._metric('closeness', lambda: nx.closeness_centrality(self.G))
+
+    # ---- 拓扑特征 ----
+
+    def clustering(self):
+        """节点 -> 聚类系数"""
+        return self._metric('clustering', lambda: nx.clustering(self.G))
+
+    def average_clustering(self):
+        clustering = self.clustering()
+        return float(np.mean(list(clustering.values()))) if clustering else 0.0
+
+    def path_statistics(self, exact_limit=1000, samples=200, max_bfs=200, confidence=0.95, seed=42):
+        """按连通分量计算的直径（上下界）与平均路径长度（含置信区间），参数见 路径统计.path_statistics"""
+        params = dict(exact_limit=exact_limit, samples=samples, max_bfs=max_bfs,
+                      confidence=confidence, seed=seed)
+        return self._metric('path_statistics', lambda: path_statistics(self.G, **params), **params)
+
+    # ---- 布局 ----
+
+    def layout(self, layout='auto', **params):
+        """缓存的布局坐标 {节点: 坐标}，参数见 布局缓存.get_layout"""
+        return get_layout(self.G, layout, graph_key=self.graph_key, cache_dir=self.cache.cache_dir, **params)
+
+    # ---- 社区结构 ----
+
+    def communities(self, seed=42, resolution=1.0):
+        """Louvain 社区划分: 节点 -> 社区编号（固定种子，按图哈希缓存并支持热启动）"""
+        return CommunityDetector(self.G, self.cache, self.graph_key).detect(seed=seed, resolution=resolution)
+
+    def modularity(self, seed=42, resolution=1.0):
+        def compute():
+            detector = CommunityDetector(self.G, self.cache, self.graph_key)
+            return detector.modularity(self.communities(seed, resolution), resolution)
+        return self._metric('modularity', compute, seed=seed, resolution=resolution)
+
+    def compute_all(self):
+        """一次性计算全部指标（之后各脚本都直接命中缓存）"""
+        return {
+            'basic_stats': self.basic_stats(),
+            'degrees': self.degrees(),
+            'type_distribution': self.type_distribution(),
+            'degree_centrality': self.degree_centrality(),
+            'betweenness': self.betweenness(),
+            'closeness': self.closeness(),
+            'clustering': self.clustering(),
+            'path_statistics': self.path_statistics(),
+            'communities': self.communities(),
+            'modularity': self.modularity(),
+        }
@@ -0,0 +1,332 @@
+# 网络浏览服务.py
+"""
+本地知识图谱浏览服务（分级细节）
+
+页面本身只有几KB，节点和边按当前视口向服务端查询：
+- 缓存布局坐标上建立均匀网格空间索引，按视口矩形取节点
+- 视口内节点超过上限时只返回介数中心性最高的节点（缩小时看到核心节点，放大后显示全部细节）
+- 点击节点时查询其 ego 网络和完整属性
+
+用法: python 网络浏览服务.py stardew_valley_network_complete.gexf --port 8050
+"""
+import json
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import networkx as nx
+import numpy as np
+
+from 布局缓存 import layout_array
+from 网络指标服务 import NetworkMetrics
+
+# 单次视口查询返回的节点数上限
+DEFAULT_NODE_LIMIT = 400
+# 单次查询返回的边数上限
+MAX_EDGES = 5000
+
+
+class SpatialGrid:
+    """布局坐标上的均匀网格索引，按矩形范围查询节点下标"""
+
+    def __init__(self, positions, nodes_per_cell=16):
+        self.positions = positions
+        n = len(positions)
+        self.lo = positions.min(axis=0) if n else np.zeros(2)
+        self.hi = positions.max(axis=0) if n else np.ones(2)
+        self.size = max(1, int(math.sqrt(n / nodes_per_cell)))
+        self.scale = self.size / np.maximum(self.hi - self.lo, 1e-12)
+
+        flat = self._flat_cells(positions)
+        # 按格子排序后的节点下标，以及每个格子在其中的起止位置（CSR）
+        self.order = np.argsort(flat, kind='stable')
+        counts = np.bincount(flat, minlength=self.size * self.size)
+        self.starts = np.concatenate([[0], np.cumsum(counts)])
+
+    def _cells(self, points):
+        return np.clip(((points - self.lo) * self.scale).astype(np.int64), 0, self.size - 1)
+
+    def _flat_cells(self, points):
+        cell = self._cells(points)
+        return cell[:, 0] * self.size + cell[:, 1]
+
+    def query(self, x0, y0, x1, y1):
+        """矩形 [x0, x1] × [y0, y1] 内的节点下标"""
+        (cx0, cy0), (cx1, cy1) = self._cells(np.array([[min(x0, x1), min(y0, y1)],
+                                                       [max(x0, x1), max(y0, y1)]]))
+        # 同一列（cx）中 cy0..cy1 的格子在排序数组中是连续的一段
+        chunks = [self.order[self.starts[cx * self.size + cy0]:self.starts[cx * self.size + cy1 + 1]]
+                  for cx in range(cx0, cx1 + 1)]
+        candidates = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+        pos = self.positions[candidates]
+        inside = ((pos[:, 0] >= min(x0, x1)) & (pos[:, 0] <= max(x0, x1))
+                  & (pos[:, 1] >= min(y0, y1)) & (pos[:, 1] <= max(y0, y1)))
+        return candidates[inside]
+
+
+class GraphExplorer:
+    """视口子图、ego 网络与节点属性查询"""
+
+    def __init__(self, G, metrics=None):
+        self.G = G
+        self.metrics = metrics if metrics is not None else NetworkMetrics(G)
+        self.nodes, self.positions = layout_array(G, graph_key=self.metrics.graph_key,
+                                                  cache_dir=self.metrics.cache.cache_dir)
+        self.grid = SpatialGrid(self.positions)
+
+        U = G.to_undirected(as_view=True) if G.is_directed() else G
+        self.adjacency = nx.to_scipy_sparse_array(U, nodelist=self.nodes, weight=None, format='csr')
+        self.degrees = np.diff(self.adjacency.indptr)
+
+        # 重要度排名：介数中心性降序，度数次之（0 为最重要）
+        betweenness = self.metrics.betweenness()
+        score = np.array([betweenness.get(n, 0.0) for n in self.nodes])
+        order = np.lexsort((-self.degrees, -score))
+        self.rank = np.empty(len(self.nodes), dtype=np.int64)
+        self.rank[order] = np.arange(len(self.nodes))
+
+        self.names = [str(G.nodes[n].get('name', n)) for n in self.nodes]
+        self.types = [str(G.nodes[n].get('type', 'Unknown')) for n in self.nodes]
+
+    @classmethod
+    def from_gexf(cls, gexf_file):
+        metrics = NetworkMetrics.from_gexf(gexf_file)
+        return cls(metrics.G, metrics)
+
+    def _top(self, indices, limit):
+        """按重要度取前 limit 个节点"""
+        if len(indices) <= limit:
+            return indices
+        return indices[np.argsort(self.rank[indices], kind='stable')[:limit]]
+
+    def _payload(self, indices, **extra):
+        """节点 [下标, x, y, 名称, 类型, 度数] 与诱导子图的边 [下标, 下标]"""
+        indices = np.sort(indices)
+        sub = self.adjacency[indices][:, indices].tocoo()
+        upper = sub.row < sub.col
+        edges = np.column_stack([indices[sub.row[upper]], indices[sub.col[upper]]])
+        truncated = len(edges) > MAX_EDGES
+        if truncated:
+            # 边太多时保留两端节点最重要的边
+            importance = np.minimum(self.rank[edges[:, 0]], self.rank[edges[:, 1]])
+            edges = edges[np.argsort(importance, kind='stable')[:MAX_EDGES]]
+        nodes = [[int(i), float(self.positions[i, 0]), float(self.positions[i, 1]),
+                  self.names[i], self.types[i], int(self.degrees[i])] for i in indices]
+        return {'nodes': nodes, 'edges': edges.tolist(), 'edges_truncated': truncated, **extra}
+
+    def bounds(self):
+        lo, hi = self.grid.lo, self.grid.hi
+        return {'x0': float(lo[0]), 'y0': float(lo[1]), 'x1': float(hi[0]), 'y1': float(hi[1]),
+                'node_count': len(self.nodes), 'edge_count': self.G.number_of_edges()}
+
+    def viewport(self, x0, y0, x1, y1, limit=DEFAULT_NODE_LIMIT):
+        """视口内的子图；节点过多时只保留最重要的 limit 个（complete=False）"""
+        indices = self.grid.query(x0, y0, x1, y1)
+        selected = self._top(indices, limit)
+        return self._payload(selected, total=len(indices), complete=len(selected) == len(indices))
+
+    def ego(self, index, radius=1, limit=DEFAULT_NODE_LIMIT):
+        """以节点为中心、半径为 radius 跳的 ego 网络（超过上限时保留中心和最重要的邻居）"""
+        visited = np.zeros(len(self.nodes), dtype=bool)
+        visited[index] = True
+        frontier = np.array([index])
+        for _ in range(radius):
+            if not len(frontier):
+                break
+            neighbors = self.adjacency[frontier].indices
+            frontier = np.unique(neighbors[~visited[neighbors]])
+            visited[frontier] = True
+        members = np.flatnonzero(visited)
+        others = self._top(members[members != index], max(limit - 1, 0))
+        selected = np.concatenate([[index], others]).astype(np.int64)
+        return self._payload(selected, center=int(index), total=len(members),
+                             complete=len(selected) == len(members))
+
+    def node(self, index):
+        """节点的完整属性"""
+        node = self.nodes[index]
+        attributes = {k: v for k, v in self.G.nodes[node].items() if k != 'viz'}
+        return {'index': int(index), 'id': node, 'degree': int(self.degrees[index]),
+                'rank': int(self.rank[index]) + 1, 'attributes': attributes}
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>星露谷物语知识图谱浏览</title>
+<style>
+html, body { margin: 0; height: 100%; overflow: hidden; font-family: sans-serif; }
+canvas { display: block; }
+#status { position: fixed; left: 10px; bottom: 10px; font-size: 12px; color: #555; }
+#info { position: fixed; right: 10px; top: 10px; max-width: 320px; max-height: 70vh; overflow: auto; margin: 0;
+        padding: 8px; background: rgba(255,255,255,0.95); border: 1px solid #ccc; font-size: 12px; display: none; }
+</style></head>
+<body><canvas id="view"></canvas><div id="status"></div><pre id="info"></pre>
+<script>
+var COLORS = {NPC: '#FF6B6B', Quest: '#4ECDC4', Item: '#FFD166', Location: '#A5ABB6'};
+var canvas = document.getElementById('view'), ctx = canvas.getContext('2d');
+var statusBox = document.getElementById('status'), info = document.getElementById('info');
+var view = {cx: 0, cy: 0, scale: 1}, data = {nodes: [], edges: []}, ego = null, timer = null;
+
+function toScreen(x, y) { return [(x - view.cx) * view.scale + canvas.width / 2, (view.cy - y) * view.scale + canvas.height / 2]; }
+function toWorld(sx, sy) { return [(sx - canvas.width / 2) / view.scale + view.cx, view.cy - (sy - canvas.height / 2) / view.scale]; }
+function getJSON(url) { return fetch(url).then(function (r) { return r.json(); }); }
+
+function draw() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    [data, ego].forEach(function (layer) {
+        if (!layer) return;
+        var pos = {};
+        layer.nodes.forEach(function (n) { pos[n[0]] = toScreen(n[1], n[2]); });
+        ctx.strokeStyle = layer === ego ? 'rgba(220,60,60,0.6)' : 'rgba(136,136,136,0.4)';
+        ctx.lineWidth = layer === ego ? 1.5 : 0.5;
+        ctx.beginPath();
+        layer.edges.forEach(function (e) {
+            var a = pos[e[0]], b = pos[e[1]];
+            if (a && b) { ctx.moveTo(a[0], a[1]); ctx.lineTo(b[0], b[1]); }
+        });
+        ctx.stroke();
+        layer.nodes.forEach(function (n, k) {
+            var p = pos[n[0]], r = Math.max(3, Math.min(10, 2 + Math.sqrt(n[5])));
+            ctx.fillStyle = COLORS[n[4]] || '#95A5A6';
+            ctx.beginPath(); ctx.arc(p[0], p[1], r, 0, 2 * Math.PI); ctx.fill();
+            if (layer === ego && n[0] === ego.center) { ctx.strokeStyle = '#333'; ctx.stroke(); }
+            if (layer.complete || layer === ego || k < 30) { ctx.fillStyle = '#333'; ctx.fillText(n[3], p[0] + r + 2, p[1] + 3); }
+        });
+    });
+    statusBox.textContent = data.nodes.length + ' / ' + data.total + ' 个视口节点' + (data.complete ? '（完整）' : '（按中心性筛选）');
+}
+
+function refresh() {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+        var a = toWorld(0, canvas.height), b = toWorld(canvas.width, 0);
+        getJSON('/api/viewport?x0=' + a[0] + '&y0=' + a[1] + '&x1=' + b[0] + '&y1=' + b[1])
+            .then(function (d) { data = d; draw(); });
+    }, 120);
+}
+
+function resize() { canvas.width = window.innerWidth; canvas.height = window.innerHeight; draw(); refresh(); }
+
+canvas.addEventListener('wheel', function (e) {
+    e.preventDefault();
+    var before = toWorld(e.clientX, e.clientY);
+    view.scale *= Math.exp(-e.deltaY * 0.001);
+    var after = toWorld(e.clientX, e.clientY);
+    view.cx += before[0] - after[0]; view.cy += before[1] - after[1];
+    draw(); refresh();
+}, {passive: false});
+
+var drag = null;
+canvas.addEventListener('mousedown', function (e) { drag = {x: e.clientX, y: e.clientY, moved: false}; });
+canvas.addEventListener('mousemove', function (e) {
+    if (!drag) return;
+    var dx = e.clientX - drag.x, dy = e.clientY - drag.y;
+    if (Math.abs(dx) + Math.abs(dy) > 2) drag.moved = true;
+    view.cx -= dx / view.scale; view.cy += dy / view.scale;
+    drag.x = e.clientX; drag.y = e.clientY;
+    draw(); refresh();
+});
+canvas.addEventListener('mouseup', function (e) {
+    var clicked = drag && !drag.moved;
+    drag = null;
+    if (!clicked) return;
+    var best = null, bestDist = 100;
+    data.nodes.forEach(function (n) {
+        var p = toScreen(n[1], n[2]), d = (p[0] - e.clientX) * (p[0] - e.clientX) + (p[1] - e.clientY) * (p[1] - e.clientY);
+        if (d < bestDist) { best = n; bestDist = d; }
+    });
+    if (!best) { ego = null; info.style.display = 'none'; draw(); return; }
+    getJSON('/api/ego?index=' + best[0]).then(function (d) { ego = d; draw(); });
+    getJSON('/api/node?index=' + best[0]).then(function (d) {
+        info.textContent = JSON.stringify(d, null, 2); info.style.display = 'block';
+    });
+});
+
+window.addEventListener('resize', resize);
+getJSON('/api/bounds').then(function (b) {
+    view.cx = (b.x0 + b.x1) / 2; view.cy = (b.y0 + b.y1) / 2;
+    view.scale = 0.9 * Math.min(window.innerWidth / Math.max(b.x1 - b.x0, 1e-9), window.innerHeight / Math.max(b.y1 - b.y0, 1e-9));
+    document.title += '（' + b.node_count + ' 节点, ' + b.edge_count + ' 边）';
+    resize();
+});
+</script></body></html>
+"""
+
+
+class ExplorerHandler(BaseHTTPRequestHandler):
+    """浏览服务的请求处理（explorer 由 serve 绑定）"""
+
+    explorer = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == '/':
+                self._send(_PAGE.encode('utf-8'), 'text/html; charset=utf-8')
+            elif url.path == '/api/bounds':
+                self._send_json(self.explorer.bounds())
+            elif url.path == '/api/viewport':
+                x0, y0, x1, y1 = (float(query[k]) for k in ('x0', 'y0', 'x1', 'y1'))
+                limit = int(query.get('limit', DEFAULT_NODE_LIMIT))
+                self._send_json(self.explorer.viewport(x0, y0, x1, y1, limit))
+            elif url.path == '/api/ego':
+                self._send_json(self.explorer.ego(self._index(query), int(query.get('radius', 1)),
+                                                  int(query.get('limit', DEFAULT_NODE_LIMIT))))
+            elif url.path == '/api/node':
+                self._send_json(self.explorer.node(self._index(query)))
+            else:
+                self._send_json({'error': f'未知路径: {url.path}'}, 404)
+        except (KeyError, ValueError, IndexError) as e:
+            self._send_json({'error': f'参数错误: {e}'}, 400)
+
+    def _index(self, query):
+        index = int(query['index'])
+        if not 0 <= index < len(self.explorer.nodes):
+            raise IndexError(index)
+        return index
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        self._send(body, 'application/json; charset=utf-8', status)
+
+    def _send(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(explorer, host='127.0.0.1', port=8050):
+    """启动浏览服务（阻塞直到中断）"""
+    handler = type('BoundExplorerHandler', (ExplorerHandler,), {'explorer': explorer})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"✓ 知识图谱浏览服务: http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='本地知识图谱浏览服务（按视口分级加载）')
+    parser.add_argument('gexf_file', nargs='?', default='stardew_valley_network_complete.gexf',
+                        help='网络图GEXF文件')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8050, help='监听端口')
+    args = parser.parse_args()
+
+    explorer = GraphExplorer.from_gexf(args.gexf_file)
+    print(f"已加载: {len(explorer.nodes)} 节点, {explorer.G.number_of_edges()} 边")
+    serve(explorer, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # 图4_设计优化建议.py
 import matplotlib.pyplot as plt
-import networkx as nx
-from collections import Counter
 
-def create_design_recommendations():
-    """创建设计优化建议图"""
-    G = nx.read_gexf("stardew_valley_network_typed.gexf")
-    type_counts = Counter([G.nodes[n].get('type','Unknown') for n in G.nodes()])
+from 网络指标服务 import NetworkMetrics
+
+GEXF_FILE = "stardew_valley_network_typed.gexf"
+
+def create_design_recommendations(metrics=None, output_file='图4_设计优化建议.png', dpi=300):
+    """创建设计优化建议图（metrics 为 None 时从 GEXF_FILE 加载）"""
+    if metrics is None:
+        metrics = NetworkMetrics.from_gexf(GEXF_FILE)
+    G = metrics.G
+    type_counts = metrics.type_distribution()
     
     fig, ax = plt.subplots(figsize=(16, 12))
     ax.axis('off')
@@ -54,7 +58,7 @@ def create_design_recommendations():
     recommendations.append(f"   4. 未知节点较多 ({unknown_count}个, {unknown_percent:.1f}%)")
     
     # 连接性分析
-    degrees = [d for _, d in G.degree()]
+    degrees = list(metrics.degrees().values())
     avg_degree = sum(degrees) / len(degrees) if degrees else 0
     recommendations.append(f"   5. 平均连接数偏低 ({avg_degree:.1f}/3-5理想范围)")
     
@@ -103,8 +107,9 @@ def create_design_recommendations():
     ax.add_patch(rect)
     
     plt.tight_layout()
-    plt.savefig('图4_设计优化建议.png', dpi=300, bbox_inches='tight')
-    plt.show()
-    print("✅ 图4已保存: 图4_设计优化建议.png")
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ 图4已保存: {output_file}")
 
-create_design_recommendations()
+if __name__ == '__main__':
+    create_design_recommendations()
@@ -4,16 +4,33 @@ import networkx as nx
 import numpy as np
 from collections import Counter
 
-def create_network_statistics():
-    """创建详细的网络统计信息图"""
-    G = nx.read_gexf("stardew_valley_network_typed.gexf")
+from 网络指标服务 import NetworkMetrics
+
+GEXF_FILE = "stardew_valley_network_typed.gexf"
+
+def create_network_statistics(metrics=None, output_file='图3_详细网络统计信息.png', dpi=300):
+    """创建详细的网络统计信息图（metrics 为 None 时从 GEXF_FILE 加载）"""
+    if metrics is None:
+        metrics = NetworkMetrics.from_gexf(GEXF_FILE)
+    G = metrics.G
     
     fig, ax = plt.subplots(figsize=(16, 12))
     ax.axis('off')
     
     # 计算所有统计数据
-    degrees = [d for _, d in G.degree()]
-    type_counts = Counter([G.nodes[n].get('type','Unknown') for n in G.nodes()])
+    degrees = list(metrics.degrees().values())
+    type_counts = metrics.type_distribution()
+    paths = metrics.path_statistics()
+    if paths['diameter_lower'] == paths['diameter_upper']:
+        diameter_text = f"{paths['diameter_upper']}"
+    else:
+        diameter_text = f"{paths['diameter_lower']}~{paths['diameter_upper']}"
+    if paths['exact']:
+        avg_path_text = f"{paths['avg_path_length']:.2f}"
+    else:
+        avg_path_text = (f"{paths['avg_path_length']:.2f} ± {paths['avg_path_ci']:.2f} "
+                         f"({paths['confidence']:.0%}置信区间)")
+    largest = paths['components'][0] if paths['components'] else {'nodes': 0}
     
     # 构建详细的统计信息
     stats_lines = [
@@ -28,15 +45,16 @@ def create_network_statistics():
         f"   平均连接数: {np.mean(degrees):.2f}",
         f"   最大连接数: {max(degrees):>5}",
         f"   最小连接数: {min(degrees):>5}",
-        f"   网络直径:  {nx.diameter(G) if nx.is_connected(G) else '不连通':>5}",
-        f"   连通性:    {'✅ 是' if nx.is_connected(G) else '❌ 否'}",
+        f"   网络直径:  {diameter_text:>5}",
+        f"   连通性:    {'✅ 是' if metrics.is_connected() else '❌ 否'}",
+        f"   连通分量:  {paths['component_count']:>5} 个 (最大分量 {largest['nodes']} 节点)",
         "",
         "🎯 中心性分析统计:",
     ]
     
     # 中心性分析
-    degree_centrality = nx.degree_centrality(G)
-    betweenness = nx.betweenness_centrality(G)
+    degree_centrality = metrics.degree_centrality()
+    betweenness = metrics.betweenness()
     
     stats_lines.append(f"   平均度中心性:   {np.mean(list(degree_centrality.values())):.4f}")
     stats_lines.append(f"   平均介数中心性: {np.mean(list(betweenness.values())):.4f}")
@@ -69,8 +87,8 @@ def create_network_statistics():
     stats_lines.extend([
         "",
         "⚡ 网络拓扑特征:",
-        f"   聚类系数: {nx.average_clustering(G):.4f}",
-        f"   平均路径长度: {nx.average_shortest_path_length(G) if nx.is_connected(G) else 'N/A':.2f}",
+        f"   聚类系数: {metrics.average_clustering():.4f}",
+        f"   平均路径长度: {avg_path_text}",
     ])
     
     stats_text = "\n".join(stats_lines)
@@ -90,8 +108,9 @@ def create_network_statistics():
     ax.add_patch(rect)
     
     plt.tight_layout()
-    plt.savefig('图3_详细网络统计信息.png', dpi=300, bbox_inches='tight')
-    plt.show()
-    print("✅ 图3已保存: 图3_详细网络统计信息.png")
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ 图3已保存: {output_file}")
 
-create_network_statistics()
+if __name__ == '__main__':
+    create_network_statistics()
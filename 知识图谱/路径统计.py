@@ -0,0 +1,163 @@
+# 路径统计.py
+"""
+按连通分量计算网络直径与平均路径长度
+
+- 直径：double-sweep 给出下界和起点，再用 iFUB 按离心率层逐层收紧上界，
+  BFS 次数有上限，超过时返回 [下界, 上界]
+- 平均路径长度：随机抽样源点做BFS，返回估计值与置信区间
+小分量（节点数不超过 exact_limit）直接精确计算。
+"""
+import math
+import random
+from statistics import NormalDist
+
+import networkx as nx
+import numpy as np
+
+
+def _bfs_levels(G, source):
+    """源点到各节点的BFS距离"""
+    return nx.single_source_shortest_path_length(G, source)
+
+
+def _farthest(distances):
+    node = max(distances, key=distances.get)
+    return node, distances[node]
+
+
+def double_sweep(G, start):
+    """
+    double-sweep：从 start 出发找最远点 a，再从 a 出发找最远点 b，
+    ecc(a) 是直径下界；返回 (下界, a-b 最短路径中点)
+    """
+    a, _ = _farthest(_bfs_levels(G, start))
+    path = nx.shortest_path(G, a, _farthest(_bfs_levels(G, a))[0])
+    return len(path) - 1, path[len(path) // 2]
+
+
+def ifub_diameter(G, max_bfs=200):
+    """
+    iFUB 直径算法（连通无向图）
+
+    Returns:
+        (下界, 上界, BFS次数)；两界相等时为精确直径
+    """
+    if G.number_of_nodes() <= 1:
+        return 0, 0, 0
+
+    start = max(G.degree, key=lambda item: item[1])[0]
+    lower, u = double_sweep(G, start)
+    bfs_count = 3
+
+    levels = _bfs_levels(G, u)
+    bfs_count += 1
+    ecc_u = max(levels.values())
+    lower = max(lower, ecc_u)
+    upper = 2 * ecc_u
+
+    fringe = {}
+    for node, level in levels.items():
+        fringe.setdefault(level, []).append(node)
+
+    for i in range(ecc_u, 0, -1):
+        if lower >= upper:
+            break
+        for node in fringe[i]:
+            if bfs_count >= max_bfs:
+                return lower, upper, bfs_count
+            lower = max(lower, max(_bfs_levels(G, node).values()))
+            bfs_count += 1
+        # 更深层的节点都已检查，剩余节点两两距离不超过 2(i-1)
+        if lower > 2 * (i - 1):
+            return lower, lower, bfs_count
+        upper = 2 * (i - 1)
+    return lower, max(lower, upper), bfs_count
+
+
+def sampled_average_path_length(G, samples=200, confidence=0.95, seed=42):
+    """
+    抽样估计平均路径长度（连通图）
+
+    每个抽样源点的平均距离是总体平均路径长度的无偏样本，
+    置信区间按正态近似并带有限总体校正。
+
+    Returns:
+        (估计值, 置信区间半宽)
+    """
+    nodes = list(G)
+    n = len(nodes)
+    if n <= 1:
+        return 0.0, 0.0
+    rng = random.Random(seed)
+    sources = nodes if samples >= n else rng.sample(nodes, samples)
+
+    per_source = np.array([sum(_bfs_levels(G, s).values()) / (n - 1) for s in sources])
+    estimate = float(per_source.mean())
+    if len(sources) >= n or len(sources) < 2:
+        return estimate, 0.0
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    correction = math.sqrt((n - len(sources)) / (n - 1))
+    half_width = z * per_source.std(ddof=1) / math.sqrt(len(sources)) * correction
+    return estimate, float(half_width)
+
+
+def component_path_statistics(G, exact_limit=1000, samples=200, max_bfs=200,
+                              confidence=0.95, seed=42):
+    """单个连通分量的直径与平均路径长度"""
+    n = G.number_of_nodes()
+    stats = {'nodes': n, 'edges': G.number_of_edges()}
+    if n <= exact_limit:
+        diameter = nx.diameter(G) if n > 1 else 0
+        stats.update(diameter_lower=diameter, diameter_upper=diameter, exact=True,
+                     avg_path_length=nx.average_shortest_path_length(G) if n > 1 else 0.0,
+                     avg_path_ci=0.0)
+        return stats
+
+    lower, upper, _ = ifub_diameter(G, max_bfs)
+    estimate, half_width = sampled_average_path_length(G, samples, confidence, seed)
+    stats.update(diameter_lower=lower, diameter_upper=upper, exact=False,
+                 avg_path_length=estimate, avg_path_ci=half_width)
+    return stats
+
+
+def path_statistics(G, exact_limit=1000, samples=200, max_bfs=200, confidence=0.95, seed=42):
+    """
+    全图路径统计（按连通分量分别计算，有向图按弱连通处理）
+
+    Returns:
+        {
+            'components': 各分量统计（按节点数降序），
+            'component_count': 分量数,
+            'diameter_lower' / 'diameter_upper': 各分量直径的最大值,
+            'avg_path_length': 所有可达节点对的平均路径长度（按分量节点对数加权）,
+            'avg_path_ci': 对应的置信区间半宽,
+            'exact': 是否全部为精确值,
+        }
+    """
+    U = G.to_undirected(as_view=True) if G.is_directed() else G
+    components = sorted(nx.connected_components(U), key=len, reverse=True)
+
+    results = [component_path_statistics(U.subgraph(c), exact_limit, samples, max_bfs, confidence, seed)
+               for c in components]
+
+    pairs = np.array([r['nodes'] * (r['nodes'] - 1) for r in results], dtype=float)
+    total_pairs = pairs.sum()
+    if total_pairs > 0:
+        weights = pairs / total_pairs
+        avg_path_length = float(sum(w * r['avg_path_length'] for w, r in zip(weights, results)))
+        # 各分量独立抽样，半宽按方差合成
+        avg_path_ci = float(math.sqrt(sum((w * r['avg_path_ci']) ** 2 for w, r in zip(weights, results))))
+    else:
+        avg_path_length, avg_path_ci = 0.0, 0.0
+
+    return {
+        'components': results,
+        'component_count': len(results),
+        'diameter_lower': max((r['diameter_lower'] for r in results), default=0),
+        'diameter_upper': max((r['diameter_upper'] for r in results), default=0),
+        'avg_path_length': avg_path_length,
+        'avg_path_ci': avg_path_ci,
+        'confidence': confidence,
+        'exact': all(r['exact'] for r in results),
+    }
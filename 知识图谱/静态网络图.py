@@ -0,0 +1,153 @@
+# 静态网络图.py
+"""
+静态网络拓扑图的快速绘制
+
+nx.draw 为每条边创建一个 matplotlib 路径，并给每个节点加标签，
+大图在 300 dpi 下要绘制数分钟。这里所有边由坐标数组一次性生成一个 LineCollection，
+节点是一个 scatter（均栅格化，矢量格式输出也不会膨胀）；只给中心性最高的前 N 个节点加标签。
+边数很多时改为密度聚合：沿每条边按网格间距采样，统计每个像素格经过的边数，
+以对数灰度图显示（类似 datashader），绘制代价与边数无关。
+"""
+import heapq
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from 布局缓存 import layout_array
+
+DEFAULT_COLOR = '#95A5A6'
+
+# density='auto' 时超过该边数改用密度聚合
+DENSITY_EDGE_LIMIT = 20000
+
+# 密度聚合时每条边的最大采样点数
+MAX_SAMPLES_PER_EDGE = 256
+
+
+def _positions_array(G, positions, nodes):
+    """统一为 (节点列表, (n, 2) 坐标数组)，只保留图中的节点"""
+    if positions is None:
+        nodes, positions = layout_array(G)
+    elif isinstance(positions, dict):
+        nodes = list(G.nodes()) if nodes is None else nodes
+        positions = np.array([positions[n] for n in nodes], dtype=np.float64).reshape(len(nodes), 2)
+    if len(nodes) != G.number_of_nodes():
+        keep = np.array([G.has_node(n) for n in nodes], dtype=bool)
+        nodes = [n for n, k in zip(nodes, keep) if k]
+        positions = positions[keep]
+    return nodes, positions
+
+
+def edge_segments(G, nodes, positions):
+    """边的端点坐标数组 (m, 2, 2)"""
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.fromiter((index[n] for u, v in G.edges() for n in (u, v)),
+                        dtype=np.int64, count=2 * G.number_of_edges()).reshape(-1, 2)
+    return positions[edges]
+
+
+def edge_density(segments, extent, bins=512):
+    """
+    边经过各网格的次数（沿每条边按网格间距均匀采样后做二维直方图）
+
+    Args:
+        segments: (m, 2, 2) 边端点坐标
+        extent: (x0, x1, y0, y1)
+        bins: 较长边方向的网格数
+
+    Returns:
+        (ny, nx) 计数数组，行对应 y
+    """
+    x0, x1, y0, y1 = extent
+    cell = max(x1 - x0, y1 - y0) / bins or 1.0
+    nx_bins = max(int(np.ceil((x1 - x0) / cell)), 1)
+    ny_bins = max(int(np.ceil((y1 - y0) / cell)), 1)
+    if not len(segments):
+        return np.zeros((ny_bins, nx_bins))
+
+    start = segments[:, 0]
+    delta = segments[:, 1] - start
+    steps = np.clip(np.ceil(np.hypot(delta[:, 0], delta[:, 1]) / cell).astype(np.int64), 1,
+                    MAX_SAMPLES_PER_EDGE)
+    edge_index = np.repeat(np.arange(len(segments)), steps)
+    # 每个采样点在所属边内的序号
+    offset = np.arange(len(edge_index)) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = (offset + 0.5) / steps[edge_index]
+    points = start[edge_index] + delta[edge_index] * t[:, None]
+    counts, _, _ = np.histogram2d(points[:, 1], points[:, 0], bins=(ny_bins, nx_bins),
+                                  range=((y0, y0 + ny_bins * cell), (x0, x0 + nx_bins * cell)))
+    return counts
+
+
+def top_nodes(G, nodes, top_n, centrality=None):
+    """中心性最高的 top_n 个节点的下标（centrality 为 None 时按度数）"""
+    if top_n <= 0:
+        return []
+    if centrality is None:
+        centrality = dict(G.degree(nodes))
+    return heapq.nlargest(min(top_n, len(nodes)), range(len(nodes)), key=lambda i: centrality.get(nodes[i], 0))
+
+
+def draw_network(ax, G, positions=None, nodes=None, color_map=None, default_color=DEFAULT_COLOR,
+                 node_color='#1f78b4', node_size=50, node_alpha=0.8, edge_color='gray', edge_alpha=0.3,
+                 edge_width=0.8, density='auto', density_bins=512, label_top=0, centrality=None,
+                 font_size=8):
+    """
+    在 ax 上绘制网络图
+
+    Args:
+        G: networkx 图（可以是子图，坐标取自 positions）
+        positions: {节点: 坐标} 或与 nodes 对应的 (n, 2) 数组；None 时读取缓存布局
+        color_map: 节点类型 -> 颜色；None 时所有节点使用 node_color
+        density: True 使用密度聚合绘制边，False 使用 LineCollection，
+                 'auto' 在边数超过 DENSITY_EDGE_LIMIT 时使用密度聚合
+        label_top: 只给中心性最高的前 label_top 个节点加标签
+        centrality: 节点 -> 中心性，用于挑选标签节点；None 时按度数
+
+    Returns:
+        节点列表（与绘制顺序一致）
+    """
+    nodes, positions = _positions_array(G, positions, nodes)
+    segments = edge_segments(G, nodes, positions)
+    if density == 'auto':
+        density = len(segments) > DENSITY_EDGE_LIMIT
+
+    if len(positions):
+        x0, y0 = positions.min(axis=0)
+        x1, y1 = positions.max(axis=0)
+    else:
+        x0 = y0 = 0.0
+        x1 = y1 = 1.0
+    margin = 0.05 * max(x1 - x0, y1 - y0, 1e-9)
+    extent = (x0 - margin, x1 + margin, y0 - margin, y1 + margin)
+
+    if density:
+        counts = edge_density(segments, extent, density_bins)
+        ny_bins, nx_bins = counts.shape
+        cell = max(extent[1] - extent[0], extent[3] - extent[2]) / density_bins or 1.0
+        # 对数灰度，没有边经过的网格透明
+        image = np.ma.masked_equal(np.log1p(counts), 0)
+        ax.imshow(image, origin='lower', cmap='Greys', interpolation='nearest', aspect='auto',
+                  extent=(extent[0], extent[0] + nx_bins * cell, extent[2], extent[2] + ny_bins * cell),
+                  vmin=0, alpha=0.9, zorder=1, rasterized=True)
+    elif len(segments):
+        ax.add_collection(LineCollection(segments, colors=edge_color, linewidths=edge_width,
+                                         alpha=edge_alpha, zorder=1, rasterized=True))
+
+    if color_map is not None:
+        types = np.array([str(G.nodes[n].get('type', 'Unknown')) for n in nodes])
+        unique_types, inverse = np.unique(types, return_inverse=True)
+        colors = np.array([color_map.get(t, default_color) for t in unique_types])[inverse] if len(types) else []
+    else:
+        colors = node_color
+    ax.scatter(positions[:, 0], positions[:, 1], s=node_size, c=colors, alpha=node_alpha,
+               linewidths=0, zorder=2, rasterized=True)
+
+    for i in top_nodes(G, nodes, label_top, centrality):
+        ax.text(positions[i, 0], positions[i, 1], str(G.nodes[nodes[i]].get('name', nodes[i])),
+                fontsize=font_size, ha='center', va='center', zorder=3,
+                bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='none', alpha=0.7))
+
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    return nodes